@@ -0,0 +1,388 @@
+"""
+Every path that fetches market data, run against the offline stand-ins in common.py.
+
+Cold benchmarks start from an empty cache for every sample; warm ones measure
+repeated requests served from the local price cache, factor store, session or
+return store. The track_ benchmarks count requests reaching the providers, so
+a change that defeats a cache shows up as a jump rather than only as time.
+"""
+import os
+import time
+import tempfile
+import threading
+import numpy as np
+from seffybacktest import (alpha, analyze_portfolio, backtest_report, benchmark_portfolio, beta, calculate_capm,
+                           calculate_fama_french, calculate_indicators, calculate_market_return, clear_price_cache,
+                           correlation_with_index, download_prices, evict_price_cache, get_asset_returns,
+                           get_benchmark_returns, get_fama_french_factors, get_index_returns, get_portfolio_returns,
+                           get_returns, ingest_returns, iter_returns, load_factors, load_returns, return_moments,
+                           run_backtest, run_batch, run_benchmark_analysis, summarize_returns,
+                           FetchScheduler, MarketDataSession, ReturnStore, TokenBucket, Trace, INDICATORS)
+from . import common
+from .common import RISK_FREE_RATE, synthetic_returns, tickers, use_offline_data
+
+# The synthetic returns of common.py start on 2000-01-03; 2,520 days run to 2009
+START_DATE = "2000-01-01"
+END_DATE = "2010-01-01"
+INDEX_TICKERS = ["^GSPC", "^DJI", "^IXIC", "^FTSE", "^GSPTSE"]
+# Indicators that run headless (Momentum and RSI return series for plotting)
+HEADLESS_INDICATORS = [indicator for indicator in INDICATORS if indicator not in ("Momentum", "RSI")]
+
+
+class PriceCache:
+    params = [1, 100]
+    param_names = ["tickers"]
+    timeout = 300
+
+    def setup(self, count):
+        use_offline_data()
+        self.tickers = tickers(count)
+        download_prices(self.tickers, START_DATE, END_DATE)
+
+    def time_download_prices_warm(self, count):
+        download_prices(self.tickers, START_DATE, END_DATE)
+
+    def time_get_asset_returns(self, count):
+        get_asset_returns(self.tickers, START_DATE, END_DATE)
+
+    def time_get_portfolio_returns(self, count):
+        get_portfolio_returns(self.tickers, np.full(count, 1 / count), START_DATE, END_DATE, rebalance="monthly")
+
+    def time_get_returns(self, count):
+        get_returns(self.tickers, START_DATE, END_DATE)
+
+    def time_evict_price_cache(self, count):
+        # Nothing is old or large enough to go; measures the scan of the index
+        evict_price_cache(max_bytes=1 << 40, max_age_days=365)
+
+    def track_downloads_warm(self, count):
+        del common.downloads[:]
+        download_prices(self.tickers, START_DATE, END_DATE)
+        get_portfolio_returns(self.tickers, np.full(count, 1 / count), START_DATE, END_DATE)
+        return len(common.downloads)
+    track_downloads_warm.unit = "requests"
+
+
+class PriceCacheCold:
+    params = [1, 100]
+    param_names = ["tickers"]
+    number = 1
+    repeat = 5
+    warmup_time = 0
+    timeout = 300
+
+    def setup(self, count):
+        use_offline_data()
+        self.tickers = tickers(count)
+
+    def time_download_prices_cold(self, count):
+        download_prices(self.tickers, START_DATE, END_DATE)
+
+    def time_download_prices_extend(self, count):
+        # Half the range is cached; only the newer half is fetched
+        download_prices(self.tickers, START_DATE, "2005-01-01")
+        download_prices(self.tickers, START_DATE, END_DATE)
+
+    def time_clear_price_cache(self, count):
+        clear_price_cache()
+
+    def track_downloads_extend(self, count):
+        download_prices(self.tickers, START_DATE, "2005-01-01")
+        del common.downloads[:]
+        download_prices(self.tickers, "2002-01-01", END_DATE)
+        return len(common.downloads)
+    track_downloads_extend.unit = "requests"
+
+
+class FetchSchedulerCold:
+    # Each request waits 20 ms, as a provider across a network would
+    params = ([1, 16], [100])
+    param_names = ["workers", "tickers"]
+    number = 1
+    repeat = 5
+    warmup_time = 0
+    timeout = 300
+
+    def setup(self, workers, count):
+        use_offline_data()
+        self.tickers = tickers(count)
+        self.scheduler = FetchScheduler(max_workers=workers, provider=self.provider)
+
+    def teardown(self, workers, count):
+        self.scheduler.shutdown()
+
+    @staticmethod
+    def provider(ticker, start_date, end_date):
+        time.sleep(0.02)
+        return common.synthetic_prices(ticker, start_date, end_date)
+
+    def time_download_prices_cold(self, workers, count):
+        with self.scheduler:
+            download_prices(self.tickers, START_DATE, END_DATE)
+
+    def track_downloads_duplicates(self, workers, count):
+        # Every ticker is asked for twice; each is downloaded once
+        del common.downloads[:]
+        with self.scheduler:
+            self.scheduler.fetch([(ticker, START_DATE, END_DATE) for ticker in self.tickers * 2])
+        return len(common.downloads)
+    track_downloads_duplicates.unit = "requests"
+
+
+class TokenBucketAcquire:
+    # Overhead of taking a token when one is always there, alone and from several threads
+    params = [1, 8]
+    param_names = ["threads"]
+
+    def setup(self, threads):
+        self.bucket = TokenBucket(rate=1e9, burst=1e9)
+
+    def acquire(self, count):
+        for _ in range(count):
+            self.bucket.acquire()
+
+    def time_acquire(self, threads):
+        workers = [threading.Thread(target=self.acquire, args=(10_000 // threads,)) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def track_rate_limited_seconds(self, threads):
+        # 20 requests at 100 per second, one at a time: the bucket should spread them over 0.19 s
+        bucket = TokenBucket(rate=100, burst=1)
+        began = time.monotonic()
+        for _ in range(20):
+            bucket.acquire()
+        return time.monotonic() - began
+    track_rate_limited_seconds.unit = "seconds"
+
+
+class FactorStore:
+    timeout = 300
+
+    def setup(self):
+        use_offline_data()
+        load_factors("3-factor")
+
+    def time_load_factors_warm(self):
+        load_factors("3-factor", START_DATE, END_DATE)
+
+    def time_get_fama_french_factors(self):
+        get_fama_french_factors(START_DATE, END_DATE)
+
+    def time_load_factors_cold(self):
+        from seffybacktest import factor_store
+        factor_store._loaded.clear()
+        load_factors("3-factor", START_DATE, END_DATE)
+
+    def track_downloads_warm(self):
+        del common.downloads[:]
+        for _ in range(3):
+            load_factors("3-factor", START_DATE, END_DATE)
+        return len(common.downloads)
+    track_downloads_warm.unit = "requests"
+
+
+class BenchmarkIndicators:
+    params = [1, 100]
+    param_names = ["portfolios"]
+    timeout = 300
+
+    def setup(self, portfolios):
+        use_offline_data()
+        self.returns = synthetic_returns(2520, portfolios)
+        # correlation_with_index takes a single portfolio
+        self.single = self.returns if portfolios == 1 else self.returns.iloc[:, 0]
+        # Fill the price cache and factor store; every sample then measures the warm path
+        calculate_fama_french(self.returns, RISK_FREE_RATE, "^GSPC")
+
+    def time_beta(self, portfolios):
+        beta(self.returns, "^GSPC")
+
+    def time_alpha(self, portfolios):
+        alpha(self.returns, "^GSPC", RISK_FREE_RATE)
+
+    def time_capm(self, portfolios):
+        calculate_capm(self.returns, RISK_FREE_RATE, "^GSPC")
+
+    def time_calculate_market_return(self, portfolios):
+        calculate_market_return(self.returns)
+
+    def time_correlation_with_index(self, portfolios):
+        correlation_with_index(self.single, "^GSPC")
+
+    def time_fama_french(self, portfolios):
+        calculate_fama_french(self.returns, RISK_FREE_RATE, "^GSPC")
+
+    def time_fama_french_in_session(self, portfolios):
+        with MarketDataSession():
+            calculate_fama_french(self.returns, RISK_FREE_RATE, "^GSPC")
+
+    def time_get_index_returns(self, portfolios):
+        get_index_returns("^GSPC", START_DATE, END_DATE)
+
+
+class Batch:
+    params = [1, 100]
+    param_names = ["portfolios"]
+    timeout = 600
+
+    def setup(self, portfolios):
+        use_offline_data()
+        self.returns = synthetic_returns(2520, portfolios)
+        if portfolios == 1:
+            self.returns = self.returns.to_frame()
+        self.single = self.returns.iloc[:, 0]
+        self.config = {"indicators": HEADLESS_INDICATORS, "risk_free_rate": RISK_FREE_RATE,
+                       "benchmarks": ["^GSPC"], "confidence_levels": [0.95, 0.99]}
+        self.path = os.path.join(tempfile.mkdtemp(), "returns.csv")
+        self.returns.to_csv(self.path)
+        run_batch(self.returns, self.config)
+
+    def time_run_batch(self, portfolios):
+        run_batch(self.returns, self.config)
+
+    def time_analyze_portfolio(self, portfolios):
+        with MarketDataSession():
+            analyze_portfolio(self.single, self.config)
+
+    def time_calculate_indicators(self, portfolios):
+        calculate_indicators(self.single, HEADLESS_INDICATORS, RISK_FREE_RATE, "^GSPC", confidence_levels=(0.95, 0.99))
+
+    def time_calculate_indicators_traced(self, portfolios):
+        # Against time_calculate_indicators: the cost of recording every event
+        with Trace():
+            calculate_indicators(self.single, HEADLESS_INDICATORS, RISK_FREE_RATE, "^GSPC",
+                                 confidence_levels=(0.95, 0.99))
+
+    def time_load_returns(self, portfolios):
+        load_returns(self.path)
+
+    def track_downloads_warm_batch(self, portfolios):
+        del common.downloads[:]
+        run_batch(self.returns, self.config)
+        return len(common.downloads)
+    track_downloads_warm_batch.unit = "requests"
+
+
+class BenchmarkAnalysis:
+    timeout = 300
+
+    def setup(self):
+        use_offline_data()
+        self.returns = synthetic_returns(2520, 1)
+        self.selected = [{"Ticker": ticker, "Full Name": ticker} for ticker in INDEX_TICKERS]
+        benchmark_portfolio(self.returns, self.selected)
+
+    def time_get_benchmark_returns(self):
+        get_benchmark_returns(INDEX_TICKERS, START_DATE, END_DATE)
+
+    def time_benchmark_portfolio(self):
+        benchmark_portfolio(self.returns, self.selected)
+
+    def time_run_benchmark_analysis(self):
+        run_benchmark_analysis(self.returns, RISK_FREE_RATE, tickers=INDEX_TICKERS)
+
+
+class BacktestReport:
+    timeout = 300
+
+    def setup(self):
+        use_offline_data()
+        returns = synthetic_returns(2520, 100)
+        self.backtest = run_backtest(returns.rolling(20, min_periods=1).mean(), returns, sizing="rank",
+                                     transaction_cost=0.001)
+        backtest_report(self.backtest, HEADLESS_INDICATORS, RISK_FREE_RATE, "^GSPC")
+
+    def time_backtest_report(self):
+        backtest_report(self.backtest, HEADLESS_INDICATORS, RISK_FREE_RATE, "^GSPC")
+
+
+class ReturnStoreAccess:
+    params = [100, 5_000]
+    param_names = ["symbols"]
+    timeout = 300
+
+    def setup(self, symbols):
+        use_offline_data()
+        self.returns = synthetic_returns(2520, symbols)
+        self.path = tempfile.mkdtemp()
+        self.store = ReturnStore.create(self.path, self.returns.iloc[:-21])
+        self.new_days = self.returns.iloc[-21:]
+        self.picked = list(self.returns.columns[::max(symbols // 10, 1)])
+
+    def time_create(self, symbols):
+        ReturnStore.create(tempfile.mkdtemp(), self.returns)
+
+    def time_open_and_slice(self, symbols):
+        ReturnStore(self.path).frame("2003-01-01", "2005-01-01", self.picked)
+
+    def time_frame_all_symbols(self, symbols):
+        self.store.frame("2003-01-01", "2005-01-01")
+
+    def time_session_asset_returns(self, symbols):
+        with MarketDataSession(store=self.store):
+            get_asset_returns(self.picked, "2003-01-01", "2005-01-01")
+
+    def track_downloads_with_store(self, symbols):
+        del common.downloads[:]
+        with MarketDataSession(store=self.store):
+            get_asset_returns(self.picked, "2003-01-01", "2005-01-01")
+        return len(common.downloads)
+    track_downloads_with_store.unit = "requests"
+
+
+class ReturnStoreAppend:
+    params = [100, 5_000]
+    param_names = ["symbols"]
+    number = 1
+    repeat = 5
+    warmup_time = 0
+
+    def setup(self, symbols):
+        returns = synthetic_returns(2520, symbols)
+        self.store = ReturnStore.create(tempfile.mkdtemp(), returns.iloc[:-21])
+        self.new_days = returns.iloc[-21:]
+
+    def time_append_month(self, symbols):
+        self.store.append(self.new_days)
+
+
+class FileIngest:
+    # 100,000 rows of 100 portfolios read 10,000 rows at a time
+    params = ["csv", "parquet"]
+    param_names = ["format"]
+    timeout = 300
+
+    def setup(self, file_format):
+        returns = synthetic_returns(100_000, 100)
+        self.path = os.path.join(tempfile.mkdtemp(), "returns." + file_format)
+        if file_format == "csv":
+            returns.to_csv(self.path)
+        else:
+            returns.to_parquet(self.path, row_group_size=10_000)
+
+    def time_iter_returns(self, file_format):
+        for _ in iter_returns(self.path, chunk_size=10_000):
+            pass
+
+    def time_iter_returns_float32(self, file_format):
+        for _ in iter_returns(self.path, chunk_size=10_000, dtype="float32"):
+            pass
+
+    def time_return_moments(self, file_format):
+        return_moments(self.path, chunk_size=10_000)
+
+    def time_ingest_returns(self, file_format):
+        ingest_returns(self.path, RISK_FREE_RATE, benchmark="P0", chunk_size=10_000)
+
+    def time_summarize_returns(self, file_format):
+        summarize_returns(self.path, RISK_FREE_RATE, benchmark="P0", chunk_size=10_000)
+
+    def peakmem_return_moments(self, file_format):
+        return_moments(self.path, chunk_size=10_000)
+
+    def peakmem_load_returns(self, file_format):
+        # Reading the whole file, against peakmem_return_moments
+        load_returns(self.path)
@@ -0,0 +1,33 @@
+"""
+Import-time benchmarks. Each one runs in a fresh interpreter, so it measures
+the full cost of loading the package and whatever it pulls in.
+"""
+
+
+class ImportTime:
+    def timeraw_import_package(self):
+        return "import seffybacktest"
+
+    def timeraw_import_sharpe_ratio(self):
+        # A metric should load numpy and pandas only, not the UI or the data providers
+        return "from seffybacktest import sharpe_ratio"
+
+    def timeraw_import_rolling(self):
+        return "from seffybacktest import rolling_sharpe_ratio, rolling_max_drawdown"
+
+    def timeraw_import_batch(self):
+        return "from seffybacktest import run_batch"
+
+
+class HeavyModules:
+    """
+    Number of heavy third-party packages loaded alongside a metric. Should stay 0.
+    """
+
+    def track_heavy_modules_for_metrics(self):
+        import subprocess
+        import sys
+        code = ("import sys; from seffybacktest import sharpe_ratio, calculate_var, ReturnMoments; "
+                "print(sum(m in sys.modules for m in ('yfinance', 'sklearn', 'scipy', 'matplotlib', 'tkinter')))")
+        return int(subprocess.check_output([sys.executable, "-c", code]))
+    track_heavy_modules_for_metrics.unit = "modules"
@@ -0,0 +1,134 @@
+"""
+Performance and risk metrics over a returns Series (1 column) or matrix.
+"""
+from seffybacktest import (adjusted_sharpe, annual_return, average_return, calculate_calmar_ratio, calculate_cvar,
+                           calculate_intraweek_variances, analyze_portfolio_volatility, calculate_portfolio_volatility,
+                           calculate_var, calendar_statistics, cornish_fisher_var, double_sharpe, drawdown_episodes,
+                           drawdown_series, drawdown_statistics, gaussian_var, max_drawdown, modified_sharpe, sharpe_ratio, sortino_ratio, tail_risk, treynor_ratio, ReturnMoments)
+from .common import ROWS, COLUMNS, RISK_FREE_RATE, skip_oversized, synthetic_returns
+
+
+class PerformanceMetrics:
+    params = (ROWS, COLUMNS)
+    param_names = ["rows", "columns"]
+    timeout = 300
+
+    def setup(self, rows, columns):
+        skip_oversized(rows, columns)
+        self.returns = synthetic_returns(rows, columns)
+
+    def time_sharpe_ratio(self, rows, columns):
+        sharpe_ratio(self.returns, RISK_FREE_RATE)
+
+    def time_sortino_ratio(self, rows, columns):
+        sortino_ratio(self.returns, RISK_FREE_RATE)
+
+    def time_adjusted_sharpe(self, rows, columns):
+        adjusted_sharpe(self.returns, RISK_FREE_RATE)
+
+    def time_modified_sharpe(self, rows, columns):
+        modified_sharpe(self.returns, RISK_FREE_RATE)
+
+    def time_double_sharpe(self, rows, columns):
+        double_sharpe(self.returns, RISK_FREE_RATE)
+
+    def time_treynor_ratio(self, rows, columns):
+        treynor_ratio(self.returns, 1.0, RISK_FREE_RATE)
+
+    def time_annual_return(self, rows, columns):
+        annual_return(self.returns)
+
+    def time_average_return(self, rows, columns):
+        average_return(self.returns)
+
+    def time_calmar_ratio(self, rows, columns):
+        calculate_calmar_ratio(self.returns)
+
+    def time_calmar_ratio_full_history(self, rows, columns):
+        calculate_calmar_ratio(self.returns, window=None)
+
+    def time_portfolio_volatility(self, rows, columns):
+        calculate_portfolio_volatility(self.returns, annualize=True)
+
+    def time_return_moments(self, rows, columns):
+        ReturnMoments.from_returns(self.returns)
+
+    def peakmem_sharpe_ratio(self, rows, columns):
+        sharpe_ratio(self.returns, RISK_FREE_RATE)
+
+
+class Drawdowns:
+    params = (ROWS, COLUMNS)
+    param_names = ["rows", "columns"]
+    timeout = 300
+
+    def setup(self, rows, columns):
+        skip_oversized(rows, columns)
+        self.returns = synthetic_returns(rows, columns)
+
+    def time_max_drawdown(self, rows, columns):
+        max_drawdown(self.returns)
+
+    def time_drawdown_series(self, rows, columns):
+        drawdown_series(self.returns)
+
+    def time_drawdown_statistics(self, rows, columns):
+        drawdown_statistics(self.returns)
+
+    def time_drawdown_episodes(self, rows, columns):
+        drawdown_episodes(self.returns, top=5)
+
+    def peakmem_drawdown_statistics(self, rows, columns):
+        drawdown_statistics(self.returns)
+
+class TailRisk:
+    params = (ROWS, COLUMNS)
+    param_names = ["rows", "columns"]
+    timeout = 300
+
+    def setup(self, rows, columns):
+        skip_oversized(rows, columns)
+        self.returns = synthetic_returns(rows, columns)
+
+    def time_var(self, rows, columns):
+        calculate_var(self.returns, 0.95)
+
+    def time_cvar(self, rows, columns):
+        calculate_cvar(self.returns, 0.95)
+
+    def time_gaussian_var(self, rows, columns):
+        gaussian_var(self.returns, 0.99)
+
+    def time_cornish_fisher_var(self, rows, columns):
+        cornish_fisher_var(self.returns, 0.99)
+
+    def time_tail_risk(self, rows, columns):
+        tail_risk(self.returns)
+
+    def peakmem_tail_risk(self, rows, columns):
+        tail_risk(self.returns)
+
+
+class CalendarStatistics:
+    params = (ROWS, COLUMNS)
+    param_names = ["rows", "columns"]
+    timeout = 300
+
+    def setup(self, rows, columns):
+        skip_oversized(rows, columns)
+        self.returns = synthetic_returns(rows, columns)
+
+    def time_calendar_statistics_week(self, rows, columns):
+        calendar_statistics(self.returns, "week")
+
+    def time_calendar_statistics_month(self, rows, columns):
+        calendar_statistics(self.returns, "month")
+
+    def time_calendar_statistics_day_of_week(self, rows, columns):
+        calendar_statistics(self.returns, "day_of_week")
+
+    def time_intraweek_variances(self, rows, columns):
+        calculate_intraweek_variances(self.returns)
+
+    def time_analyze_portfolio_volatility(self, rows, columns):
+        analyze_portfolio_volatility(self.returns)
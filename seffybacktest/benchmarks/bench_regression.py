@@ -0,0 +1,74 @@
+"""
+Factor regressions and benchmark comparisons that need no downloads.
+"""
+import numpy as np
+import pandas as pd
+from seffybacktest import (benchmark_statistics, bucket_codes, correlation_matrix, covariance_blocks, covariance_matrix,
+                           ols)
+from .common import ROWS, COLUMNS, RISK_FREE_RATE, skip_oversized, synthetic_returns
+
+
+class Regressions:
+    params = (ROWS, COLUMNS)
+    param_names = ["rows", "columns"]
+    timeout = 300
+
+    def setup(self, rows, columns):
+        skip_oversized(rows, columns)
+        self.returns = synthetic_returns(rows, columns)
+        factors = synthetic_returns(rows, 3, seed=1)
+        self.factors = factors.set_axis(["Mkt-RF", "SMB", "HML"], axis=1)
+        # The portfolio followed by `columns` benchmarks
+        benchmarks = synthetic_returns(rows, columns, seed=2)
+        self.combined = pd.concat([synthetic_returns(rows, 1, seed=3), benchmarks], axis=1)
+
+    def time_ols(self, rows, columns):
+        ols(self.returns, self.factors)
+
+    def time_benchmark_statistics(self, rows, columns):
+        benchmark_statistics(self.combined, RISK_FREE_RATE)
+
+
+class BucketCodes:
+    params = (ROWS, ["week", "month", "quarter", "year", "day_of_week"])
+    param_names = ["rows", "bucket"]
+
+    def setup(self, rows, bucket):
+        self.index = synthetic_returns(rows, 1).index
+
+    def time_bucket_codes(self, rows, bucket):
+        bucket_codes(self.index, bucket)
+
+
+class CovarianceMatrix:
+    # Ten years of daily returns; 10,000 assets gives an 800 MB matrix in float64
+    params = ([100, 1_000, 5_000], ["sample", "ewma", "ledoit_wolf"], ["float64", "float32"])
+    param_names = ["assets", "method", "dtype"]
+    timeout = 600
+
+    def setup(self, assets, method, dtype):
+        self.returns = synthetic_returns(2520, assets)
+        # One return in twenty missing, for the pairwise-complete path
+        holes = np.random.default_rng(4).random(self.returns.shape) < 0.05
+        self.gappy = self.returns.mask(holes)
+
+    def time_covariance_matrix(self, assets, method, dtype):
+        covariance_matrix(self.returns, method, dtype=dtype)
+
+    def time_covariance_matrix_pairwise(self, assets, method, dtype):
+        covariance_matrix(self.gappy, method, dtype=dtype)
+
+    def time_correlation_matrix(self, assets, method, dtype):
+        correlation_matrix(self.returns, method, dtype=dtype)
+
+    def peakmem_covariance_matrix_pairwise(self, assets, method, dtype):
+        covariance_matrix(self.gappy, method, dtype=dtype)
+
+    def time_covariance_blocks(self, assets, method, dtype):
+        # Tiles taken one at a time and dropped, as when each is written out; the full matrix is never held
+        for _ in covariance_blocks(self.gappy, method, dtype=dtype, block_size=256):
+            pass
+
+    def peakmem_covariance_blocks(self, assets, method, dtype):
+        for _ in covariance_blocks(self.gappy, method, dtype=dtype, block_size=256):
+            pass
@@ -0,0 +1,70 @@
+"""
+Rolling-window metrics and the streaming accumulator.
+"""
+from seffybacktest import (rolling_alpha, rolling_beta, rolling_calmar_ratio, rolling_max_drawdown, rolling_sharpe_ratio,
+                           rolling_sortino_ratio, rolling_var, rolling_volatility, ReturnAccumulator)
+from .common import ROWS, COLUMNS, RISK_FREE_RATE, skip_oversized, synthetic_returns
+
+
+class RollingMetrics:
+    params = (ROWS, COLUMNS)
+    param_names = ["rows", "columns"]
+    timeout = 300
+
+    def setup(self, rows, columns):
+        skip_oversized(rows, columns)
+        self.returns = synthetic_returns(rows, columns)
+        self.benchmark = synthetic_returns(rows, 1, seed=1)
+
+    def time_rolling_volatility(self, rows, columns):
+        rolling_volatility(self.returns, 252)
+
+    def time_rolling_sharpe_ratio(self, rows, columns):
+        rolling_sharpe_ratio(self.returns, 252, RISK_FREE_RATE)
+
+    def time_rolling_sortino_ratio(self, rows, columns):
+        rolling_sortino_ratio(self.returns, 252, RISK_FREE_RATE)
+
+    def time_rolling_beta(self, rows, columns):
+        rolling_beta(self.returns, self.benchmark, 252)
+
+    def time_rolling_alpha(self, rows, columns):
+        rolling_alpha(self.returns, self.benchmark, 252, RISK_FREE_RATE)
+
+    def time_rolling_var(self, rows, columns):
+        rolling_var(self.returns, 252, 0.95)
+
+    def time_rolling_max_drawdown(self, rows, columns):
+        rolling_max_drawdown(self.returns, 252)
+
+    def time_rolling_calmar_ratio(self, rows, columns):
+        rolling_calmar_ratio(self.returns, 252)
+
+    def peakmem_rolling_sharpe_ratio(self, rows, columns):
+        rolling_sharpe_ratio(self.returns, 252, RISK_FREE_RATE)
+
+
+class StreamingAccumulator:
+    # The accumulator follows one portfolio
+    params = list(ROWS)
+    param_names = ["rows"]
+    timeout = 300
+
+    def setup(self, rows):
+        self.returns = synthetic_returns(rows, 1).to_numpy()
+        self.benchmark = synthetic_returns(rows, 1, seed=1).to_numpy()
+
+    def time_update_many(self, rows):
+        accumulator = ReturnAccumulator(RISK_FREE_RATE)
+        accumulator.update_many(self.returns, self.benchmark)
+
+    def time_update_daily(self, rows):
+        # One update per day, as a live feed would call it, up to 10,000 days
+        accumulator = ReturnAccumulator(RISK_FREE_RATE)
+        for day in range(min(rows, 10_000)):
+            accumulator.update(self.returns[day], self.benchmark[day])
+
+    def time_read_metrics(self, rows):
+        accumulator = ReturnAccumulator(RISK_FREE_RATE)
+        accumulator.update_many(self.returns, self.benchmark)
+        accumulator.sharpe_ratio(), accumulator.sortino_ratio(), accumulator.calmar_ratio(), accumulator.beta()
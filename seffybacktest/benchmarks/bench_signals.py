@@ -0,0 +1,68 @@
+"""
+Technical indicators, portfolio simulation and signal backtests over a universe of assets.
+"""
+import numpy as np
+from seffybacktest import (calculate_momentum, calculate_rsi, cross_sectional_rank, momentum_signals, run_backtest,
+                           simulate_portfolio, size_positions)
+from .common import ROWS, COLUMNS, skip_oversized, synthetic_returns
+
+
+class TechnicalIndicators:
+    params = (ROWS, COLUMNS)
+    param_names = ["rows", "columns"]
+    timeout = 300
+
+    def setup(self, rows, columns):
+        skip_oversized(rows, columns)
+        self.returns = synthetic_returns(rows, columns)
+
+    def time_momentum(self, rows, columns):
+        calculate_momentum(self.returns, 14)
+
+    def time_momentum_signals(self, rows, columns):
+        # The 3, 6 and 12-month lookbacks less the last month (1M has nothing left after the skip)
+        momentum_signals(self.returns, {"3M": 63, "6M": 126, "12M": 252}, skip=21)
+
+    def time_rsi_sma(self, rows, columns):
+        calculate_rsi(self.returns, 14)
+
+    def time_rsi_wilder(self, rows, columns):
+        calculate_rsi(self.returns, 14, method="wilder")
+
+
+class Portfolios:
+    # Universes of assets: a single asset is the one-column case
+    params = (ROWS, COLUMNS)
+    param_names = ["rows", "assets"]
+    timeout = 300
+
+    def setup(self, rows, assets):
+        skip_oversized(rows, assets)
+        returns = synthetic_returns(rows, assets)
+        self.returns = returns.to_frame() if assets == 1 else returns
+        self.weights = np.full(assets, 1 / assets)
+        self.signals = self.returns.rolling(20, min_periods=1).mean()
+
+    def time_cross_sectional_rank(self, rows, assets):
+        cross_sectional_rank(self.signals)
+
+    def time_size_positions_rank(self, rows, assets):
+        size_positions(self.signals, "rank")
+
+    def time_simulate_portfolio_daily(self, rows, assets):
+        simulate_portfolio(self.returns, self.weights, "daily", transaction_cost=0.001)
+
+    def time_simulate_portfolio_monthly(self, rows, assets):
+        simulate_portfolio(self.returns, self.weights, "monthly", transaction_cost=0.001)
+
+    def time_simulate_portfolio_threshold(self, rows, assets):
+        simulate_portfolio(self.returns, self.weights, "never", threshold=0.05, transaction_cost=0.001)
+
+    def time_simulate_portfolio_float32(self, rows, assets):
+        simulate_portfolio(self.returns, self.weights, "monthly", transaction_cost=0.001, dtype="float32")
+
+    def time_run_backtest(self, rows, assets):
+        run_backtest(self.signals, self.returns, sizing="proportional", transaction_cost=0.001)
+
+    def peakmem_run_backtest(self, rows, assets):
+        run_backtest(self.signals, self.returns, sizing="proportional", transaction_cost=0.001)
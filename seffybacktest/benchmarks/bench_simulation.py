@@ -0,0 +1,59 @@
+"""
+Monte Carlo VaR and parameter sweeps.
+"""
+import numpy as np
+from seffybacktest import fit_simulation_model, parameter_grid, run_sweep, simulate_var, walk_forward_splits
+from .common import ROWS, use_offline_data, synthetic_returns
+
+
+class MonteCarlo:
+    params = ([100_000, 1_000_000], [1, 10], ["normal", "t", "fhs"])
+    param_names = ["paths", "assets", "method"]
+    timeout = 300
+
+    def setup(self, paths, assets, method):
+        returns = synthetic_returns(2520, assets)
+        self.returns = returns.to_frame() if assets == 1 else returns
+        self.weights = np.full(assets, 1 / assets)
+
+    def time_simulate_var(self, paths, assets, method):
+        simulate_var(self.returns, self.weights, method=method, n_paths=paths, seed=0)
+
+    def time_fit_simulation_model(self, paths, assets, method):
+        fit_simulation_model(self.returns, self.weights, method)
+
+    def peakmem_simulate_var(self, paths, assets, method):
+        simulate_var(self.returns, self.weights, method=method, n_paths=paths, seed=0)
+
+
+class Sweeps:
+    params = [1, 100]
+    param_names = ["portfolios"]
+    timeout = 300
+
+    def setup(self, portfolios):
+        use_offline_data()
+        self.returns = synthetic_returns(2520, portfolios)
+        self.grid = {"window": [20, 60, 120], "confidence_level": [0.95, 0.99], "risk_free_rate": [0.02, 0.0425]}
+        self.indicators = ["Sharpe Ratio", "Sortino Ratio", "VaR", "CVaR", "Calmar Ratio", "Portfolio Volatility"]
+
+    def time_run_sweep(self, portfolios):
+        run_sweep(self.returns, self.grid, self.indicators, processes=1)
+
+    def time_run_sweep_walk_forward(self, portfolios):
+        run_sweep(self.returns, self.grid, self.indicators, walk_forward={"train_size": 504, "test_size": 63},
+                  processes=1)
+
+    def time_parameter_grid(self, portfolios):
+        parameter_grid(self.grid)
+
+
+class WalkForwardSplits:
+    params = list(ROWS)
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        self.index = synthetic_returns(rows, 1).index
+
+    def time_walk_forward_splits(self, rows):
+        walk_forward_splits(self.index, 504, 63)
@@ -0,0 +1,120 @@
+"""
+Synthetic data and an offline stand-in for the market data providers, shared by the benchmarks.
+
+use_offline_data() points the caches at a fresh temporary directory and
+replaces the two functions that reach the network: price_cache._download
+(yfinance) and factor_store._download_zip (Kenneth French's data library).
+Prices are a seeded random walk per ticker, the same for a date whichever
+range is asked for, so incremental cache updates line up as they would with
+real data.
+"""
+import io
+import os
+import zipfile
+import tempfile
+import zlib
+import functools
+import numpy as np
+import pandas as pd
+
+# Sizes every metric is measured at. Combinations above MAX_CELLS are skipped
+# (10M rows x 5,000 columns would need 400 GB as float64).
+ROWS = (1_000, 100_000, 10_000_000)
+COLUMNS = (1, 100, 5_000)
+MAX_CELLS = 10_000_000
+
+RISK_FREE_RATE = 0.0425
+
+# First date of the synthetic price and factor histories
+HISTORY_START = "1990-01-01"
+
+# Columns of the synthetic Fama-French files, by dataset name in the URL
+_FACTOR_COLUMNS = {
+    "F-F_Research_Data_Factors_daily": ["Mkt-RF", "SMB", "HML", "RF"],
+    "F-F_Research_Data_5_Factors_2x3_daily": ["Mkt-RF", "SMB", "HML", "RMW", "CMA", "RF"],
+    "F-F_Momentum_Factor_daily": ["Mom"],
+}
+
+
+def skip_oversized(rows, columns):
+    # asv skips a benchmark whose setup raises NotImplementedError
+    if rows * columns > MAX_CELLS:
+        raise NotImplementedError(f"{rows} x {columns} is above {MAX_CELLS} cells")
+
+
+def synthetic_index(rows):
+    # Business days while they fit in the calendar, minutes beyond that
+    return pd.date_range("2000-01-03", periods=rows, freq="B" if rows <= 10_000 else "min", name="Date")
+
+
+@functools.lru_cache(maxsize=4)
+def synthetic_returns(rows, columns, seed=0):
+    """
+    Daily returns of `columns` portfolios over `rows` dates: a Series for one column, a DataFrame otherwise.
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0.0003, 0.01, (rows, columns))
+    index = synthetic_index(rows)
+    if columns == 1:
+        return pd.Series(values[:, 0], index=index, name="Portfolio")
+    return pd.DataFrame(values, index=index, columns=[f"P{i}" for i in range(columns)])
+
+
+def tickers(count):
+    return [f"T{i:04d}" for i in range(count)]
+
+
+# Number of requests that reached the stand-in providers
+downloads = []
+
+
+def synthetic_prices(ticker, start_date, end_date):
+    """
+    Stand-in for price_cache._download: adjusted close prices over [start_date, end_date).
+    """
+    downloads.append((ticker, start_date, end_date))
+    days = pd.bdate_range(HISTORY_START, pd.Timestamp(end_date) - pd.Timedelta(days=1), name="Date")
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    prices = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(days))))
+    prices = pd.Series(prices, index=days, name=ticker)
+    return prices.loc[prices.index >= pd.Timestamp(start_date)]
+
+
+def synthetic_factor_zip(url):
+    """
+    Stand-in for factor_store._download_zip: a zipped CSV in the layout of Kenneth French's files.
+    """
+    downloads.append((url, None, None))
+    name = url.rsplit("/", 1)[-1].replace("_CSV.zip", "")
+    columns = _FACTOR_COLUMNS[name]
+    days = pd.bdate_range(HISTORY_START, pd.Timestamp.now().normalize() - pd.Timedelta(days=1))
+    rng = np.random.default_rng(zlib.crc32(name.encode()))
+    values = rng.normal(0.02, 0.5, (len(days), len(columns)))
+
+    lines = ["This file was created by the seffybacktest benchmarks.", "", "," + ",".join(columns)]
+    dates = days.strftime("%Y%m%d")
+    lines += [f"{date}," + ",".join(f"{value:.2f}" for value in row) for date, row in zip(dates, values)]
+    lines += ["", "Copyright synthetic data"]
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(name + ".CSV", "\n".join(lines))
+    return buffer.getvalue()
+
+
+def use_offline_data():
+    """
+    Route every download to the synthetic providers and use an empty cache directory.
+
+    Returns:
+    str: The cache directory
+    """
+    from seffybacktest import price_cache, factor_store
+
+    cache_dir = tempfile.mkdtemp(prefix="seffybacktest-bench-")
+    os.environ["SEFFYBACKTEST_CACHE_DIR"] = cache_dir
+    price_cache._download = synthetic_prices
+    factor_store._download_zip = synthetic_factor_zip
+    factor_store._loaded.clear()
+    del downloads[:]
+    return cache_dir
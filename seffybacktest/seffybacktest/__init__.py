@@ -1,23 +1,85 @@
-from .adjusted_sharpe import adjusted_sharpe
-from .annual_return import annual_return
-from .average_returns import average_return
-from .benchmarking import get_benchmark_returns, benchmark_portfolio, run_benchmark_analysis
-from .calmar_ratio import calculate_calmar_ratio
-from .capm_calculation import calculate_market_return, calculate_capm
-from .correlation import correlation_with_index
-from .cvar_calculator import calculate_cvar
-from .double_sharpe import double_sharpe
-from .famafrench import get_fama_french_factors, calculate_fama_french
-from .get_portfolio_returns import get_portfolio_returns
-from .intraweek_variances import calculate_intraweek_variances, analyze_portfolio_volatility
-from .market_alpha import alpha
-from .market_beta import beta
-from .modified_sharpe import modified_sharpe
-from .momentum import calculate_momentum
-from .rsi import calculate_rsi
-from .seffybacktest import create_ui, seffybacktest
-from .sharpe_ratio import sharpe_ratio, get_risk_free_rate
-from .sortino_ratio import sortino_ratio
-from .treynor_ratio import treynor_ratio
-from .var_calculator import calculate_var
-from .volatility import calculate_portfolio_volatility
+import sys
+import types
+import importlib
+
+# Public names and the submodule defining each. Submodules are imported on
+# first use (PEP 562), so `import seffybacktest` stays cheap and heavy
+# dependencies only load when something needs them.
+_EXPORTS = {
+    "adjusted_sharpe": ["adjusted_sharpe"],
+    "annual_return": ["annual_return"],
+    "average_returns": ["average_return"],
+    "backtest": ["run_backtest", "size_positions", "backtest_report", "SIZING_METHODS"],
+    "batch": ["run_batch", "analyze_portfolio", "load_returns"],
+    "benchmarking": ["get_benchmark_returns", "benchmark_portfolio", "benchmark_statistics",
+                     "run_benchmark_analysis"],
+    "calendar_buckets": ["calendar_statistics", "bucket_codes", "CALENDAR_BUCKETS"],
+    "calmar_ratio": ["calculate_calmar_ratio"],
+    "capm_calculation": ["calculate_market_return", "calculate_capm"],
+    "correlation": ["correlation_with_index"],
+    "covariance": ["covariance_matrix", "correlation_matrix", "covariance_blocks", "COVARIANCE_METHODS"],
+    "cvar_calculator": ["calculate_cvar"],
+    "double_sharpe": ["double_sharpe"],
+    "drawdown": ["max_drawdown", "drawdown_series", "drawdown_statistics", "drawdown_episodes"],
+    "factor_store": ["load_factors", "FACTOR_DATASETS"],
+    "fetch_scheduler": ["FetchScheduler", "TokenBucket", "current_scheduler"],
+    "famafrench": ["get_fama_french_factors", "calculate_fama_french"],
+    "indicators": ["INDICATORS", "calculate_indicators"],
+    "ingest": ["iter_returns", "return_moments", "ingest_returns", "summarize_returns"],
+    "instrumentation": ["Trace", "current_trace"],
+    "get_portfolio_returns": ["get_portfolio_returns", "get_asset_returns"],
+    "intraweek_variances": ["calculate_intraweek_variances", "analyze_portfolio_volatility"],
+    "market_alpha": ["alpha"],
+    "market_beta": ["beta"],
+    "modified_sharpe": ["modified_sharpe"],
+    "moments": ["ReturnMoments"],
+    "portfolio": ["simulate_portfolio", "REBALANCE_SCHEDULES"],
+    "price_cache": ["download_prices", "evict_price_cache", "clear_price_cache"],
+    "momentum": ["calculate_momentum", "momentum_signals", "cross_sectional_rank", "MOMENTUM_LOOKBACKS"],
+    "monte_carlo": ["simulate_var", "fit_simulation_model"],
+    "regression": ["ols"],
+    "return_store": ["ReturnStore"],
+    "rolling": ["rolling_sharpe_ratio", "rolling_sortino_ratio", "rolling_volatility", "rolling_beta",
+                "rolling_alpha", "rolling_var", "rolling_max_drawdown", "rolling_calmar_ratio"],
+    "rsi": ["calculate_rsi", "RSI_METHODS"],
+    "session": ["MarketDataSession", "get_index_returns", "get_returns", "current_session"],
+    "seffybacktest": ["create_ui", "seffybacktest"],
+    "sharpe_ratio": ["sharpe_ratio", "get_risk_free_rate"],
+    "sortino_ratio": ["sortino_ratio"],
+    "streaming": ["ReturnAccumulator"],
+    "sweep": ["run_sweep", "parameter_grid", "walk_forward_splits"],
+    "tail_risk": ["tail_risk", "gaussian_var", "cornish_fisher_var"],
+    "treynor_ratio": ["treynor_ratio"],
+    "var_calculator": ["calculate_var"],
+    "volatility": ["calculate_portfolio_volatility"],
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # The import system sets each submodule on the package once it has
+        # loaded. Bind the submodule's exports then, so a function named after
+        # its module (sharpe_ratio, seffybacktest, ...) wins over the module.
+        super().__setattr__(name, value)
+        if isinstance(value, types.ModuleType) and value.__name__ == f"{__name__}.{name}":
+            for export in _EXPORTS.get(name, ()):
+                super().__setattr__(export, getattr(value, export))
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __getattr__(name):
+    module_name = _MODULE_OF.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
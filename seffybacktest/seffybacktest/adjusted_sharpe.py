@@ -1,6 +1,5 @@
-import pandas as pd
 import numpy as np
-from scipy import stats
+from .moments import ReturnMoments
 from .sharpe_ratio import get_risk_free_rate
 
 def adjusted_sharpe(portfolio_returns, risk_free_rate=None):
@@ -8,11 +7,11 @@ def adjusted_sharpe(portfolio_returns, risk_free_rate=None):
     Calculate the Adjusted Sharpe Ratio for Skewness for a given portfolio.
 
     Parameters:
-    portfolio_returns (pd.Series): Daily returns of the portfolio
+    portfolio_returns (pd.Series, pd.DataFrame or ReturnMoments): Daily returns of the portfolio, one column per portfolio, or their moments
     risk_free_rate (float): Annual risk-free rate. If None, it will be fetched using get_risk_free_rate()
 
     Returns:
-    float: Adjusted Sharpe Ratio for Skewness
+    float: Adjusted Sharpe Ratio for Skewness (pd.Series keyed by portfolio for a returns matrix)
     """
     if risk_free_rate is None:
         risk_free_rate = get_risk_free_rate()
@@ -20,18 +19,16 @@ def adjusted_sharpe(portfolio_returns, risk_free_rate=None):
     # Convert annual risk-free rate to daily rate
     daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
 
-    # Calculate excess returns
-    excess_returns = portfolio_returns - daily_risk_free_rate
+    moments = ReturnMoments.of(portfolio_returns, daily_risk_free_rate)
 
     # Calculate annualized Sharpe ratio
-    sharpe_ratio = np.sqrt(252) * excess_returns.mean() / excess_returns.std()
+    sharpe_ratio = np.sqrt(252) * (moments.mean - daily_risk_free_rate) / moments.std()
 
-    # Calculate skewness and kurtosis
-    skewness = stats.skew(excess_returns)
-    kurtosis = stats.kurtosis(excess_returns)
+    # Skewness and kurtosis are unaffected by subtracting the risk-free rate
+    skewness = moments.skewness
+    kurtosis = moments.kurtosis
 
     # Calculate adjusted Sharpe ratio
     adjusted_sharpe = sharpe_ratio * (1 + (skewness / 6) * sharpe_ratio - ((kurtosis - 3) / 24) * sharpe_ratio**2)
 
-    return adjusted_sharpe
-
+    return moments.wrap(adjusted_sharpe)
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+from .indicators import INDICATORS, BENCHMARK_INDICATORS, calculate_indicators
+from .momentum import cross_sectional_rank
+from .portfolio import _rebalance_daily
+
+SIZING_METHODS = ("weights", "sign", "proportional", "rank")
+
+
+def _fill_to_gross(values, gross, max_weight):
+    # Scale up the positions below the cap until each date is back at `gross`; every pass
+    # caps at least one more asset on the dates still short, so it ends within one pass per asset
+    for _ in range(values.shape[1]):
+        magnitudes = np.abs(values)
+        capped = magnitudes >= max_weight
+        shortfall = gross - magnitudes.sum(axis=1, keepdims=True)
+        free = np.where(capped, 0.0, magnitudes).sum(axis=1, keepdims=True)
+        short = (shortfall > 1e-12 * gross) & (free > 0)
+        if not short.any():
+            break
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = np.where(short, 1 + shortfall / free, 1.0)
+        values = np.where(capped, values, np.clip(values * scale, -max_weight, max_weight))
+    return values
+
+
+def size_positions(signals, sizing="weights", leverage=1.0, long_only=False, max_weight=None, max_leverage=None):
+    """
+    Turn signals into portfolio weights, one row per date.
+
+    Parameters:
+    signals (pd.DataFrame): Signal per date (rows) and asset (columns). Missing signals mean no position.
+    sizing (str): "weights" to use the signals as weights, "sign" for equal weights long the positive
+                  and short the negative signals, "proportional" for weights proportional to the
+                  signals, or "rank" for a dollar-neutral book weighted by cross-sectional rank.
+                  Apart from "weights", the absolute weights of each date sum to `leverage`.
+    leverage (float): Gross exposure of the sized positions (default: 1)
+    long_only (bool): Drop short positions (default: False)
+    max_weight (float): Largest absolute weight of a single asset. Apart from "weights", what is cut
+                        from the capped assets goes to the others in proportion, so the gross exposure
+                        stays `leverage` unless fewer than leverage / max_weight assets have a position
+    max_leverage (float): Largest gross exposure; dates above it are scaled down
+
+    Returns:
+    pd.DataFrame: Weights with the same shape as the signals
+    """
+    if sizing not in SIZING_METHODS:
+        raise ValueError(f"Unknown sizing {sizing!r}. Choose from {SIZING_METHODS}")
+
+    values = signals.to_numpy(dtype=float)
+    if sizing == "rank":
+        ranks = cross_sectional_rank(signals).to_numpy()
+        # Centre the ranks of each date so longs and shorts balance
+        counts = (~np.isnan(ranks)).sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = ranks - np.nansum(ranks, axis=1, keepdims=True) / counts
+    values = np.nan_to_num(values)
+
+    if sizing == "sign":
+        values = np.sign(values)
+    if long_only:
+        values = np.clip(values, 0.0, None)
+    if sizing != "weights":
+        gross = np.abs(values).sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.where(gross > 0, leverage * values / gross, 0.0)
+    elif leverage != 1.0:
+        values = leverage * values
+
+    if max_weight is not None:
+        values = np.clip(values, -max_weight, max_weight)
+        if sizing != "weights":
+            values = _fill_to_gross(values, leverage, max_weight)
+    if max_leverage is not None:
+        gross = np.abs(values).sum(axis=1, keepdims=True)
+        values = np.where(gross > max_leverage, values * (max_leverage / np.maximum(gross, max_leverage)), values)
+    return pd.DataFrame(values, index=signals.index, columns=signals.columns)
+
+
+def run_backtest(signals, asset_returns, sizing="weights", lag=1, transaction_cost=0.0, slippage=0.0,
+                 leverage=1.0, long_only=False, max_weight=None, max_leverage=None, dtype="float64",
+                 chunk_size=252, return_positions=False):
+    """
+    Backtest a signal: size positions, trade them `lag` days later and pay for the turnover.
+
+    The positions of each date are sized from the signals known `lag` days
+    earlier (lag=1 trades at the close the signal was computed on and earns
+    the next day's return), held every day at their target weights and
+    charged for the turnover against the previous day's drifted weights.
+    There is no loop over days: the dates are processed in vectorized chunks
+    of `chunk_size`, so only one chunk of positions is in memory at a time.
+
+    Parameters:
+    signals (pd.DataFrame): Signal per date (rows) and asset (columns), aligned to the asset returns
+    asset_returns (pd.DataFrame): Daily returns with one column per asset (see get_asset_returns)
+    sizing (str): How signals become weights, one of SIZING_METHODS (see size_positions)
+    lag (int): Days between a signal and the returns it earns (default: 1)
+    transaction_cost (float): Commission per unit of turnover, e.g. 0.001 for 10 basis points (default: 0)
+    slippage (float): Price impact per unit of turnover, charged like the commission (default: 0)
+    leverage (float): Gross exposure of the sized positions (default: 1)
+    long_only (bool): Drop short positions (default: False)
+    max_weight (float): Largest absolute weight of a single asset (see size_positions)
+    max_leverage (float): Largest gross exposure
+    dtype (str): "float64" (default) or "float32"
+    chunk_size (int): Number of days processed at once (default: 252)
+    return_positions (bool): Also return the weights held on every day (default: False)
+
+    Returns:
+    dict: "returns" (net of costs), "gross_returns", "turnover", "costs", "gross_exposure" and
+          "net_exposure" as pd.Series, and "positions" (pd.DataFrame) if return_positions is True
+    """
+    if lag < 0:
+        raise ValueError("lag must not be negative, or the backtest would trade on future signals")
+
+    dtype = np.dtype(dtype)
+    if not (signals.index.equals(asset_returns.index) and signals.columns.equals(asset_returns.columns)):
+        signals = signals.reindex(index=asset_returns.index, columns=asset_returns.columns)
+    n_days, n_assets = asset_returns.shape
+
+    gross = np.zeros(n_days, dtype=dtype)
+    turnover = np.zeros(n_days, dtype=dtype)
+    gross_exposure = np.zeros(n_days, dtype=dtype)
+    net_exposure = np.zeros(n_days, dtype=dtype)
+    positions = []
+    drifted = np.zeros(n_assets, dtype=dtype)
+
+    for start in range(0, n_days, chunk_size):
+        stop = min(start + chunk_size, n_days)
+        # Positions held on days start..stop come from the signals `lag` days earlier
+        held = np.zeros((stop - start, n_assets), dtype=dtype)
+        first = max(start - lag, 0)
+        if stop - lag > first:
+            sized = size_positions(signals.iloc[first:stop - lag], sizing, leverage, long_only,
+                                   max_weight, max_leverage)
+            held[first + lag - start:] = sized.to_numpy(dtype=dtype)
+
+        returns = np.nan_to_num(asset_returns.iloc[start:stop].to_numpy(dtype=dtype))
+        gross[start:stop], turnover[start:stop], drifted = _rebalance_daily(held, returns, drifted)
+        gross_exposure[start:stop] = np.abs(held).sum(axis=1)
+        net_exposure[start:stop] = held.sum(axis=1)
+        if return_positions:
+            positions.append(held)
+
+    costs = (transaction_cost + slippage) * turnover
+    # Costs are paid before the day's return, out of the portfolio value
+    net = (1 - costs) * (1 + gross) - 1
+
+    index = asset_returns.index
+    result = {
+        "returns": pd.Series(net, index=index),
+        "gross_returns": pd.Series(gross, index=index),
+        "turnover": pd.Series(turnover, index=index),
+        "costs": pd.Series(costs, index=index),
+        "gross_exposure": pd.Series(gross_exposure, index=index),
+        "net_exposure": pd.Series(net_exposure, index=index),
+    }
+    if return_positions:
+        held = np.concatenate(positions) if positions else np.zeros((0, n_assets), dtype=dtype)
+        result["positions"] = pd.DataFrame(held, index=index, columns=asset_returns.columns)
+    return result
+
+
+def backtest_report(backtest, selected_indicators=None, risk_free_rate=0.0425, ticker=None, show=False, **kwargs):
+    """
+    Calculate indicators for the returns of a backtest, with its trading statistics.
+
+    Parameters:
+    backtest (dict): Result of run_backtest (or simulate_portfolio)
+    selected_indicators (list): Names of the indicators to calculate, from INDICATORS. By default every
+                                indicator, leaving out the benchmark indicators if there is no ticker.
+    risk_free_rate (float): Annual risk-free rate (default: 4.25%)
+    ticker (str): Benchmark index for the indicators in BENCHMARK_INDICATORS
+    show (bool): Display the results in the results window of seffybacktest (default: False)
+    **kwargs: Passed on to calculate_indicators (annualize, confidence_levels, ...)
+
+    Returns:
+    dict: Indicator values keyed by indicator name, followed by "Average Daily Turnover",
+          "Total Costs" and, for run_backtest results, "Average Gross Exposure"
+    """
+    if selected_indicators is None:
+        selected_indicators = [indicator for indicator in INDICATORS
+                               if ticker is not None or indicator not in BENCHMARK_INDICATORS]
+
+    results = calculate_indicators(backtest["returns"], selected_indicators, risk_free_rate, ticker, **kwargs)
+    results["Average Daily Turnover"] = float(backtest["turnover"].mean())
+    results["Total Costs"] = float(backtest["costs"].sum())
+    if "gross_exposure" in backtest:
+        results["Average Gross Exposure"] = float(backtest["gross_exposure"].mean())
+
+    if show:
+        from .seffybacktest import create_ui
+        create_ui(results, momentum=results.get("Momentum"), rsi=results.get("RSI"))
+    return results
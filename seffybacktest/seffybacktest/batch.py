@@ -0,0 +1,202 @@
+import os
+import json
+import argparse
+import datetime as dt
+import numpy as np
+import pandas as pd
+from .benchmarking import run_benchmark_analysis
+from .indicators import INDICATORS, BENCHMARK_INDICATORS, calculate_indicators
+from .instrumentation import Trace, span
+from .session import MarketDataSession
+
+DEFAULT_CONFIG = {
+    "indicators": [indicator for indicator in INDICATORS if indicator not in ("Momentum", "RSI")],
+    "risk_free_rate": 0.0425,
+    "benchmarks": ["^GSPC"],
+    "confidence_levels": [0.95],
+    "annualize_volatility": False,
+    "benchmark_analysis": False,
+}
+
+
+def load_config(config=None):
+    """
+    Read a batch configuration and fill in the defaults.
+
+    A configuration lists the indicators to calculate (names from INDICATORS),
+    the annual risk-free rate, the benchmark tickers, the VaR/CVaR confidence
+    levels, whether to annualize volatility and whether to run the multi-index
+    benchmark analysis, e.g.
+
+        {"indicators": ["Sharpe Ratio", "VaR", "Market Beta"],
+         "risk_free_rate": 0.0425,
+         "benchmarks": ["^GSPC", "^IXIC"],
+         "confidence_levels": [0.95, 0.99]}
+
+    Parameters:
+    config (dict or str): Configuration, or the path of a JSON file holding it
+
+    Returns:
+    dict: Complete configuration
+    """
+    if isinstance(config, (str, os.PathLike)):
+        with open(config) as f:
+            config = json.load(f)
+    config = {**DEFAULT_CONFIG, **(config or {})}
+
+    unknown = [indicator for indicator in config["indicators"] if indicator not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicators {unknown}. Choose from {INDICATORS}")
+    return config
+
+
+def load_returns(path):
+    """
+    Read daily returns from a CSV or Parquet file indexed by date.
+
+    Parameters:
+    path (str): File with a date column first (CSV) or a date index (Parquet), and one column per portfolio
+
+    Returns:
+    pd.DataFrame: Daily returns with a DatetimeIndex
+    """
+    if str(path).endswith(".parquet"):
+        returns = pd.read_parquet(path)
+    else:
+        returns = pd.read_csv(path, index_col=0)
+    returns.index = pd.to_datetime(returns.index)
+    return returns
+
+
+def analyze_portfolio(portfolio_returns, config=None):
+    """
+    Calculate the configured indicators for one portfolio without any user interaction.
+
+    Parameters:
+    portfolio_returns (pd.Series): Daily returns of the portfolio
+    config (dict or str): Batch configuration (see load_config)
+
+    Returns:
+    dict: "indicators" with the benchmark-free indicators, "benchmarks" with the benchmark
+          indicators per ticker, and "benchmark_analysis" if requested
+    """
+    config = load_config(config)
+    risk_free_rate = config["risk_free_rate"]
+    benchmarked = [indicator for indicator in config["indicators"] if indicator in BENCHMARK_INDICATORS]
+    standalone = [indicator for indicator in config["indicators"] if indicator not in BENCHMARK_INDICATORS]
+
+    results = {
+        "indicators": calculate_indicators(portfolio_returns, standalone, risk_free_rate,
+                                           annualize=config["annualize_volatility"],
+                                           confidence_levels=config["confidence_levels"])
+    }
+    if benchmarked:
+        results["benchmarks"] = {ticker: calculate_indicators(portfolio_returns, benchmarked, risk_free_rate, ticker)
+                                 for ticker in config["benchmarks"]}
+    if config["benchmark_analysis"]:
+        _, results["benchmark_analysis"] = run_benchmark_analysis(portfolio_returns, risk_free_rate,
+                                                                  config["benchmarks"])
+    return results
+
+
+def run_batch(returns, config=None, output_path=None):
+    """
+    Analyze every portfolio in a returns file (or frame) and optionally write the results.
+
+    Parameters:
+    returns (str, pd.Series or pd.DataFrame): Returns file path, or daily returns with one column per portfolio
+    config (dict or str): Batch configuration (see load_config)
+    output_path (str): Write the results here, as Parquet if the path ends in .parquet and JSON otherwise
+
+    Returns:
+    dict: Results of analyze_portfolio keyed by portfolio
+    """
+    config = load_config(config)
+    if isinstance(returns, (str, os.PathLike)):
+        returns = load_returns(returns)
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame(returns.name or "Portfolio")
+
+    # One session for the whole batch, so each benchmark is downloaded once for all portfolios
+    results = {}
+    with MarketDataSession():
+        for portfolio in returns:
+            with span("portfolio", str(portfolio)):
+                results[str(portfolio)] = analyze_portfolio(returns[portfolio].dropna(), config)
+
+    if output_path is not None:
+        write_results(results, output_path)
+    return results
+
+
+def _to_json(value):
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    if isinstance(value, pd.Series):
+        return {str(key.date()) if isinstance(key, pd.Timestamp) else str(key): _to_json(item)
+                for key, item in value.items()}
+    if isinstance(value, (dt.date, pd.Timestamp)):
+        return value.isoformat()
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def results_to_frame(results):
+    """
+    Flatten batch results into one row per (portfolio, benchmark, indicator) scalar value.
+
+    Time series results (momentum, RSI) are left out.
+
+    Returns:
+    pd.DataFrame: Columns portfolio, benchmark, indicator and value
+    """
+    rows = []
+    for portfolio, result in results.items():
+        for indicator, value in result["indicators"].items():
+            rows.append((portfolio, None, indicator, value))
+        for ticker, values in result.get("benchmarks", {}).items():
+            for indicator, value in values.items():
+                rows.append((portfolio, ticker, indicator, value))
+        for measure, values in (result.get("benchmark_analysis") or {}).items():
+            for benchmark, value in values.items():
+                rows.append((portfolio, benchmark, measure, value))
+
+    rows = [(portfolio, benchmark, indicator, float(value)) for portfolio, benchmark, indicator, value in rows
+            if isinstance(value, (int, float, np.number))]
+    return pd.DataFrame(rows, columns=["portfolio", "benchmark", "indicator", "value"])
+
+
+def write_results(results, path):
+    """
+    Write batch results as Parquet (tidy scalar table) or JSON (everything), chosen by file extension.
+    """
+    if str(path).endswith(".parquet"):
+        results_to_frame(results).to_parquet(path, index=False)
+    else:
+        with open(path, "w") as f:
+            json.dump(_to_json(results), f, indent=2)
+
+
+def main(argv=None):
+    """
+    Command-line entry point: seffybacktest-batch RETURNS [--config CONFIG] [--output OUTPUT] [--trace TRACE]
+    """
+    parser = argparse.ArgumentParser(description="Run the Seffy Backtest indicators on a returns file without a display.")
+    parser.add_argument("returns", help="CSV or Parquet file of daily returns, dates first, one column per portfolio")
+    parser.add_argument("--config", help="JSON file listing indicators, risk_free_rate, benchmarks and confidence_levels")
+    parser.add_argument("--output", help="Results file (.json or .parquet). Prints JSON to stdout if omitted")
+    parser.add_argument("--trace", help="Append the timing of every indicator, download and cache lookup to this "
+                                        "file as JSON lines")
+    args = parser.parse_args(argv)
+
+    if args.trace is None:
+        results = run_batch(args.returns, args.config, args.output)
+    else:
+        with Trace(args.trace):
+            results = run_batch(args.returns, args.config, args.output)
+    if args.output is None:
+        print(json.dumps(_to_json(results), indent=2))
+    return 0
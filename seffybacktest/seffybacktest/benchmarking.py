@@ -1,7 +1,6 @@
+import numpy as np
 import pandas as pd
-import yfinance as yf
-from .market_beta import beta
-from .market_alpha import alpha
+from .session import get_returns
 
 # Define the available indices with more detailed information
 indices = {
@@ -16,82 +15,177 @@ indices = {
 
 def get_benchmark_returns(tickers, start_date, end_date):
     """
-    Fetch benchmark returns from Yahoo Finance for multiple indices.
+    Fetch benchmark returns from Yahoo Finance (or the active session's ReturnStore) for multiple indices.
     """
-    data = yf.download(tickers, start=start_date, end=end_date)['Adj Close']
-    benchmark_returns = data.pct_change(fill_method=None).dropna()
+    benchmark_returns = get_returns(tickers, start_date, end_date).dropna()
     return benchmark_returns
 
-def benchmark_portfolio(portfolio_returns, selected_indices):
+def benchmark_portfolio(portfolio_returns, selected_indices, dropna=True):
     """
     Benchmark the portfolio returns against the selected benchmark returns.
+
+    Parameters:
+    portfolio_returns (pd.Series): Daily returns of the portfolio
+    selected_indices (list): Entries of `indices` to compare against
+    dropna (bool): Keep only the dates on which the portfolio and every benchmark have a return
+                   (default). With False each benchmark keeps its own trading days and the others'
+                   returns are NaN on the days it is closed, for benchmark_statistics
+
+    Returns:
+    pd.DataFrame: Daily returns, the portfolio in the first column and one column per benchmark
     """
     start_date = (portfolio_returns.index.min() - pd.Timedelta(days=5)).strftime('%Y-%m-%d')
-    end_date = portfolio_returns.index.max().strftime('%Y-%m-%d')
+    # The end date is exclusive, so go one day past the last portfolio return
+    end_date = (portfolio_returns.index.max() + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
     
     tickers = [index['Ticker'] for index in selected_indices]
-    benchmark_returns = get_benchmark_returns(tickers, start_date, end_date)
+    if dropna:
+        benchmark_returns = get_benchmark_returns(tickers, start_date, end_date)
+    else:
+        benchmark_returns = get_returns(tickers, start_date, end_date)
     
     combined_returns = pd.concat([portfolio_returns, benchmark_returns], axis=1)
     combined_returns.columns = ['Portfolio'] + [index['Full Name'] for index in selected_indices]
     
-    combined_returns = combined_returns.dropna()
+    if dropna:
+        combined_returns = combined_returns.dropna()
+    else:
+        combined_returns = combined_returns[combined_returns.iloc[:, 0].notna()]
     
     return combined_returns
 
-def run_benchmark_analysis(portfolio_returns, risk_free_rate):
+def benchmark_statistics(combined_returns, risk_free_rate):
+    """
+    Compare the portfolio with every benchmark at once from their aligned returns.
+
+    All statistics are column-wise matrix operations on the frame returned by
+    benchmark_portfolio, so any number of benchmarks costs one pass and no
+    further downloads. Each benchmark's statistics use the days both it and
+    the portfolio have a return, so markets with other holidays are compared
+    on their own trading days.
+
+    Parameters:
+    combined_returns (pd.DataFrame): Daily returns, the portfolio in the first column and one
+                                     column per benchmark, NaN where a market was closed
+    risk_free_rate (float): Annual risk-free rate used for the alphas
+
+    Returns:
+    pd.DataFrame: One row per benchmark with the columns beta, alpha (annualized), correlation,
+                  tracking_error and information_ratio (annualized), up_capture and down_capture
+    """
+    portfolio = combined_returns.iloc[:, 0].to_numpy(dtype=float)
+    benchmarks = combined_returns.iloc[:, 1:].to_numpy(dtype=float)
+    daily_rf = (1 + risk_free_rate) ** (1/252) - 1
+
+    # Days each benchmark shares with the portfolio; sums over the others are zeroed out
+    valid = ~np.isnan(portfolio)[:, np.newaxis] & ~np.isnan(benchmarks)
+    counts = valid.sum(axis=0)
+    portfolio_values = np.where(valid, portfolio[:, np.newaxis], 0.0)
+    benchmark_values = np.where(valid, benchmarks, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        portfolio_means = portfolio_values.sum(axis=0) / counts
+        benchmark_means = benchmark_values.sum(axis=0) / counts
+        portfolio_deviations = np.where(valid, portfolio_values - portfolio_means, 0.0)
+        benchmark_deviations = np.where(valid, benchmark_values - benchmark_means, 0.0)
+        co_moments = np.einsum('ij,ij->j', portfolio_deviations, benchmark_deviations)
+        benchmark_squares = np.einsum('ij,ij->j', benchmark_deviations, benchmark_deviations)
+        portfolio_squares = np.einsum('ij,ij->j', portfolio_deviations, portfolio_deviations)
+
+        betas = co_moments / benchmark_squares
+        correlations = co_moments / np.sqrt(benchmark_squares * portfolio_squares)
+
+        # Intercept of the excess portfolio returns regressed on the excess benchmark returns
+        alphas = (portfolio_means - daily_rf) - betas * (benchmark_means - daily_rf)
+        alphas = (1 + alphas) ** 252 - 1
+
+        active_returns = portfolio_values - benchmark_values
+        active_means = active_returns.sum(axis=0) / counts
+        active_deviations = np.where(valid, active_returns - active_means, 0.0)
+        tracking_errors = np.sqrt(np.einsum('ij,ij->j', active_deviations, active_deviations) / (counts - 1))
+        tracking_errors = tracking_errors * np.sqrt(252)
+        information_ratios = active_means * 252 / tracking_errors
+
+        # Mean portfolio return over mean benchmark return, on the days the benchmark rose (fell)
+        up, down = benchmark_values > 0, benchmark_values < 0
+        up_capture = np.einsum('ij,ij->j', portfolio_values, up) / np.einsum('ij,ij->j', benchmark_values, up)
+        down_capture = np.einsum('ij,ij->j', portfolio_values, down) / np.einsum('ij,ij->j', benchmark_values, down)
+
+    return pd.DataFrame({
+        "beta": betas,
+        "alpha": alphas,
+        "correlation": correlations,
+        "tracking_error": tracking_errors,
+        "information_ratio": information_ratios,
+        "up_capture": up_capture,
+        "down_capture": down_capture,
+    }, index=combined_returns.columns[1:])
+
+def _index_for_ticker(ticker):
+    for index in indices.values():
+        if index['Ticker'] == ticker:
+            return index
+    return {"Ticker": ticker, "Full Name": ticker, "Usage": ""}
+
+def run_benchmark_analysis(portfolio_returns, risk_free_rate, tickers=None):
     """
     Run the benchmarking analysis based on user input.
     
     Parameters:
     portfolio_returns (pd.Series): Daily returns of the portfolio
+    risk_free_rate (float): Annual risk-free rate used for the alphas
+    tickers (list): Benchmark tickers to compare against. If given, the analysis runs without
+                    prompting, printing or offering to save; otherwise the user picks from the menu
     
     Returns:
     pd.DataFrame: DataFrame with portfolio and benchmark returns
     dict: Additional analysis results
     """
-    # Display the menu
-    print("Available benchmark indices:")
-    for key, value in indices.items():
-        print(f"{key}: {value['Ticker']}: {value['Full Name']}: {value['Usage']}")
+    interactive = tickers is None
+    if interactive:
+        # Display the menu
+        print("Available benchmark indices:")
+        for key, value in indices.items():
+            print(f"{key}: {value['Ticker']}: {value['Full Name']}: {value['Usage']}")
 
-    # Get user choices
-    choices = input("Enter the numbers of your choices (comma-separated, e.g., 1,3,5): ").split(',')
-    selected_indices = [indices[choice.strip()] for choice in choices if choice.strip() in indices]
+        # Get user choices
+        choices = input("Enter the numbers of your choices (comma-separated, e.g., 1,3,5): ").split(',')
+        selected_indices = [indices[choice.strip()] for choice in choices if choice.strip() in indices]
+    else:
+        selected_indices = [_index_for_ticker(ticker) for ticker in tickers]
 
     if not selected_indices:
-        print("No valid choices. Exiting.")
+        if interactive:
+            print("No valid choices. Exiting.")
         return None, None
 
-    # Benchmark the portfolio
-    results = benchmark_portfolio(portfolio_returns, selected_indices)
+    # Benchmark the portfolio; each benchmark keeps its own trading days for the statistics
+    pairwise = benchmark_portfolio(portfolio_returns, selected_indices, dropna=False)
+    results = pairwise.dropna()
     
-    # Calculate additional metrics
-    correlations = results.corr()['Portfolio'].sort_values(ascending=False)
+    # Calculate additional metrics for every benchmark at once from the aligned returns
+    statistics = benchmark_statistics(pairwise, risk_free_rate)
+    correlations = pd.concat([pd.Series({"Portfolio": 1.0}), statistics["correlation"]])
+    correlations = correlations.sort_values(ascending=False)
     annualized_returns = (1 + results.mean()) ** 252 - 1
-    
-        # calculate beta for every ticker chosen
-    betas = []
-    for index in selected_indices:
-        betas.append(beta(portfolio_returns, index['Ticker']))
-    betas = pd.Series(betas, index=[index['Full Name'] for index in selected_indices])
-    betas = betas.sort_values(ascending=False)
-
-    alphas = []
-    for index in selected_indices:
-        alphas.append(alpha(portfolio_returns, index['Ticker'], risk_free_rate))
-    alphas = pd.Series(alphas, index=[index['Full Name'] for index in selected_indices])
-    alphas = alphas.sort_values(ascending=False)
-
+    betas = statistics["beta"].sort_values(ascending=False)
+    alphas = statistics["alpha"].sort_values(ascending=False)
 
     analysis_results = {
         "alphas": alphas,
         "betas": betas,
         "correlations": correlations,
-        "annualized_returns": annualized_returns
+        "annualized_returns": annualized_returns,
+        "tracking_errors": statistics["tracking_error"],
+        "information_ratios": statistics["information_ratio"],
+        "up_capture": statistics["up_capture"],
+        "down_capture": statistics["down_capture"],
     }
 
     
+    if not interactive:
+        return results, analysis_results
+
     # Display the results
     print("\nBenchmarking results:")
     print(results.head())
@@ -104,6 +198,8 @@ def run_benchmark_analysis(portfolio_returns, risk_free_rate):
     print(correlations)
     print("\nAnnualized Returns:")
     print(annualized_returns)
+    print("\nTracking Error, Information Ratio and Capture Ratios:")
+    print(statistics.drop(columns=["beta", "alpha", "correlation"]))
     
     # Optional: save results to CSV
     save_option = input("Do you want to save the results to a CSV file? (y/n): ").lower()
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from .returns_matrix import as_returns_matrix
+
+CALENDAR_BUCKETS = ("week", "month", "quarter", "year", "day_of_week")
+
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Period frequency of the buckets labelled by their last day
+_PERIOD_FREQUENCIES = {"month": "M", "quarter": "Q", "year": "Y"}
+
+
+def bucket_codes(index, bucket="week"):
+    """
+    Assign every date to a calendar bucket with integer arithmetic on the dates.
+
+    Weeks run Monday to Sunday and, like months, quarters and years, are
+    labelled by their last day, as pandas' resample and Grouper do. Between the
+    first and last date every such bucket is present, including empty ones.
+
+    Parameters:
+    index (pd.DatetimeIndex): Dates of the returns
+    bucket (str, callable or array-like): One of CALENDAR_BUCKETS, a function mapping the index to
+                                          one label per date, or the labels themselves
+
+    Returns:
+    tuple: (np.ndarray of bucket numbers 0..buckets-1 per date, pd.Index of bucket labels)
+    """
+    if not isinstance(bucket, str):
+        labels = bucket(index) if callable(bucket) else bucket
+        codes, uniques = pd.factorize(np.asarray(labels), sort=True)
+        return codes, pd.Index(uniques)
+    if bucket not in CALENDAR_BUCKETS:
+        raise ValueError(f"Unknown bucket {bucket!r}. Choose from {CALENDAR_BUCKETS}, a function or labels")
+
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    days = index.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+    if bucket == "day_of_week":
+        # 1970-01-01 was a Thursday
+        codes = (days + 3) % 7
+        present = np.unique(codes)
+        remap = np.zeros(7, dtype=np.int64)
+        remap[present] = np.arange(len(present))
+        return remap[codes], pd.Index([DAY_NAMES[day] for day in present])
+
+    if bucket == "week":
+        ordinals = (days + 3) // 7
+    elif bucket == "month":
+        ordinals = (index.year.to_numpy() - 1970) * 12 + index.month.to_numpy() - 1
+    elif bucket == "quarter":
+        ordinals = (index.year.to_numpy() - 1970) * 4 + index.quarter.to_numpy() - 1
+    else:
+        ordinals = index.year.to_numpy() - 1970
+
+    first = ordinals.min() if len(ordinals) else 0
+    all_ordinals = np.arange(first, (ordinals.max() + 1) if len(ordinals) else 0)
+    if bucket == "week":
+        # Sunday ending each week
+        labels = pd.DatetimeIndex((all_ordinals * 7 + 3).astype("datetime64[D]"))
+    else:
+        periods = pd.PeriodIndex.from_ordinals(all_ordinals, freq=_PERIOD_FREQUENCIES[bucket])
+        labels = periods.to_timestamp(how="end").normalize()
+    return (ordinals - first).astype(np.int64), labels
+
+
+def calendar_statistics(portfolio_returns, bucket="week", ddof=1):
+    """
+    Count, mean, variance, minimum and maximum of the returns in every calendar bucket.
+
+    All buckets and portfolios are reduced together in one vectorized pass:
+    returns are ordered by bucket number and each statistic is a segment
+    reduction (np.add.reduceat and friends) instead of a Python call per bucket.
+    Missing returns are skipped.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns with a DatetimeIndex, or one column per portfolio
+    bucket (str, callable or array-like): Calendar bucket, see bucket_codes. Default is "week".
+    ddof (int): Delta degrees of freedom of the variance (default: 1)
+
+    Returns:
+    pd.DataFrame: One row per bucket with the columns count, mean, variance, min and max.
+                  For a returns matrix the columns are (statistic, portfolio).
+    """
+    if not isinstance(portfolio_returns.index, pd.DatetimeIndex) and isinstance(bucket, str):
+        raise ValueError("portfolio_returns must have a DatetimeIndex")
+
+    matrix = as_returns_matrix(portfolio_returns)
+    if matrix is None:
+        returns, portfolios = portfolio_returns.to_numpy(dtype=float)[:, np.newaxis], None
+    else:
+        returns, portfolios = matrix
+
+    codes, labels = bucket_codes(portfolio_returns.index, bucket)
+    if len(codes) and np.any(codes[1:] < codes[:-1]):
+        order = np.argsort(codes, kind="stable")
+        codes, returns = codes[order], returns[order]
+
+    # Start of every non-empty bucket in the ordered returns
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+    observed = codes[starts]
+    segment = np.cumsum(np.r_[False, codes[1:] != codes[:-1]]) if len(codes) else codes
+
+    shape = (len(labels), returns.shape[1])
+    count = np.zeros(shape)
+    mean = np.full(shape, np.nan)
+    variance = np.full(shape, np.nan)
+    minimum = np.full(shape, np.nan)
+    maximum = np.full(shape, np.nan)
+
+    if len(starts):
+        valid = ~np.isnan(returns)
+        filled = np.where(valid, returns, 0.0)
+        bucket_count = np.add.reduceat(valid.astype(float), starts, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            bucket_mean = np.add.reduceat(filled, starts, axis=0) / bucket_count
+            # Second pass around the bucket means, so the variance does not lose precision
+            deviations = np.where(valid, returns - bucket_mean[segment], 0.0)
+            squares = np.add.reduceat(deviations * deviations, starts, axis=0)
+            bucket_variance = np.where(bucket_count > ddof, squares / (bucket_count - ddof), np.nan)
+        bucket_min = np.minimum.reduceat(np.where(valid, returns, np.inf), starts, axis=0)
+        bucket_max = np.maximum.reduceat(np.where(valid, returns, -np.inf), starts, axis=0)
+
+        empty = bucket_count == 0
+        count[observed] = bucket_count
+        mean[observed] = bucket_mean
+        variance[observed] = bucket_variance
+        minimum[observed] = np.where(empty, np.nan, bucket_min)
+        maximum[observed] = np.where(empty, np.nan, bucket_max)
+
+    statistics = {"count": count, "mean": mean, "variance": variance, "min": minimum, "max": maximum}
+    if portfolios is None:
+        result = pd.DataFrame({name: values[:, 0] for name, values in statistics.items()}, index=labels)
+    else:
+        result = pd.concat({name: pd.DataFrame(values, index=labels, columns=portfolios)
+                            for name, values in statistics.items()}, axis=1)
+    result.index.name = portfolio_returns.index.name
+    return result
@@ -1,33 +1,35 @@
+import numpy as np
+import pandas as pd
+from .drawdown import _log_wealth
 
 def calculate_calmar_ratio(portfolio_returns, window=36):
     """
     Calculate the Calmar Ratio for a given portfolio.
 
+    The annualized return over the most recent `window` months (21 trading days
+    each) divided by the maximum drawdown over the same days. The drawdown is
+    read from the running peak of log wealth in one pass.
+
     Parameters:
-    portfolio_returns (pd.Series): Daily returns of the portfolio
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
     window (int): The number of months to consider for the calculation. Default is 36 (3 years).
+                  None uses the whole history, as ReturnAccumulator.calmar_ratio does.
 
     Returns:
-    float: Calmar Ratio
+    float: Calmar Ratio (pd.Series keyed by portfolio for a returns matrix)
     """
-    # Convert daily returns to cumulative returns
-    cumulative_returns = (1 + portfolio_returns).cumprod()
-
-    # Calculate the running maximum
-    running_max = cumulative_returns.cummax()
-
-    # Calculate the drawdown
-    drawdown = (cumulative_returns - running_max) / running_max
-
-    # Calculate the maximum drawdown
-    max_drawdown = drawdown.min()
-
-    # Calculate the annualized return
-    total_return = cumulative_returns.iloc[-1] - 1
-    annualized_return = (1 + total_return) ** (252 / len(portfolio_returns)) - 1
-
-    # Calculate Calmar Ratio
-    calmar_ratio = annualized_return / abs(max_drawdown)
-
-    return calmar_ratio
-
+    if window is not None:
+        days = window * 252 // 12
+        portfolio_returns = portfolio_returns.iloc[-days:] if hasattr(portfolio_returns, "iloc") \
+            else portfolio_returns[-days:]
+
+    log_wealth, peak, _, portfolios = _log_wealth(portfolio_returns)
+    # Missing returns leave the cumulative value unchanged
+    max_drawdown = np.expm1(-(peak - log_wealth).max(axis=0, initial=0.0))
+    annualized_return = np.exp(log_wealth[-1]) ** (252 / len(log_wealth)) - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        calmar_ratio = annualized_return / abs(max_drawdown)
+
+    if portfolios is None:
+        return float(calmar_ratio[0])
+    return pd.Series(calmar_ratio, index=portfolios)
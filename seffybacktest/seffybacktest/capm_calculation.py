@@ -1,13 +1,14 @@
-import yfinance as yf
+from .session import get_index_returns
 from .market_beta import beta
 from .sharpe_ratio import get_risk_free_rate
 
-def calculate_market_return(portfolio_returns):
+def calculate_market_return(portfolio_returns, session=None):
     """
     Calculate market return using S&P 500 index.
     
     Parameters:
     portfolio_returns (pandas.Series): Daily returns of the portfolio
+    session (MarketDataSession): Session sharing index downloads (defaults to the active session)
     
     Returns:
     float: Annualized market return
@@ -16,12 +17,11 @@ def calculate_market_return(portfolio_returns):
     start_date = portfolio_returns.index[0]
     end_date = portfolio_returns.index[-1]
 
-    market_data = yf.download("^GSPC", start=start_date, end=end_date)['Adj Close']
-    market_return = market_data.pct_change().dropna()
+    market_return = get_index_returns("^GSPC", start_date, end_date, session)
     annualized_return = (1 + market_return.mean()) ** 252 - 1
     return annualized_return
 
-def calculate_capm(portfolio_returns,risk_free_rate=None, ticker=None):
+def calculate_capm(portfolio_returns,risk_free_rate=None, ticker=None, session=None):
     """
     Calculate expected return using CAPM.
     
@@ -29,12 +29,13 @@ def calculate_capm(portfolio_returns,risk_free_rate=None, ticker=None):
     beta (float): Beta of the portfolio
     risk_free_rate (float): Risk-free rate (annual)
     market_return (float): Expected market return (annual)
+    session (MarketDataSession): Session sharing index downloads (defaults to the active session)
     
     Returns:
     float: Expected return according to CAPM
     """
-    market_return = calculate_market_return(portfolio_returns)
-    calculated_beta = beta(portfolio_returns, ticker)
+    market_return = calculate_market_return(portfolio_returns, session)
+    calculated_beta = beta(portfolio_returns, ticker, session)
 
     if risk_free_rate is None:
         risk_free_rate = get_risk_free_rate()
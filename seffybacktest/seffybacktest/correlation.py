@@ -1,11 +1,13 @@
-import yfinance as yf
+from .session import get_index_returns
 
-def correlation_with_index(portfolio_returns, ticker=None):
+def correlation_with_index(portfolio_returns, ticker=None, session=None):
     """
     Calculate the correlation between portfolio returns and an index.
     
     Parameters:
     portfolio_returns (pandas.Series): Daily returns of the portfolio
+    ticker (str): Ticker symbol of the index (prompted for if None)
+    session (MarketDataSession): Session sharing index downloads (defaults to the active session)
     
     Returns:
     float: Correlation coefficient
@@ -17,17 +19,13 @@ def correlation_with_index(portfolio_returns, ticker=None):
     else:
         index_ticker = ticker
         
-    # Download index data
-    index_data = yf.download(index_ticker, start=portfolio_returns.index[0], end=portfolio_returns.index[-1])
-    
-    # Calculate index returns
-    index_returns = index_data['Adj Close'].pct_change().dropna()
+    # Get index returns
+    index_returns = get_index_returns(index_ticker, portfolio_returns.index[0], portfolio_returns.index[-1], session)
     
     # Align portfolio and index returns based on common dates
     common_dates = portfolio_returns.index.intersection(index_returns.index)
     portfolio_returns = portfolio_returns.loc[common_dates]
     index_returns = index_returns.loc[common_dates]
-    index_returns.index = index_returns.index.tz_localize(None)
     
     # Calculate correlation
     correlation = portfolio_returns.corr(index_returns)
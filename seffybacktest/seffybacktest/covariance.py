@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+
+COVARIANCE_METHODS = ("sample", "ewma", "ledoit_wolf")
+MISSING_METHODS = ("pairwise", "complete")
+
+
+def _prepare(asset_returns, method, halflife, missing, dtype):
+    """
+    Centered returns with missing values set to zero, the valid-return mask (None if nothing is
+    missing), the EWMA weights of each day (None for equal weights) and the asset labels.
+    """
+    if method not in COVARIANCE_METHODS:
+        raise ValueError(f"Unknown method {method!r}. Choose from {COVARIANCE_METHODS}")
+    if missing not in MISSING_METHODS:
+        raise ValueError(f"Unknown missing-data handling {missing!r}. Choose from {MISSING_METHODS}")
+
+    frame = asset_returns if isinstance(asset_returns, pd.DataFrame) else pd.DataFrame(asset_returns)
+    if missing == "complete":
+        frame = frame.dropna()
+    values = frame.to_numpy(dtype=dtype, copy=True)
+    valid = ~np.isnan(values)
+    complete = valid.all()
+
+    weights = None
+    if method == "ewma":
+        # The latest day weighs 1, a day `halflife` days earlier 1/2
+        weights = (0.5 ** (np.arange(len(values) - 1, -1, -1) / halflife)).astype(dtype)
+
+    # Centering on each asset's (weighted) mean keeps the cross products from cancelling
+    if not complete:
+        values[~valid] = 0.0
+    day_weights = np.ones(len(values), dtype=dtype) if weights is None else weights
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = (day_weights @ values) / (day_weights @ valid.astype(dtype))
+    values -= np.nan_to_num(means)
+    if not complete:
+        values[~valid] = 0.0
+    return values, None if complete else valid.astype(dtype), weights, frame.columns
+
+
+def _ledoit_wolf(returns, block_size):
+    """
+    Shrinkage intensity towards a scaled identity and the scale (Ledoit and Wolf, 2004), computed
+    from blocks of the cross-product matrices as scikit-learn's LedoitWolf does.
+    """
+    n, p = returns.shape
+    squares = returns * returns
+    variances = squares.sum(axis=0) / n
+    mu = variances.sum() / p
+    beta, delta = 0.0, 0.0
+    for start in range(0, p, block_size):
+        rows = slice(start, start + block_size)
+        for other in range(start, p, block_size):
+            columns = slice(other, other + block_size)
+            # Blocks off the diagonal stand for their mirror image too
+            twice = 1.0 if other == start else 2.0
+            beta += twice * float((squares[:, rows].T @ squares[:, columns]).sum(dtype=np.float64))
+            delta += twice * float(((returns[:, rows].T @ returns[:, columns]) ** 2).sum(dtype=np.float64))
+    delta /= n * n
+    beta = (beta / n - delta) / (p * n)
+    delta = (delta - 2 * mu * variances.sum() + p * mu * mu) / p
+    beta = min(beta, delta)
+    shrinkage = 0.0 if beta == 0 else beta / delta
+    return shrinkage, mu, variances
+
+
+def _tiles(returns, mask, weights, method, correlation, min_periods, block_size):
+    """
+    Yield (rows, columns, block) for every tile on or above the diagonal.
+
+    With missing data every sum is taken over the days both assets have a
+    return, with matrix products of the mask, so no pair is visited in Python.
+    """
+    n, p = returns.shape
+    dtype = returns.dtype
+    weighted = returns if weights is None else returns * weights[:, np.newaxis]
+
+    if method == "ledoit_wolf":
+        shrinkage, mu, variances = _ledoit_wolf(returns, block_size)
+        diagonal = (1 - shrinkage) * variances + shrinkage * mu
+    elif mask is None:
+        # Unbiased weighted covariance: scaled by W / (W^2 - sum of squared weights); 1 / (n - 1) unweighted
+        total = np.float64(n) if weights is None else weights.sum(dtype=np.float64)
+        total_squares = np.float64(n) if weights is None else (weights.astype(np.float64) ** 2).sum()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = dtype.type(total / (total * total - total_squares))
+        diagonal = np.einsum('ij,ij->j', weighted, returns) * scale
+
+    for start in range(0, p, block_size):
+        rows = slice(start, start + block_size)
+        for other in range(start, p, block_size):
+            columns = slice(other, other + block_size)
+            products = weighted[:, rows].T @ returns[:, columns]
+
+            if method == "ledoit_wolf":
+                block = products * dtype.type((1 - shrinkage) / n)
+                if other == start:
+                    block[np.diag_indices_from(block)] += dtype.type(shrinkage * mu)
+                if correlation:
+                    block /= np.sqrt(np.outer(diagonal[rows], diagonal[columns]))
+            elif mask is None:
+                if correlation:
+                    block = products * scale / np.sqrt(np.outer(diagonal[rows], diagonal[columns]))
+                else:
+                    block = products * scale
+                if n < min_periods:
+                    block[:] = np.nan
+            else:
+                block = _pairwise_block(returns, mask, weights, weighted, rows, columns, products, correlation,
+                                        min_periods)
+
+            if correlation and other == start:
+                # Exactly one on the diagonal, wherever it is defined
+                diagonal_view = block[np.diag_indices_from(block)]
+                block[np.diag_indices_from(block)] = np.where(np.isnan(diagonal_view), np.nan, 1.0)
+            yield rows, columns, block
+
+
+def _pairwise_block(returns, mask, weights, weighted, rows, columns, products, correlation, min_periods):
+    x_rows, x_columns = returns[:, rows], returns[:, columns]
+    m_rows, m_columns = mask[:, rows], mask[:, columns]
+    weighted_mask = m_rows if weights is None else m_rows * weights[:, np.newaxis]
+
+    # Sums over the days both assets have a return: weights, and each asset's returns
+    total = weighted_mask.T @ m_columns
+    sums_rows = weighted[:, rows].T @ m_columns
+    sums_columns = weighted_mask.T @ x_columns
+    count = total if weights is None else m_rows.T @ m_columns
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        co_moment = products - sums_rows * sums_columns / total
+        if correlation:
+            squares_rows = (weighted[:, rows] * x_rows).T @ m_columns - sums_rows * sums_rows / total
+            squares_columns = weighted_mask.T @ (x_columns * x_columns) - sums_columns * sums_columns / total
+            block = co_moment / np.sqrt(squares_rows * squares_columns)
+        else:
+            total_squares = total if weights is None else (weighted_mask * weights[:, np.newaxis]).T @ m_columns
+            block = co_moment * total / (total * total - total_squares)
+    block[count < min_periods] = np.nan
+    return block
+
+
+def covariance_blocks(asset_returns, method="sample", halflife=63, missing="pairwise", min_periods=2,
+                      dtype="float64", block_size=1024, correlation=False):
+    """
+    Compute a covariance (or correlation) matrix one tile at a time.
+
+    Only the tiles on or above the diagonal are produced; the matrix is
+    symmetric. Memory beyond the returns themselves is a few tiles, so the
+    matrix of a universe of any size can be written straight to disk.
+
+    Parameters:
+    asset_returns (pd.DataFrame or np.ndarray): Daily returns with one column per asset
+    method (str): One of COVARIANCE_METHODS (see covariance_matrix)
+    halflife (float): Days for the weight of a return to halve with method="ewma". Default is 63.
+    missing (str): "pairwise" to use, for each pair of assets, the days both have a return;
+                   "complete" to use only the days every asset has one
+    min_periods (int): Fewest shared days for a pair to get a value (NaN otherwise). Default is 2.
+    dtype (str): "float64" (default) or "float32" for the computation and the result
+    block_size (int): Assets per tile side. Default is 1024.
+    correlation (bool): Produce correlations instead of covariances
+
+    Returns:
+    generator: (rows, columns, block) with rows and columns slices of the assets and block an np.ndarray
+    """
+    returns, mask, weights, _ = _prepare(asset_returns, method, halflife, missing, dtype)
+    return _tiles(returns, mask, weights, method, correlation, min_periods, block_size)
+
+
+def _matrix(asset_returns, method, halflife, missing, min_periods, dtype, block_size, correlation, out):
+    returns, mask, weights, assets = _prepare(asset_returns, method, halflife, missing, dtype)
+    p = len(assets)
+    if out is None:
+        out = np.empty((p, p), dtype=dtype)
+    elif out.shape != (p, p):
+        raise ValueError(f"out has shape {out.shape}; expected {(p, p)}")
+
+    for rows, columns, block in _tiles(returns, mask, weights, method, correlation, min_periods, block_size):
+        out[rows, columns] = block
+        if rows != columns:
+            out[columns, rows] = block.T
+    return out, assets
+
+
+def covariance_matrix(asset_returns, method="sample", halflife=63, missing="pairwise", min_periods=2,
+                      dtype="float64", block_size=1024, annualize=False, out=None):
+    """
+    Calculate the covariance matrix of a universe of assets.
+
+    Works on the asset returns of get_asset_returns, a ReturnStore frame or any
+    DataFrame with one column per asset. The matrix is filled tile by tile (see
+    covariance_blocks), so the work space stays a few tiles even for 10,000
+    assets, and `out` can be a memory-mapped array to keep the result on disk.
+
+    Parameters:
+    asset_returns (pd.DataFrame or np.ndarray): Daily returns with one column per asset
+    method (str): "sample" (unbiased), "ewma" (exponentially weighted, unbiased like pandas' ewm().cov())
+                  or "ledoit_wolf" (shrunk towards a scaled identity, as scikit-learn's LedoitWolf)
+    halflife (float): Days for the weight of a return to halve with method="ewma". Default is 63.
+    missing (str): "pairwise" (default) to use, for each pair of assets, the days both have a return,
+                   like DataFrame.cov(); "complete" to drop every day with a missing return. Ledoit-Wolf
+                   counts a missing return as the asset's mean.
+    min_periods (int): Fewest shared days for a pair to get a value (NaN otherwise). Default is 2.
+    dtype (str): "float64" (default) or "float32" to halve memory and time
+    block_size (int): Assets per tile side. Default is 1024.
+    annualize (bool): Scale daily covariances by 252
+    out (np.ndarray): Array of shape (assets, assets) to write the result into, e.g. an np.memmap
+
+    Returns:
+    pd.DataFrame: Covariance matrix keyed by asset on both axes, wrapping `out` if given
+    """
+    matrix, assets = _matrix(asset_returns, method, halflife, missing, min_periods, dtype, block_size, False, out)
+    if annualize:
+        matrix *= 252
+    return pd.DataFrame(matrix, index=assets, columns=assets, copy=False)
+
+
+def correlation_matrix(asset_returns, method="sample", halflife=63, missing="pairwise", min_periods=2,
+                       dtype="float64", block_size=1024, out=None):
+    """
+    Calculate the correlation matrix of a universe of assets.
+
+    With missing="pairwise" each correlation uses the days both assets have a
+    return, for the means and the variances as well, like DataFrame.corr().
+
+    Parameters:
+    asset_returns (pd.DataFrame or np.ndarray): Daily returns with one column per asset
+    method (str): One of COVARIANCE_METHODS (see covariance_matrix)
+    halflife (float): Days for the weight of a return to halve with method="ewma". Default is 63.
+    missing (str): "pairwise" (default) or "complete" (see covariance_matrix)
+    min_periods (int): Fewest shared days for a pair to get a value (NaN otherwise). Default is 2.
+    dtype (str): "float64" (default) or "float32"
+    block_size (int): Assets per tile side. Default is 1024.
+    out (np.ndarray): Array of shape (assets, assets) to write the result into, e.g. an np.memmap
+
+    Returns:
+    pd.DataFrame: Correlation matrix keyed by asset on both axes, wrapping `out` if given
+    """
+    matrix, assets = _matrix(asset_returns, method, halflife, missing, min_periods, dtype, block_size, True, out)
+    return pd.DataFrame(matrix, index=assets, columns=assets, copy=False)
@@ -1,22 +1,26 @@
-from .var_calculator import calculate_var
+import numpy as np
+import pandas as pd
+from .returns_matrix import as_returns_matrix
+from .tail_risk import historical_tail
 
 def calculate_cvar(portfolio_returns, confidence_level=0.95):
     """
     Calculate Conditional Value at Risk (CVaR) using the historical method.
-    
+
     Parameters:
-    portfolio_returns (pandas.Series): Daily returns of the portfolio
+    portfolio_returns (pandas.Series or pandas.DataFrame): Daily returns of the portfolio, or one column per portfolio
     confidence_level (float): Confidence level for CVaR calculation (default: 0.95)
-    
+
     Returns:
-    float: Conditional Value at Risk
+    float: Conditional Value at Risk (pandas.Series keyed by portfolio for a returns matrix)
     """
-    # Calculate VaR
-    var = calculate_var(portfolio_returns, confidence_level)
-    
-    # Calculate CVaR
-    cvar = -portfolio_returns[portfolio_returns <= -var].mean()
-    
-    return cvar
+    matrix = as_returns_matrix(portfolio_returns)
+    if matrix is not None:
+        returns, portfolios = matrix
+        _, cvar = historical_tail(returns, [confidence_level])
+        return pd.Series(cvar[0], index=portfolios)
 
-    
+    # Mean of the returns at or below the VaR, found in the same selection as the VaR
+    returns = np.asarray(portfolio_returns, dtype=float).reshape(-1, 1)
+    _, cvar = historical_tail(returns, [confidence_level])
+    return cvar[0, 0]
@@ -1,18 +1,27 @@
 import numpy as np
+from .moments import ReturnMoments
 from .sharpe_ratio import get_risk_free_rate
 
 def double_sharpe(portfolio_returns, risk_free_rate=None):
-    
+    """
+    Calculate the Double Sharpe Ratio (excess over twice the risk-free rate) of a portfolio.
+
+    Parameters:
+    portfolio_returns (pd.Series, pd.DataFrame or ReturnMoments): Daily returns of the portfolio, one column per portfolio, or their moments
+    risk_free_rate (float): Annual risk-free rate. If None, it will be fetched using get_risk_free_rate()
+
+    Returns:
+    float: Double Sharpe Ratio (pd.Series keyed by portfolio for a returns matrix)
+    """
     if risk_free_rate is None:
         risk_free_rate = get_risk_free_rate()
     
     # Convert annual risk-free rate to daily rate
     daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
+
+    moments = ReturnMoments.of(portfolio_returns, daily_risk_free_rate)
     
-    # Calculate excess returns
-    excess_returns = portfolio_returns - 2 * daily_risk_free_rate
-    
-    # Calculate Sharpe ratio
-    double_sharpe = np.sqrt(252) * excess_returns.mean() / excess_returns.std()
+    # Calculate Sharpe ratio over twice the risk-free rate
+    double_sharpe = np.sqrt(252) * (moments.mean - 2 * daily_risk_free_rate) / moments.std()
     
-    return double_sharpe
+    return moments.wrap(double_sharpe)
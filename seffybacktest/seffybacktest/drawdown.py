@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+from .returns_matrix import as_returns_matrix
+
+
+def _log_wealth(portfolio_returns):
+    """
+    Log wealth of every portfolio, its running peak, the valid-return mask and the labels.
+
+    Missing returns leave wealth unchanged. As in calculate_calmar_ratio, the
+    peak starts at the wealth after the first return.
+    """
+    matrix = as_returns_matrix(portfolio_returns)
+    if matrix is None:
+        returns, portfolios = np.asarray(portfolio_returns, dtype=float).reshape(-1, 1), None
+    else:
+        returns, portfolios = matrix
+    valid = ~np.isnan(returns)
+    log_wealth = np.cumsum(np.log1p(np.where(valid, returns, 0.0)), axis=0)
+    peak = np.maximum.accumulate(log_wealth, axis=0)
+    return log_wealth, peak, valid, portfolios
+
+
+def _dates(portfolio_returns, length):
+    index = getattr(portfolio_returns, "index", None)
+    return index if index is not None else pd.RangeIndex(length)
+
+
+def max_drawdown(portfolio_returns):
+    """
+    Calculate the largest peak-to-trough fall of the portfolio's value.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+
+    Returns:
+    float: Maximum drawdown as a negative fraction (pd.Series keyed by portfolio for a returns matrix)
+    """
+    log_wealth, peak, _, portfolios = _log_wealth(portfolio_returns)
+    # The fall is taken in place in the peak array; nothing else is kept
+    np.subtract(peak, log_wealth, out=peak)
+    drawdown = np.expm1(-peak.max(axis=0, initial=0.0))
+    if portfolios is None:
+        return float(drawdown[0])
+    return pd.Series(drawdown, index=portfolios)
+
+
+def drawdown_series(portfolio_returns):
+    """
+    Calculate how far below its previous peak the portfolio is on each day.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+
+    Returns:
+    pd.Series or pd.DataFrame: Drawdown (zero or a negative fraction), aligned with the returns
+    """
+    log_wealth, peak, _, portfolios = _log_wealth(portfolio_returns)
+    drawdown = np.expm1(log_wealth - peak)
+    index = _dates(portfolio_returns, len(drawdown))
+    if portfolios is None:
+        return pd.Series(drawdown[:, 0], index=index, name=getattr(portfolio_returns, "name", None))
+    return pd.DataFrame(drawdown, index=index, columns=portfolios)
+
+
+def drawdown_statistics(portfolio_returns):
+    """
+    Calculate the drawdown profile of one or many portfolios in one pass over their returns.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+
+    Returns:
+    pd.Series: For a single portfolio, the statistics below
+    pd.DataFrame: One row per portfolio and one column per statistic for a returns matrix
+        Maximum Drawdown: largest fall from a peak, as a negative fraction
+        Maximum Drawdown Duration: most consecutive days spent below a previous peak
+        Time to Recovery: days from the trough of the maximum drawdown back to its peak (NaN if not recovered)
+        Ulcer Index: root mean square of the daily drawdowns
+        Pain Index: mean of the daily drawdowns, as a positive fraction
+    """
+    log_wealth, peak, valid, portfolios = _log_wealth(portfolio_returns)
+    if len(log_wealth) == 0:
+        # No history: one missing day leaves the drawdown and the indexes undefined
+        log_wealth = peak = np.full((1, log_wealth.shape[1]), np.nan)
+        valid = np.zeros(log_wealth.shape, dtype=bool)
+    columns = np.arange(log_wealth.shape[1])
+    drawdown = np.expm1(log_wealth - peak)
+    days = np.arange(len(log_wealth))[:, np.newaxis]
+
+    # Days since the last day at a peak; its maximum is the longest spell under water
+    underwater = log_wealth < peak
+    last_peak = np.maximum.accumulate(np.where(underwater, 0, days), axis=0)
+    duration = (days - last_peak).max(axis=0)
+
+    # The maximum drawdown is recovered on the first later day back at its peak
+    trough = np.argmin(drawdown, axis=0)
+    deepest = drawdown[trough, columns]
+    recovered = (days > trough) & (log_wealth >= peak[trough, columns])
+    time_to_recovery = np.where(recovered.any(axis=0), recovered.argmax(axis=0) - trough, np.nan)
+    time_to_recovery[deepest == 0] = 0
+
+    count = valid.sum(axis=0)
+    squares = np.einsum('ij,ij->j', np.where(valid, drawdown, 0.0), np.where(valid, drawdown, 0.0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ulcer = np.sqrt(squares / count)
+        pain = -np.where(valid, drawdown, 0.0).sum(axis=0) / count
+
+    statistics = pd.DataFrame({
+        "Maximum Drawdown": deepest,
+        "Maximum Drawdown Duration": duration,
+        "Time to Recovery": time_to_recovery,
+        "Ulcer Index": ulcer,
+        "Pain Index": pain,
+    }, index=portfolios)
+    if portfolios is None:
+        return statistics.iloc[0].rename(getattr(portfolio_returns, "name", None))
+    return statistics
+
+
+def _episodes(log_wealth, peak, dates, top):
+    underwater = np.concatenate([[False], log_wealth < peak, [False]])
+    edges = np.flatnonzero(np.diff(underwater.astype(np.int8)))
+    starts, ends = edges[::2], edges[1::2]
+    if len(starts) == 0:
+        return pd.DataFrame(columns=["Peak", "Trough", "Recovery", "Drawdown", "Length", "Recovery Time"])
+
+    # Deepest log drawdown of every episode with one reduction
+    falls = np.minimum.reduceat(log_wealth - peak, starts)
+    order = np.argsort(falls, kind="stable")[:top]
+    rows = []
+    for episode in order:
+        start, end = starts[episode], ends[episode]
+        trough = start + int(np.argmin(log_wealth[start:end]))
+        recovery = end if end < len(log_wealth) else None
+        rows.append({
+            "Peak": dates[start - 1],
+            "Trough": dates[trough],
+            "Recovery": None if recovery is None else dates[recovery],
+            "Drawdown": np.expm1(falls[episode]),
+            "Length": (len(log_wealth) - 1 if recovery is None else recovery) - (start - 1),
+            "Recovery Time": np.nan if recovery is None else recovery - trough,
+        })
+    return pd.DataFrame(rows, index=pd.RangeIndex(1, len(rows) + 1, name="Rank"))
+
+
+def drawdown_episodes(portfolio_returns, top=5):
+    """
+    Find the deepest drawdown episodes, each from a peak through its trough to its recovery.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    top (int): Number of episodes to return, deepest first. Default is 5.
+
+    Returns:
+    pd.DataFrame: One row per episode with its peak, trough and recovery dates (None if not yet
+                  recovered), depth as a negative fraction, length from peak to recovery (or the last
+                  day) and days from trough to recovery. A returns matrix gives one block of rows per
+                  portfolio, keyed by (portfolio, rank).
+    """
+    log_wealth, peak, _, portfolios = _log_wealth(portfolio_returns)
+    dates = _dates(portfolio_returns, len(log_wealth))
+    if portfolios is None:
+        return _episodes(log_wealth[:, 0], peak[:, 0], dates, top)
+    return pd.concat({portfolio: _episodes(log_wealth[:, i], peak[:, i], dates, top)
+                      for i, portfolio in enumerate(portfolios)}, names=["Portfolio", "Rank"])
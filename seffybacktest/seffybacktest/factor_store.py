@@ -0,0 +1,142 @@
+import io
+import os
+import json
+import time
+import zipfile
+import urllib.request
+import pandas as pd
+from .instrumentation import span, record
+from .price_cache import get_cache_dir, _to_date
+
+FRENCH_LIBRARY_URL = "https://mba.tuck.dartmouth.edu/pages/faculty/ken.french/ftp/{}_CSV.zip"
+
+# Daily files from Kenneth French's data library kept in the factor store
+FACTOR_DATASETS = {
+    "3-factor": "F-F_Research_Data_Factors_daily",
+    "5-factor": "F-F_Research_Data_5_Factors_2x3_daily",
+    "momentum": "F-F_Momentum_Factor_daily",
+}
+
+# The library is updated monthly, so check for new rows at most once a day
+REFRESH_INTERVAL = 24 * 60 * 60
+
+# Parsed factors already read in this process, keyed by dataset
+_loaded = {}
+
+
+def _factor_path(dataset):
+    return os.path.join(get_cache_dir("factors"), dataset + ".parquet")
+
+
+def _index_path():
+    return os.path.join(get_cache_dir("factors"), "index.json")
+
+
+def _load_index():
+    try:
+        with open(_index_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index):
+    path = _index_path()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+
+def _download_zip(url):
+    with urllib.request.urlopen(url) as response:
+        return response.read()
+
+
+def _parse_factors(csv_text):
+    """
+    Parse the daily rows of a Kenneth French CSV file into decimal returns.
+    """
+    lines = csv_text.splitlines()
+    # Daily rows start with a YYYYMMDD date; the header is the line just above the first one
+    is_daily = [len(date) == 8 and date.isdigit() for date in (line.split(",", 1)[0].strip() for line in lines)]
+    header = lines[is_daily.index(True) - 1]
+    table = "\n".join([header] + [line for line, daily in zip(lines, is_daily) if daily])
+
+    factors = pd.read_csv(io.StringIO(table), index_col=0)
+    factors.columns = factors.columns.str.strip()
+    factors.index = pd.to_datetime(factors.index.astype(str), format='%Y%m%d')
+    factors.index.name = 'Date'
+
+    return factors.astype(float) / 100
+
+
+def _download_factors(dataset):
+    with span("factor_download", dataset) as timed:
+        content = _download_zip(FRENCH_LIBRARY_URL.format(FACTOR_DATASETS[dataset]))
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        csv_text = archive.read(archive.namelist()[0]).decode("latin-1")
+        factors = _parse_factors(csv_text)
+        timed.add(rows=len(factors), bytes=len(content))
+    return factors
+
+
+def _read_store(dataset):
+    if dataset not in _loaded and os.path.exists(_factor_path(dataset)):
+        with span("factor_read", dataset) as timed:
+            _loaded[dataset] = pd.read_parquet(_factor_path(dataset))
+            timed.add(rows=len(_loaded[dataset]), bytes=os.path.getsize(_factor_path(dataset)))
+    return _loaded.get(dataset)
+
+
+def _update_store(dataset, stored):
+    downloaded = _download_factors(dataset)
+    if stored is not None:
+        # Only rows after the last stored date are new
+        downloaded = pd.concat([stored, downloaded.iloc[downloaded.index.searchsorted(stored.index[-1], side='right'):]])
+    downloaded.to_parquet(_factor_path(dataset))
+    _loaded[dataset] = downloaded
+    return downloaded
+
+
+def load_factors(dataset="3-factor", start_date=None, end_date=None, refresh=False):
+    """
+    Get daily Fama-French factors from the local factor store.
+
+    The factors are parsed once, stored as decimal returns in a Parquet file
+    with a sorted date index, and only newer rows are appended when the
+    requested range runs past the stored history. The returned frame is a
+    slice of the stored factors and should not be modified in place.
+
+    Parameters:
+    dataset (str): One of "3-factor", "5-factor" or "momentum"
+    start_date (str or datetime): First date to return (inclusive). Defaults to the first stored date
+    end_date (str or datetime): Last date to return (inclusive). Defaults to the last stored date
+    refresh (bool): If True, check Kenneth French's data library for new rows regardless of the end date
+
+    Returns:
+    pandas.DataFrame: Daily factor returns indexed by date
+    """
+    if dataset not in FACTOR_DATASETS:
+        raise ValueError(f"Unknown factor dataset {dataset!r}. Choose from {list(FACTOR_DATASETS)}")
+
+    factors = _read_store(dataset)
+    index = _load_index()
+    checked = index.get(dataset, 0)
+
+    if factors is None:
+        needs_update = True
+    else:
+        past_end = end_date is not None and _to_date(end_date) > factors.index[-1]
+        needs_update = refresh or (past_end and time.time() - checked > REFRESH_INTERVAL)
+
+    if needs_update:
+        factors = _update_store(dataset, factors)
+        index[dataset] = time.time()
+        _save_index(index)
+
+    # Slice by position on the sorted index so no rows are copied
+    start = 0 if start_date is None else factors.index.searchsorted(_to_date(start_date), side='left')
+    end = len(factors) if end_date is None else factors.index.searchsorted(_to_date(end_date), side='right')
+    record("factor_store", dataset, cache="miss" if needs_update else "hit", rows=end - start)
+    return factors.iloc[start:end]
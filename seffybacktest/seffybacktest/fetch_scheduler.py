@@ -0,0 +1,212 @@
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from .instrumentation import span
+
+_active_scheduler = contextvars.ContextVar("seffybacktest_scheduler", default=None)
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting how often requests may start.
+
+    Tokens are added at `rate` per second up to `burst`; each request takes one,
+    waiting for it if the bucket is empty.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Parameters:
+        rate (float): Requests allowed per second on average
+        burst (int): Requests allowed back to back after a quiet period. Defaults to max(1, rate)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(max(1.0, rate) if burst is None else burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+        float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+def _provider_download(ticker, start_date, end_date):
+    # Looked up on every call so a replaced price_cache._download is picked up
+    from . import price_cache
+    return price_cache._download(ticker, start_date, end_date)
+
+
+class FetchScheduler:
+    """
+    Run price requests concurrently, with a cap on parallel requests, a rate limit,
+    retries with exponential backoff and deduplication of identical requests.
+
+    download_prices sends every range missing from the price cache, for all of its
+    tickers, through the active scheduler at once. Use one as a context manager to
+    change the settings for the code inside it:
+
+        with FetchScheduler(max_workers=16, rate=5, retries=5):
+            get_portfolio_returns(tickers, weights, "2005-01-01", "2025-01-01")
+
+    Outside any `with` block a shared scheduler with the default settings is used.
+    Requests for the same (ticker, start, end) that are pending or running are
+    answered by the same download, including requests from other threads.
+    """
+
+    def __init__(self, max_workers=8, rate=None, burst=None, retries=3, backoff=0.5, max_backoff=30.0,
+                 provider=None):
+        """
+        Parameters:
+        max_workers (int): Requests running at the same time
+        rate (float): Requests started per second at most, over all workers (default: unlimited)
+        burst (int): Requests that may start back to back before the rate applies (see TokenBucket)
+        retries (int): Further attempts after a request raises
+        backoff (float): Seconds to wait before the first retry, doubling after each one
+        max_backoff (float): Longest wait between two attempts
+        provider (callable): provider(ticker, start_date, end_date) returning a Series of adjusted
+                             close prices over [start_date, end_date). Defaults to the yfinance download
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.provider = provider
+        self._bucket = None if rate is None else TokenBucket(rate, burst)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(_active_scheduler.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_scheduler.reset(self._tokens.pop())
+        if not self._tokens:
+            self.shutdown()
+
+    def __getstate__(self):
+        # Worker processes get the settings, not the threads or requests in flight
+        return {"max_workers": self.max_workers, "rate": self.rate, "burst": self.burst, "retries": self.retries,
+                "backoff": self.backoff, "max_backoff": self.max_backoff, "provider": self.provider}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def shutdown(self):
+        """
+        Stop the worker threads once the requests already submitted are done.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def submit(self, ticker, start_date, end_date):
+        """
+        Schedule the download of one ticker over [start_date, end_date).
+
+        Parameters:
+        ticker (str): Ticker symbol
+        start_date (pd.Timestamp): First date
+        end_date (pd.Timestamp): End date (exclusive)
+
+        Returns:
+        concurrent.futures.Future: Resolves to the prices as a pandas Series
+        """
+        key = (ticker, pd.Timestamp(start_date), pd.Timestamp(end_date))
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="seffybacktest-fetch")
+                # The worker runs in a copy of the caller's context, so an active Trace follows the request
+                context = contextvars.copy_context()
+                future = self._executor.submit(context.run, self._fetch, *key)
+                self._pending[key] = future
+                submitted = True
+            else:
+                submitted = False
+        if submitted:
+            # Outside the lock: a download that is already done runs the callback here and now
+            future.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def fetch(self, requests):
+        """
+        Download several (ticker, start_date, end_date) ranges concurrently.
+
+        Parameters:
+        requests (list): (ticker, start_date, end_date) tuples; duplicates are downloaded once
+
+        Returns:
+        dict: Prices (pandas Series) keyed by request, in the order given
+        """
+        futures = {request: self.submit(*request) for request in requests}
+        # Raises the error of the first failed request once its retries are used up
+        return {request: future.result() for request, future in futures.items()}
+
+    def _fetch(self, ticker, start_date, end_date):
+        provider = self.provider or _provider_download
+        with span("download", ticker, start_date=start_date.strftime("%Y-%m-%d"),
+                  end_date=end_date.strftime("%Y-%m-%d")) as timed:
+            for attempt in range(self.retries + 1):
+                if self._bucket is not None:
+                    self._bucket.acquire()
+                try:
+                    prices = provider(ticker, start_date, end_date)
+                    break
+                except Exception:
+                    if attempt == self.retries:
+                        timed.add(attempts=attempt + 1)
+                        raise
+                    time.sleep(min(self.backoff * 2 ** attempt, self.max_backoff))
+            timed.add(rows=len(prices), bytes=int(prices.memory_usage(index=True)), attempts=attempt + 1)
+        return prices
+
+
+def current_scheduler():
+    """
+    Return the FetchScheduler active in this context, or the shared default one.
+    """
+    global _default_scheduler
+    scheduler = _active_scheduler.get()
+    if scheduler is not None:
+        return scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = FetchScheduler()
+        return _default_scheduler
@@ -1,6 +1,24 @@
-import yfinance as yf
+from .portfolio import simulate_portfolio
+from .session import get_returns
 
-def get_portfolio_returns(tickers, weights, start_date, end_date):
+def get_asset_returns(tickers, start_date, end_date):
+    """
+    Get the daily returns of each asset in a portfolio.
+
+    Parameters:
+    tickers (list): List of stock tickers
+    start_date (str): Start date for historical data
+    end_date (str): End date for historical data
+
+    Returns:
+    pandas.DataFrame: Daily returns with one column per ticker
+    """
+    # Daily returns from the active session's ReturnStore, or from downloaded prices
+    returns = get_returns(list(tickers), start_date, end_date).dropna()
+    returns.index = returns.index.tz_localize(None)
+    return returns
+
+def get_portfolio_returns(tickers, weights, start_date, end_date, rebalance="daily", transaction_cost=0.0):
     """
     Get portfolio returns for given tickers and weights.
     
@@ -9,23 +27,13 @@ def get_portfolio_returns(tickers, weights, start_date, end_date):
     weights (list): List of weights for each stock
     start_date (str): Start date for historical data
     end_date (str): End date for historical data
+    rebalance (str): How often the weights are restored, one of REBALANCE_SCHEDULES (default: "daily")
+    transaction_cost (float): Cost per unit of turnover, e.g. 0.001 for 10 basis points (default: 0)
     
     Returns:
     pandas.Series: Daily returns of the portfolio
     """
-    # Download historical data
-    data = yf.download(tickers, start=start_date, end=end_date)['Adj Close']
-    
-    # Calculate daily returns
-    returns = data.pct_change().dropna()
-
-    # Calculate portfolio returns
-    if len(tickers) == 1:
-        portfolio_returns = returns
-    else:
-        portfolio_returns = (returns * weights).sum(axis=1)
-
-    portfolio_returns.index = portfolio_returns.index.tz_localize(None)
-
+    returns = get_asset_returns(tickers, start_date, end_date)
 
-    return portfolio_returns
+    # Calculate portfolio returns, with weights drifting between rebalances
+    return simulate_portfolio(returns, weights, rebalance=rebalance, transaction_cost=transaction_cost)["returns"]
@@ -0,0 +1,136 @@
+from .adjusted_sharpe import adjusted_sharpe
+from .annual_return import annual_return
+from .average_returns import average_return
+from .calmar_ratio import calculate_calmar_ratio
+from .capm_calculation import calculate_capm
+from .correlation import correlation_with_index
+from .cvar_calculator import calculate_cvar
+from .double_sharpe import double_sharpe
+from .famafrench import calculate_fama_french
+from .intraweek_variances import analyze_portfolio_volatility
+from .market_alpha import alpha
+from .market_beta import beta
+from .modified_sharpe import modified_sharpe
+from .momentum import calculate_momentum
+from .rsi import calculate_rsi
+from .instrumentation import span
+from .session import MarketDataSession, current_session
+from .sharpe_ratio import sharpe_ratio
+from .sortino_ratio import sortino_ratio
+from .treynor_ratio import treynor_ratio
+from .var_calculator import calculate_var
+from .volatility import calculate_portfolio_volatility
+
+# List of available indicators
+INDICATORS = [
+    "Adjusted Sharpe Ratio", "Annual Return", "Average Return", "Calmar Ratio",
+    "CAPM", "Correlation with Index", "CVaR", "Double Sharpe Ratio",
+    "Fama-French Factors", "Intraweek Variances", "Market Alpha", "Market Beta",
+    "Modified Sharpe Ratio", "Momentum", "RSI", "Sharpe Ratio", "Sortino Ratio",
+    "Treynor Ratio", "VaR", "Portfolio Volatility"
+]
+
+# Indicators that need an annual risk-free rate
+RISK_FREE_RATE_INDICATORS = [
+    "Adjusted Sharpe Ratio", "CAPM", "Double Sharpe Ratio", "Fama-French Factors", "Market Alpha",
+    "Modified Sharpe Ratio", "Sharpe Ratio", "Sortino Ratio", "Treynor Ratio"
+]
+
+# Indicators measured against a benchmark index
+BENCHMARK_INDICATORS = [
+    "CAPM", "Correlation with Index", "Fama-French Factors", "Market Alpha", "Market Beta", "Treynor Ratio"
+]
+
+
+def _level_label(indicator, confidence_level, confidence_levels):
+    if len(confidence_levels) == 1:
+        return indicator
+    return f"{indicator} ({confidence_level:.1%})"
+
+
+def calculate_indicators(portfolio_returns, selected_indicators, risk_free_rate=None, ticker=None,
+                         annualize=False, confidence_levels=(0.95,), plot=False, progress=None):
+    """
+    Calculate the selected indicators for a portfolio without any user interaction.
+
+    Parameters:
+    portfolio_returns (pd.Series): Daily returns of the portfolio
+    selected_indicators (list): Names of the indicators to calculate, from INDICATORS
+    risk_free_rate (float): Annual risk-free rate used by the indicators in RISK_FREE_RATE_INDICATORS
+    ticker (str): Benchmark index used by the indicators in BENCHMARK_INDICATORS
+    annualize (bool): Whether to annualize the portfolio volatility
+    confidence_levels (list): Confidence levels for VaR and CVaR. With more than one level the
+                              results are keyed e.g. "VaR (99.0%)"
+    plot (bool): Passed on to the momentum and RSI calculations
+    progress (callable): Called as progress(i, indicator) before each indicator is calculated
+
+    Returns:
+    dict: Indicator values keyed by indicator name
+    """
+    results = {}
+
+    # Share benchmark downloads between indicators, and with the caller's session if there is one
+    with current_session() or MarketDataSession() as session:
+        # Download every benchmark the selection needs together; CAPM and Fama-French also use the S&P 500
+        benchmarks = {ticker} if ticker is not None and set(selected_indicators) & set(BENCHMARK_INDICATORS) else set()
+        if set(selected_indicators) & {"CAPM", "Fama-French Factors"}:
+            benchmarks.add("^GSPC")
+        if len(benchmarks) > 1:
+            session.prefetch(sorted(benchmarks), portfolio_returns.index[0], portfolio_returns.index[-1])
+
+        for i, indicator in enumerate(selected_indicators):
+            if progress is not None:
+                progress(i, indicator)
+
+            # Time each indicator, with the downloads and fits it causes, if a Trace is active
+            with span("indicator", indicator):
+                if indicator == "Adjusted Sharpe Ratio":
+                    results[indicator] = adjusted_sharpe(portfolio_returns, risk_free_rate)
+                elif indicator == "Annual Return":
+                    results[indicator] = annual_return(portfolio_returns)
+                elif indicator == "Average Return":
+                    results[indicator] = average_return(portfolio_returns)
+                elif indicator == "Calmar Ratio":
+                    results[indicator] = calculate_calmar_ratio(portfolio_returns)
+                elif indicator == "CAPM":
+                    results[indicator] = calculate_capm(portfolio_returns, risk_free_rate, ticker)
+                elif indicator == "Correlation with Index":
+                    results[indicator] = correlation_with_index(portfolio_returns, ticker)
+                elif indicator == "CVaR":
+                    for level in confidence_levels:
+                        results[_level_label(indicator, level, confidence_levels)] = calculate_cvar(portfolio_returns, level)
+                elif indicator == "Double Sharpe Ratio":
+                    results[indicator] = double_sharpe(portfolio_returns, risk_free_rate)
+                elif indicator == "Fama-French Factors":
+                    results[indicator] = calculate_fama_french(portfolio_returns, risk_free_rate, ticker)
+                elif indicator == "Intraweek Variances":
+                    intraweek_results = analyze_portfolio_volatility(portfolio_returns)
+                    results["Average Intraweek Variance"] = intraweek_results.get("average_intraweek_variance")
+                    results["Highest Variance Week"] = intraweek_results.get("highest_variance_week")
+                    results["Highest Variance"] = intraweek_results.get("highest_variance")
+                elif indicator == "Market Alpha":
+                    results[indicator] = alpha(portfolio_returns, ticker, risk_free_rate)
+                elif indicator == "Market Beta":
+                    results[indicator] = beta(portfolio_returns, ticker)
+                elif indicator == "Modified Sharpe Ratio":
+                    results[indicator] = modified_sharpe(portfolio_returns, risk_free_rate)
+                elif indicator == "Momentum":
+                    results[indicator] = calculate_momentum(portfolio_returns, plot=plot)
+                elif indicator == "RSI":
+                    results[indicator] = calculate_rsi(portfolio_returns, plot=plot)
+                elif indicator == "Sharpe Ratio":
+                    results[indicator] = sharpe_ratio(portfolio_returns, risk_free_rate)
+                elif indicator == "Sortino Ratio":
+                    results[indicator] = sortino_ratio(portfolio_returns, risk_free_rate)
+                elif indicator == "Treynor Ratio":
+                    portfolio_beta = beta(portfolio_returns, ticker)
+                    results[indicator] = treynor_ratio(portfolio_returns, portfolio_beta, risk_free_rate)
+                elif indicator == "VaR":
+                    for level in confidence_levels:
+                        results[_level_label(indicator, level, confidence_levels)] = calculate_var(portfolio_returns, level)
+                elif indicator == "Portfolio Volatility":
+                    results[indicator] = calculate_portfolio_volatility(portfolio_returns, annualize)
+                else:
+                    raise ValueError(f"Unknown indicator {indicator!r}. Choose from {INDICATORS}")
+
+    return results
@@ -0,0 +1,189 @@
+import os
+import numpy as np
+import pandas as pd
+from .instrumentation import span
+from .moments import ReturnMoments
+from .streaming import ReturnAccumulator
+
+# Rows read from a file at a time
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _is_parquet(path):
+    return str(path).endswith((".parquet", ".pq"))
+
+
+def _csv_chunks(path, chunk_size, columns):
+    from pandas.tseries.api import guess_datetime_format
+
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = None if columns is None else [header[0]] + [column for column in header[1:] if column in columns]
+    date_format = None
+    for chunk in pd.read_csv(path, index_col=0, usecols=usecols, chunksize=chunk_size):
+        if date_format is None and len(chunk):
+            # Work out the date format from the first row, then parse every chunk with it
+            date_format = guess_datetime_format(str(chunk.index[0])) or "mixed"
+        dates = pd.DatetimeIndex(pd.to_datetime(chunk.index, format=date_format), name=chunk.index.name)
+        chunk.index = dates
+        yield dates, chunk
+
+
+def _parquet_chunks(path, chunk_size, columns):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    names = parquet.schema_arrow.names
+    # Frames written by pandas name their index in the metadata; otherwise the dates come first
+    metadata = parquet.schema_arrow.pandas_metadata or {}
+    index_columns = [column for column in metadata.get("index_columns", []) if isinstance(column, str)]
+    date_column = index_columns[0] if index_columns else names[0]
+    value_columns = [name for name in names if name != date_column and name not in index_columns]
+    if columns is not None:
+        value_columns = [name for name in value_columns if name in columns]
+
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=[date_column] + value_columns):
+        dates = pd.DatetimeIndex(pd.to_datetime(batch.column(0).to_numpy(zero_copy_only=False)), name=date_column)
+        values = {name: batch.column(i + 1).to_numpy(zero_copy_only=False) for i, name in enumerate(value_columns)}
+        yield dates, pd.DataFrame(values, index=dates, columns=value_columns)
+
+
+def iter_returns(path, chunk_size=DEFAULT_CHUNK_SIZE, columns=None, dtype="float64", validate=True):
+    """
+    Read daily (or intraday) returns from a CSV or Parquet file one chunk of rows at a time.
+
+    Parquet files are read in row-group order without loading the whole file;
+    CSV files are read chunk_size rows at a time and their date format is
+    worked out once from the first row. Memory use is set by chunk_size, not by
+    the size of the file.
+
+    Parameters:
+    path (str): .csv file with the dates in the first column, or .parquet file with a date index
+                (or dates in the first column), and one column per portfolio
+    chunk_size (int): Rows per chunk
+    columns (list): Portfolios to read (default: all)
+    dtype (str): "float64" (default) or "float32" to halve memory
+    validate (bool): Raise a ValueError if the dates are not strictly increasing, within or across chunks
+
+    Returns:
+    generator: pd.DataFrame chunks of returns with a DatetimeIndex, oldest first
+    """
+    chunks = _parquet_chunks if _is_parquet(path) else _csv_chunks
+    last_date = None
+    reader = chunks(path, chunk_size, None if columns is None else set(columns))
+    while True:
+        with span("ingest", os.path.basename(str(path))) as timed:
+            try:
+                dates, chunk = next(reader)
+            except StopIteration:
+                return
+            chunk = chunk.astype(dtype, copy=False)
+            timed.add(rows=len(chunk), bytes=int(chunk.memory_usage(index=True).sum()))
+        if columns is not None:
+            chunk = chunk[[column for column in columns if column in chunk]]
+        if validate and len(dates):
+            if not dates.is_monotonic_increasing or dates.has_duplicates or (
+                    last_date is not None and dates[0] <= last_date):
+                raise ValueError(f"{path}: dates must be strictly increasing; found {_first_disorder(dates, last_date)}")
+            last_date = dates[-1]
+        yield chunk
+
+
+def _first_disorder(dates, last_date):
+    if last_date is not None and dates[0] <= last_date:
+        return f"{dates[0]} after {last_date}"
+    position = int(np.flatnonzero(np.diff(dates.asi8) <= 0)[0])
+    return f"{dates[position + 1]} after {dates[position]}"
+
+
+def return_moments(path, threshold=0.0, chunk_size=DEFAULT_CHUNK_SIZE, columns=None, dtype="float64"):
+    """
+    Moments of every portfolio in a returns file, merged chunk by chunk.
+
+    Parameters:
+    path (str): Returns file (see iter_returns)
+    threshold (float): Daily return below which a return counts as downside (default: 0.0)
+    chunk_size (int): Rows read at a time
+    columns (list): Portfolios to read (default: all)
+    dtype (str): "float64" or "float32" for the chunks read
+
+    Returns:
+    ReturnMoments: Moments of each portfolio, to pass to sharpe_ratio, sortino_ratio and the other
+                   moment-based metrics in place of the returns
+    """
+    moments = None
+    for chunk in iter_returns(path, chunk_size, columns, dtype):
+        block = ReturnMoments.from_returns(chunk, threshold)
+        moments = block if moments is None else moments.merge(block)
+    return moments
+
+
+def ingest_returns(path, risk_free_rate=None, benchmark=None, chunk_size=DEFAULT_CHUNK_SIZE, columns=None,
+                   dtype="float64"):
+    """
+    Feed every portfolio of a returns file into its own ReturnAccumulator, chunk by chunk.
+
+    Parameters:
+    path (str): Returns file (see iter_returns)
+    risk_free_rate (float): Annual risk-free rate (prompted for if None)
+    benchmark (str): Column holding the benchmark's returns, used for beta; it is not analyzed itself
+    chunk_size (int): Rows read at a time
+    columns (list): Portfolios to read (default: all)
+    dtype (str): "float64" or "float32" for the chunks read
+
+    Returns:
+    dict: ReturnAccumulator keyed by portfolio
+    """
+    if columns is not None and benchmark is not None and benchmark not in columns:
+        columns = list(columns) + [benchmark]
+    accumulators = {}
+    for chunk in iter_returns(path, chunk_size, columns, dtype):
+        benchmark_returns = None if benchmark is None else chunk[benchmark]
+        for portfolio in chunk:
+            if portfolio == benchmark:
+                continue
+            if portfolio not in accumulators:
+                accumulators[portfolio] = ReturnAccumulator(risk_free_rate)
+                risk_free_rate = accumulators[portfolio].risk_free_rate
+            # Days before a portfolio's first return do not count towards its history
+            returns = chunk[portfolio]
+            if accumulators[portfolio].count == 0:
+                first = returns.first_valid_index()
+                if first is None:
+                    continue
+                returns = returns.loc[first:]
+            accumulators[portfolio].update_many(returns, benchmark_returns)
+    return accumulators
+
+
+def summarize_returns(path, risk_free_rate=None, benchmark=None, chunk_size=DEFAULT_CHUNK_SIZE, columns=None,
+                      dtype="float64"):
+    """
+    Tear sheet of every portfolio in a returns file, read chunk by chunk so the file may exceed memory.
+
+    Parameters:
+    path (str): Returns file (see iter_returns)
+    risk_free_rate (float): Annual risk-free rate (prompted for if None)
+    benchmark (str): Column holding the benchmark's returns, for beta
+    chunk_size (int): Rows read at a time
+    columns (list): Portfolios to read (default: all)
+    dtype (str): "float64" or "float32" for the chunks read
+
+    Returns:
+    pd.DataFrame: One row per portfolio with the number of returns, Sharpe and Sortino ratios, daily
+                  and annualized volatility, annual return, maximum drawdown, Calmar ratio and beta
+    """
+    accumulators = ingest_returns(path, risk_free_rate, benchmark, chunk_size, columns, dtype)
+    rows = {}
+    for portfolio, accumulator in accumulators.items():
+        rows[portfolio] = {
+            "Returns": accumulator.count,
+            "Sharpe Ratio": accumulator.sharpe_ratio(),
+            "Sortino Ratio": accumulator.sortino_ratio(),
+            "Portfolio Volatility": accumulator.volatility(),
+            "Annualized Volatility": accumulator.volatility(annualize=True),
+            "Annual Return": accumulator.annual_return(),
+            "Maximum Drawdown": accumulator.max_drawdown(),
+            "Calmar Ratio": accumulator.calmar_ratio(),
+            "Market Beta": accumulator.beta() if benchmark is not None else np.nan,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -0,0 +1,201 @@
+import json
+import time
+import threading
+import contextvars
+import pandas as pd
+
+_active_trace = contextvars.ContextVar("seffybacktest_trace", default=None)
+# Indicator being calculated, to which nested events are attributed
+_active_indicator = contextvars.ContextVar("seffybacktest_indicator", default=None)
+
+
+class Trace:
+    """
+    Record where the time of an analysis run goes.
+
+    While a trace is active, every indicator, price download, price cache
+    lookup, index request, Fama-French read, regression fit and plot adds an
+    event with its wall time and, where it applies, rows, bytes and whether a
+    cache served it:
+
+        with Trace("run.jsonl") as trace:
+            calculate_indicators(portfolio_returns, INDICATORS, 0.0425, "^GSPC")
+        trace.summary()
+
+    Events inside an indicator are attributed to it. Without an active trace
+    the instrumented code only checks a context variable.
+    """
+
+    def __init__(self, path=None):
+        """
+        Parameters:
+        path (str): Also append every event to this file as a JSON line
+        """
+        self.path = path
+        self.events = []
+        self._file = None
+        self._lock = threading.Lock()
+        self._tokens = []
+        self._origin = time.perf_counter()
+
+    def __enter__(self):
+        if self.path is not None and self._file is None:
+            self._file = open(self.path, "a")
+        self._tokens.append(_active_trace.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_trace.reset(self._tokens.pop())
+        if not self._tokens and self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def record(self, event, name, start=None, **fields):
+        """
+        Add an event.
+
+        Parameters:
+        event (str): Kind of event, e.g. "indicator", "download" or "price_cache"
+        name (str): What the event is about (indicator name, ticker, dataset, ...)
+        start (float): perf_counter() time the event started (default: now)
+        **fields: Measurements such as duration, rows, bytes or cache ("hit" or "miss")
+        """
+        entry = {
+            "event": event,
+            "name": name,
+            "start": round((time.perf_counter() if start is None else start) - self._origin, 6),
+            "indicator": _active_indicator.get(),
+        }
+        entry.update(fields)
+        with self._lock:
+            self.events.append(entry)
+            if self._file is not None:
+                self._file.write(json.dumps(entry, default=str) + "\n")
+                self._file.flush()
+
+    def to_frame(self):
+        """
+        Every event as a row.
+
+        Returns:
+        pd.DataFrame: Columns event, name, start, indicator, and the measurements recorded
+        """
+        return pd.DataFrame(self.events)
+
+    def summary(self, by=("event", "name")):
+        """
+        Totals per group of events.
+
+        Parameters:
+        by (list): Event fields to group by. Default is the kind of event and its name; use
+                   ("indicator", "event") for the time and data each indicator caused.
+
+        Returns:
+        pd.DataFrame: calls, duration (seconds), rows, bytes, hits and misses per group
+        """
+        frame = self.to_frame()
+        columns = ["calls", "duration", "rows", "bytes", "hits", "misses"]
+        if frame.empty:
+            return pd.DataFrame(columns=list(by) + columns).set_index(list(by))
+
+        for column in ("duration", "rows", "bytes"):
+            if column not in frame:
+                frame[column] = 0
+        cache = frame["cache"] if "cache" in frame else pd.Series(None, index=frame.index)
+        frame["hits"] = (cache == "hit").astype(int)
+        frame["misses"] = (cache == "miss").astype(int)
+        frame["calls"] = 1
+        frame = frame.fillna({"indicator": "", "duration": 0, "rows": 0, "bytes": 0})
+        return frame.groupby(list(by))[columns].sum()
+
+    def to_json_lines(self, path):
+        """
+        Write every event to a file as JSON lines.
+
+        Parameters:
+        path (str): File to write
+        """
+        with open(path, "w") as f:
+            for entry in self.events:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+
+class _Span:
+    __slots__ = ("trace", "event", "name", "fields", "start", "token")
+
+    def __init__(self, trace, event, name, fields):
+        self.trace = trace
+        self.event = event
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.token = _active_indicator.set(self.name) if self.event == "indicator" else None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.start
+        if self.token is not None:
+            _active_indicator.reset(self.token)
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        self.trace.record(self.event, self.name, self.start, duration=round(duration, 6), **self.fields)
+
+    def add(self, **fields):
+        self.fields.update(fields)
+
+
+class _NullSpan:
+    # Shared by every span opened while no trace is active
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def add(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def current_trace():
+    """
+    Return the Trace active in this context, or None.
+    """
+    return _active_trace.get()
+
+
+def span(event, name, **fields):
+    """
+    Time a block of code as one event of the active trace, if any:
+
+        with span("download", ticker) as timed:
+            prices = _download(ticker, start, end)
+            timed.add(rows=len(prices))
+
+    Parameters:
+    event (str): Kind of event
+    name (str): What the event is about
+    **fields: Measurements known up front
+
+    Returns:
+    A context manager whose add(**fields) attaches measurements taken inside the block
+    """
+    trace = _active_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, event, name, fields)
+
+
+def record(event, name, **fields):
+    """
+    Add an instantaneous event (e.g. a cache hit) to the active trace, if any.
+    """
+    trace = _active_trace.get()
+    if trace is not None:
+        trace.record(event, name, **fields)
@@ -1,26 +1,23 @@
-import numpy as np
 import pandas as pd
-import datetime as dt
+from .calendar_buckets import calendar_statistics
 
 def calculate_intraweek_variances(portfolio_returns):
     """
     Calculate intraweek variances of portfolio returns.
     
     Parameters:
-    portfolio_returns (pd.Series): Daily portfolio returns with a DatetimeIndex
+    portfolio_returns (pd.Series or pd.DataFrame): Daily portfolio returns with a DatetimeIndex, or one column per portfolio
     
     Returns:
-    pd.Series: Weekly variances of portfolio returns
+    pd.Series: Weekly variances of portfolio returns, labelled by the Sunday ending each week
+               (pd.DataFrame with one column per portfolio for a returns matrix)
     """
     # Ensure the index is DatetimeIndex
     if not isinstance(portfolio_returns.index, pd.DatetimeIndex):
         raise ValueError("portfolio_returns must have a DatetimeIndex")
 
-    # Group returns by week
-    weekly_groups = portfolio_returns.groupby(pd.Grouper(freq='W'))
-
-    # Calculate variance for each week
-    intraweek_variances = weekly_groups.apply(lambda x: np.var(x, ddof=1) if len(x) > 1 else np.nan)
+    # Calculate variance for each week, all weeks in one pass
+    intraweek_variances = calendar_statistics(portfolio_returns, "week")["variance"]
 
     return intraweek_variances
 
@@ -32,7 +29,7 @@ def analyze_portfolio_volatility(portfolio_returns, interactive=False,
     Analyze portfolio volatility using intraweek variances.
     
     Parameters:
-    portfolio_returns (pd.Series): Daily portfolio returns with a DatetimeIndex
+    portfolio_returns (pd.Series or pd.DataFrame): Daily portfolio returns with a DatetimeIndex, or one column per portfolio
     interactive (bool): If True, prompts user for input on what to return
     return_avg_variance (bool): Whether to return average intraweek variance
     return_highest_week (bool): Whether to return the week with highest variance
@@ -40,6 +37,7 @@ def analyze_portfolio_volatility(portfolio_returns, interactive=False,
     
     Returns:
     dict: Analysis results based on user preferences or function parameters
+          (each keyed by portfolio in a pd.Series for a returns matrix)
     """
     if interactive:
         return_avg_variance = input("Return average intraweek variance? (Y/N): ").upper() == 'Y'
@@ -52,11 +50,14 @@ def analyze_portfolio_volatility(portfolio_returns, interactive=False,
     results = {}
 
     if return_avg_variance:
-        results["average_intraweek_variance"] = np.mean(intraweek_vars)
+        results["average_intraweek_variance"] = intraweek_vars.mean()
 
     if return_highest_week:
         highest_week = intraweek_vars.idxmax()
-        results["highest_variance_week"] = highest_week.date()
+        if isinstance(highest_week, pd.Series):
+            results["highest_variance_week"] = highest_week.dt.date
+        else:
+            results["highest_variance_week"] = highest_week.date()
 
     if return_highest_variance:
         results["highest_variance"] = intraweek_vars.max()
@@ -1,19 +1,20 @@
 import pandas as pd
-import yfinance as yf
-from sklearn.linear_model import LinearRegression
+from .regression import ols
+from .session import get_index_returns
 from .sharpe_ratio import get_risk_free_rate
 
-def alpha(portfolio_returns, ticker = None , risk_free_rate=None):
+def alpha(portfolio_returns, ticker = None , risk_free_rate=None, session=None):
     """
     Calculate the alpha of a portfolio.
 
     Parameters:
-    portfolio_returns (pd.Series): Daily returns of the portfolio
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
     benchmark_ticker (str): Ticker symbol for the benchmark index (default is S&P 500)
     risk_free_rate (float): Annualized risk-free rate (if None, it will be fetched)
+    session (MarketDataSession): Session sharing benchmark downloads (defaults to the active session)
 
     Returns:
-    float: Annualized alpha of the portfolio
+    float: Annualized alpha of the portfolio (pd.Series keyed by portfolio for a returns matrix)
     """
     # Ask user for benchmark ticker
     if ticker is None:
@@ -23,33 +24,29 @@ def alpha(portfolio_returns, ticker = None , risk_free_rate=None):
 
     
     # Ensure the index is datetime
-    portfolio_returns.index = pd.to_datetime(portfolio_returns.index)
+    portfolio_returns = portfolio_returns.set_axis(pd.to_datetime(portfolio_returns.index))
 
     # Get benchmark returns
     start_date = portfolio_returns.index[0]
     end_date = portfolio_returns.index[-1]
-    benchmark_data = yf.download(index_ticker, start=start_date, end=end_date)
-    benchmark_returns = benchmark_data['Adj Close'].pct_change().dropna()
+    benchmark_returns = get_index_returns(index_ticker, start_date, end_date, session)
 
     # Align dates
-    aligned_data = pd.concat([portfolio_returns, benchmark_returns], axis=1).dropna()
-    aligned_data.columns = ['Portfolio', 'Benchmark']
+    benchmark_returns = benchmark_returns.reindex(portfolio_returns.index)
 
     # Calculate excess returns
     if risk_free_rate is None:
         risk_free_rate = get_risk_free_rate()  # Assuming you have this function
     daily_rf = (1 + risk_free_rate) ** (1/252) - 1
 
-    excess_portfolio_returns = aligned_data['Portfolio'] - daily_rf
-    excess_benchmark_returns = aligned_data['Benchmark'] - daily_rf
+    excess_portfolio_returns = portfolio_returns - daily_rf
+    excess_benchmark_returns = benchmark_returns - daily_rf
 
-    # Perform regression
-    X = excess_benchmark_returns.values.reshape(-1, 1)
-    y = excess_portfolio_returns.values
-    model = LinearRegression().fit(X, y)
+    # Perform regression (every portfolio column in one solve) over the days both have returns
+    fit = ols(excess_portfolio_returns, excess_benchmark_returns)
 
     # Calculate alpha
-    alpha = model.intercept_
+    alpha = fit["alpha"]
 
     # Annualize alpha
     alpha_annualized = (1 + alpha) ** 252 - 1
@@ -1,7 +1,9 @@
-import yfinance as yf
+import pandas as pd
+from .regression import ols
+from .session import get_index_returns
 
 
-def beta(portfolio_returns, ticker=None):
+def beta(portfolio_returns, ticker=None, session=None):
     # Extract start and end dates from the portfolio returns DataFrame
     start_date = portfolio_returns.index[0]
     end_date = portfolio_returns.index[-1]
@@ -11,8 +13,11 @@ def beta(portfolio_returns, ticker=None):
         ticker = input("Enter the benchmark ticker symbol (Enter for default: ^GSPC): ").strip()
         if ticker == "":
             ticker = "^GSPC"
-    sp500_data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-    sp500_returns = sp500_data['Close'].pct_change().dropna()
+    sp500_returns = get_index_returns(ticker, start_date, end_date, session)
+
+    # One column per portfolio: regression slopes of all of them in one solve
+    if isinstance(portfolio_returns, pd.DataFrame):
+        return ols(portfolio_returns, sp500_returns)["betas"].iloc[:, 0]
 
     # Align portfolio and S&P 500 returns based on common dates
     common_dates = portfolio_returns.index.intersection(sp500_returns.index)
@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+from .returns_matrix import as_returns_matrix
+
+_MOMENT_FIELDS = ("count", "mean", "m2", "m3", "m4", "downside_m2", "downside_count", "minimum", "maximum")
+# Values of the extremes before any return is seen; JSON has no infinities, so they are saved as null
+_EMPTY_EXTREMES = {"minimum": np.inf, "maximum": -np.inf}
+
+
+def _replace(values, old, new):
+    # Swap one value in a number or (nested) list of them, as written by tolist()
+    if isinstance(values, list):
+        return [_replace(value, old, new) for value in values]
+    return new if values == old else values
+
+
+class ReturnMoments:
+    """
+    Summary statistics of daily returns from which every Sharpe-family ratio is derived.
+
+    Holds, per portfolio, the number of returns, their mean, the central moment
+    sums M2, M3 and M4, the sum of squared shortfalls below a threshold (the
+    daily risk-free rate) with their count, and the minimum and maximum return.
+    Moments of consecutive or disjoint chunks can be combined with merge(), so a
+    history can be summarized without holding it in memory.
+
+    Compute the moments once and pass them to sharpe_ratio, sortino_ratio,
+    adjusted_sharpe, modified_sharpe, double_sharpe, treynor_ratio or
+    calculate_portfolio_volatility in place of the returns:
+
+        moments = ReturnMoments.from_returns(portfolio_returns, threshold=daily_risk_free_rate)
+        sharpe_ratio(moments, risk_free_rate)
+    """
+
+    def __init__(self, count, mean, m2, m3, m4, downside_m2, downside_count, minimum, maximum,
+                 threshold=0.0, portfolios=None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.m3 = m3
+        self.m4 = m4
+        self.downside_m2 = downside_m2
+        self.downside_count = downside_count
+        self.minimum = minimum
+        self.maximum = maximum
+        self.threshold = threshold
+        self.portfolios = portfolios
+
+    @classmethod
+    def from_returns(cls, portfolio_returns, threshold=0.0):
+        """
+        Compute the moments of daily returns in one vectorized pass.
+
+        Parameters:
+        portfolio_returns (pd.Series, pd.DataFrame or np.ndarray): Daily returns, or one column per portfolio
+        threshold (float): Daily return below which a return counts as downside (default: 0.0)
+
+        Returns:
+        ReturnMoments: Moments of each portfolio
+        """
+        matrix = as_returns_matrix(portfolio_returns)
+        if matrix is None:
+            returns = np.asarray(portfolio_returns, dtype=float).reshape(-1, 1)
+            portfolios = None
+        else:
+            returns, portfolios = matrix
+
+        valid = ~np.isnan(returns)
+        if valid.all():
+            count = np.full(returns.shape[1], float(returns.shape[0]))
+            mean = returns.sum(axis=0) / count
+            deviations = returns - mean
+            below = returns < threshold
+            minimum = returns.min(axis=0, initial=np.inf)
+            maximum = returns.max(axis=0, initial=-np.inf)
+        else:
+            # Missing returns contribute nothing to any of the sums
+            count = valid.sum(axis=0).astype(float)
+            returns = np.where(valid, returns, 0.0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(count > 0, returns.sum(axis=0) / count, 0.0)
+            deviations = np.where(valid, returns - mean, 0.0)
+            below = valid & (returns < threshold)
+            minimum = np.where(valid, returns, np.inf).min(axis=0)
+            maximum = np.where(valid, returns, -np.inf).max(axis=0)
+
+        # One scratch array holds the squared deviations, then the squared shortfalls
+        scratch = deviations * deviations
+        m2 = scratch.sum(axis=0)
+        m3 = np.einsum('ij,ij->j', scratch, deviations)
+        m4 = np.einsum('ij,ij->j', scratch, scratch)
+        np.subtract(returns, threshold, out=scratch)
+        np.multiply(scratch, below, out=scratch)
+        downside_m2 = np.einsum('ij,ij->j', scratch, scratch)
+
+        return cls(
+            count=count,
+            mean=mean,
+            m2=m2,
+            m3=m3,
+            m4=m4,
+            downside_m2=downside_m2,
+            downside_count=below.sum(axis=0).astype(float),
+            minimum=minimum,
+            maximum=maximum,
+            threshold=threshold,
+            portfolios=portfolios,
+        )
+
+    @classmethod
+    def of(cls, portfolio_returns, threshold=0.0):
+        """
+        Return portfolio_returns unchanged if it already is a ReturnMoments, else compute its moments.
+        """
+        if isinstance(portfolio_returns, cls):
+            return portfolio_returns
+        return cls.from_returns(portfolio_returns, threshold)
+
+    def merge(self, other):
+        """
+        Combine the moments of two sets of returns for the same portfolios.
+
+        Parameters:
+        other (ReturnMoments): Moments of the other returns, computed with the same threshold
+
+        Returns:
+        ReturnMoments: Moments of both sets of returns together
+        """
+        if other.threshold != self.threshold:
+            raise ValueError("Cannot merge moments computed with different downside thresholds")
+
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            mean = np.where(n > 0, self.mean + delta * n_b / n, 0.0)
+            m2 = self.m2 + other.m2 + np.where(n > 0, delta**2 * n_a * n_b / n, 0.0)
+            m3 = self.m3 + other.m3 + np.where(
+                n > 0,
+                delta**3 * n_a * n_b * (n_a - n_b) / n**2 + 3 * delta * (n_a * other.m2 - n_b * self.m2) / n,
+                0.0)
+            m4 = self.m4 + other.m4 + np.where(
+                n > 0,
+                delta**4 * n_a * n_b * (n_a**2 - n_a * n_b + n_b**2) / n**3
+                + 6 * delta**2 * (n_a**2 * other.m2 + n_b**2 * self.m2) / n**2
+                + 4 * delta * (n_a * other.m3 - n_b * self.m3) / n,
+                0.0)
+
+        return ReturnMoments(
+            count=n,
+            mean=mean,
+            m2=m2,
+            m3=m3,
+            m4=m4,
+            downside_m2=self.downside_m2 + other.downside_m2,
+            downside_count=self.downside_count + other.downside_count,
+            minimum=np.fmin(self.minimum, other.minimum),
+            maximum=np.fmax(self.maximum, other.maximum),
+            threshold=self.threshold,
+            portfolios=self.portfolios,
+        )
+
+    def to_dict(self):
+        """
+        Return the moments as plain Python values that can be stored as JSON.
+        """
+        state = {name: np.asarray(getattr(self, name), dtype=float).tolist() for name in _MOMENT_FIELDS}
+        for name, empty in _EMPTY_EXTREMES.items():
+            state[name] = _replace(state[name], empty, None)
+        state["threshold"] = float(self.threshold)
+        state["portfolios"] = None if self.portfolios is None else list(self.portfolios)
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild moments saved with to_dict().
+        """
+        state = {**state, **{name: _replace(state[name], None, empty) for name, empty in _EMPTY_EXTREMES.items()}}
+        values = {name: np.asarray(state[name], dtype=float) for name in _MOMENT_FIELDS}
+        portfolios = None if state["portfolios"] is None else pd.Index(state["portfolios"])
+        return cls(threshold=state["threshold"], portfolios=portfolios, **values)
+
+    def std(self, ddof=1):
+        """
+        Standard deviation of the returns.
+        """
+        return np.sqrt(self.m2 / (self.count - ddof))
+
+    @property
+    def skewness(self):
+        """
+        Sample skewness (biased, as scipy.stats.skew).
+        """
+        return np.sqrt(self.count) * self.m3 / self.m2**1.5
+
+    @property
+    def kurtosis(self):
+        """
+        Sample excess kurtosis (biased, as scipy.stats.kurtosis).
+        """
+        return self.count * self.m4 / self.m2**2 - 3
+
+    @property
+    def downside_deviation(self):
+        """
+        Root mean square of the returns below the threshold, measured from the threshold.
+        """
+        return np.sqrt(self.downside_m2 / self.downside_count)
+
+    def wrap(self, values):
+        """
+        Shape a per-portfolio result like the returns the moments came from.
+
+        Returns:
+        float: For a single portfolio
+        pd.Series: Keyed by portfolio for a returns matrix
+        """
+        if self.portfolios is None:
+            return np.asarray(values, dtype=float).reshape(-1)[0]
+        return pd.Series(values, index=self.portfolios)
@@ -1,26 +1,49 @@
-import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Common momentum lookbacks in trading days
+MOMENTUM_LOOKBACKS = {"1M": 21, "3M": 63, "6M": 126, "12M": 252}
+
+
+def _log_wealth(values):
+    # Row i holds the log growth of the first i returns; missing returns count as 0
+    log_wealth = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(np.log1p(np.nan_to_num(values)), axis=0, out=log_wealth[1:])
+    return log_wealth
+
+
+def _lookback_returns(log_wealth, lookback, skip=0):
+    # Compounded return over the `lookback` days to each date, leaving out the last `skip` days
+    n = len(log_wealth) - 1
+    result = np.full((n,) + log_wealth.shape[1:], np.nan)
+    if lookback < n:
+        result[lookback:] = np.expm1(log_wealth[lookback + 1 - skip:n + 1 - skip] - log_wealth[1:n + 1 - lookback])
+    return result
 
 
 def calculate_momentum(returns, window=14, plot=False):
     """
     Calculate the momentum for a given returns series.
-    
+
     Parameters:
-    returns (pd.Series): A pandas Series of portfolio returns.
+    returns (pd.Series or pd.DataFrame): A pandas Series of portfolio returns, or one column per asset.
     window (int): The number of periods to use for momentum calculation. Default is 14.
     plot (bool): Whether to plot the momentum. Default is False.
-    
+
     Returns:
-    pd.Series: A pandas Series with the calculated momentum values.
+    pd.Series: A pandas Series with the calculated momentum values (pd.DataFrame for a returns matrix).
     """
-    # Calculate cumulative returns
-    cum_returns = (1 + returns).cumprod()
-    
-    # Calculate momentum
-    momentum = cum_returns.pct_change(periods=window)
+    # Compounded return over the window, from one cumulative sum of log returns
+    values = returns.to_numpy(dtype=float)
+    momentum = _lookback_returns(_log_wealth(values), window)
+    if isinstance(returns, pd.DataFrame):
+        momentum = pd.DataFrame(momentum, index=returns.index, columns=returns.columns)
+    else:
+        momentum = pd.Series(momentum, index=returns.index, name=returns.name)
 
     # # Prompt user option to print the momentum plot
     # if plot:
+    #     import matplotlib.pyplot as plt
     #     plt.figure(figsize=(12, 6))
     #     plt.plot(momentum.index, momentum, label='Momentum')
     #     plt.axhline(y=0, color='r', linestyle='--')
@@ -32,3 +55,73 @@ def calculate_momentum(returns, window=14, plot=False):
 
     return momentum
 
+
+def momentum_signals(returns, lookbacks=MOMENTUM_LOOKBACKS, skip=0):
+    """
+    Calculate momentum over several lookbacks for a whole universe in one pass.
+
+    Log returns are accumulated once; the compounded return over any lookback
+    is then a difference of two rows, so every lookback and asset costs one
+    vectorized subtraction. With skip=21 the 12M lookback becomes the classic
+    12-1 month momentum that leaves out the most recent month (pass lookbacks
+    longer than 21 days, e.g. {"12M": 252}).
+
+    Parameters:
+    returns (pd.DataFrame or pd.Series): Daily returns with one column per asset
+    lookbacks (dict or list): Lookbacks in trading days, keyed by label. Default is 1, 3, 6 and 12 months.
+    skip (int): Number of most recent days left out of every lookback, shorter than each lookback (default: 0)
+
+    Returns:
+    dict: Momentum per date and asset (same shape as the returns) keyed by lookback label
+    """
+    if not isinstance(lookbacks, dict):
+        lookbacks = {lookback: lookback for lookback in lookbacks}
+    too_short = [label for label, lookback in lookbacks.items() if skip >= lookback]
+    if too_short:
+        raise ValueError(f"skip={skip} leaves nothing of the lookbacks {too_short}; it must be shorter than each lookback")
+    log_wealth = _log_wealth(returns.to_numpy(dtype=float))
+
+    signals = {}
+    for label, lookback in lookbacks.items():
+        values = _lookback_returns(log_wealth, lookback, skip)
+        if isinstance(returns, pd.DataFrame):
+            signals[label] = pd.DataFrame(values, index=returns.index, columns=returns.columns)
+        else:
+            signals[label] = pd.Series(values, index=returns.index, name=returns.name)
+    return signals
+
+
+def cross_sectional_rank(signals):
+    """
+    Rank every asset against the others on each date, as a percentile in (0, 1].
+
+    Parameters:
+    signals (pd.DataFrame or dict): Signal per date (rows) and asset (columns), or a dict of them
+                                    as returned by momentum_signals
+
+    Returns:
+    pd.DataFrame or dict: Percentile ranks in the same shape, NaN where the signal is missing
+    """
+    if isinstance(signals, dict):
+        return {label: cross_sectional_rank(signal) for label, signal in signals.items()}
+
+    values = signals.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    # One sort of every row (missing signals sort last)
+    order = np.argsort(values, axis=1)
+    ordered = np.take_along_axis(values, order, axis=1)
+
+    # Tied signals share the average of their positions, as with pandas' rank
+    positions = np.broadcast_to(np.arange(values.shape[1]), values.shape)
+    run_start = np.ones(values.shape, dtype=bool)
+    run_start[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    run_end = np.ones(values.shape, dtype=bool)
+    run_end[:, :-1] = run_start[:, 1:]
+    first = np.maximum.accumulate(np.where(run_start, positions, 0), axis=1)
+    last = np.minimum.accumulate(np.where(run_end, positions, values.shape[1])[:, ::-1], axis=1)[:, ::-1]
+
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ranks = np.where(valid, ranks / valid.sum(axis=1, keepdims=True), np.nan)
+    return pd.DataFrame(ranks, index=signals.index, columns=signals.columns)
@@ -0,0 +1,177 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .moments import ReturnMoments
+
+SIMULATION_METHODS = ("normal", "t", "fhs")
+
+
+def _matrix_root(covariance):
+    # Cholesky factor, or a symmetric root if the covariance is only positive semi-definite
+    try:
+        return np.linalg.cholesky(covariance)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def fit_simulation_model(asset_returns, weights, method="normal", degrees_of_freedom=None, decay=0.94):
+    """
+    Fit the return model that simulate_var draws from.
+
+    Parameters:
+    asset_returns (pd.DataFrame): Daily returns with one column per asset
+    weights (list): Portfolio weight of each asset
+    method (str): "normal" for a multivariate normal fit, "t" for a multivariate Student-t with the
+                  same covariance, or "fhs" for filtered historical simulation (bootstrapped days of
+                  EWMA-standardized returns, rescaled by the volatility along each path)
+    degrees_of_freedom (float): Degrees of freedom of the Student-t. If None, they are matched to the
+                                excess kurtosis of the historical portfolio returns.
+    decay (float): EWMA decay of the volatility filter used by "fhs" (default: 0.94, RiskMetrics)
+
+    Returns:
+    dict: Model parameters (plain arrays, so the model can be sent to worker processes)
+    """
+    if method not in SIMULATION_METHODS:
+        raise ValueError(f"Unknown simulation method {method!r}. Choose from {SIMULATION_METHODS}")
+
+    returns = np.asarray(asset_returns, dtype=float).reshape(len(asset_returns), -1)
+    returns = returns[~np.isnan(returns).any(axis=1)]
+    weights = np.asarray(weights, dtype=float)
+    mean = returns.mean(axis=0)
+    model = {"method": method, "mean": mean}
+
+    if method in ("normal", "t"):
+        covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+        if method == "t":
+            if degrees_of_freedom is None:
+                # A Student-t with v degrees of freedom has excess kurtosis 6 / (v - 4)
+                kurtosis = ReturnMoments.from_returns(returns @ weights).kurtosis
+                degrees_of_freedom = 4 + 6 / kurtosis if kurtosis > 0 else np.inf
+            # Scale the t so its covariance matches the historical one
+            if np.isfinite(degrees_of_freedom):
+                covariance = covariance * (degrees_of_freedom - 2) / degrees_of_freedom
+            model["degrees_of_freedom"] = degrees_of_freedom
+        model["root"] = _matrix_root(covariance)
+    else:
+        deviations = returns - mean
+        variance = np.empty_like(deviations)
+        variance[0] = deviations.var(axis=0)
+        for t in range(1, len(deviations)):
+            variance[t] = decay * variance[t - 1] + (1 - decay) * deviations[t - 1] ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            model["residuals"] = np.nan_to_num(deviations / np.sqrt(variance))
+        # Volatility forecast for the first simulated day
+        model["variance"] = decay * variance[-1] + (1 - decay) * deviations[-1] ** 2
+        model["decay"] = decay
+    return model
+
+
+def _simulate_chunk(model, weights, horizons, size, rng):
+    """
+    Simulate `size` paths and return the cumulative portfolio return of each path at every horizon.
+    """
+    method = model["method"]
+    mean = model["mean"]
+    wealth = np.ones(size)
+    if method == "fhs":
+        variance = np.tile(model["variance"], (size, 1))
+
+    outcomes = {}
+    for day in range(1, max(horizons) + 1):
+        if method == "fhs":
+            shocks = model["residuals"][rng.integers(0, len(model["residuals"]), size)] * np.sqrt(variance)
+            variance = model["decay"] * variance + (1 - model["decay"]) * shocks ** 2
+            asset_returns = mean + shocks
+        else:
+            asset_returns = rng.standard_normal((size, len(mean))) @ model["root"].T
+            if method == "t" and np.isfinite(model["degrees_of_freedom"]):
+                dof = model["degrees_of_freedom"]
+                asset_returns *= np.sqrt(dof / rng.chisquare(dof, size))[:, np.newaxis]
+            asset_returns += mean
+
+        # Fixed weights, rebalanced daily
+        wealth *= 1 + asset_returns @ weights
+        if day in horizons:
+            outcomes[day] = wealth - 1
+    return outcomes
+
+
+def _keep_worst(worst, outcomes, keep):
+    combined = outcomes if worst is None else np.concatenate([worst, outcomes])
+    if len(combined) > keep:
+        combined = np.partition(combined, keep - 1)[:keep]
+    return combined
+
+
+def _simulate_chunks(model, weights, horizons, chunks, keep):
+    """
+    Simulate a list of (size, seed) chunks, keeping only the `keep` worst outcomes per horizon.
+    """
+    worst = dict.fromkeys(horizons)
+    for size, seed in chunks:
+        outcomes = _simulate_chunk(model, weights, horizons, size, np.random.default_rng(seed))
+        for horizon in horizons:
+            worst[horizon] = _keep_worst(worst[horizon], outcomes[horizon], keep)
+    return worst
+
+
+def _simulate_chunks_args(args):
+    return _simulate_chunks(*args)
+
+
+def simulate_var(asset_returns, weights, horizons=(1, 5, 10, 20), confidence_levels=(0.95, 0.99),
+                 method="normal", n_paths=1_000_000, chunk_size=50_000, seed=None, processes=1,
+                 degrees_of_freedom=None, decay=0.94):
+    """
+    Calculate Value at Risk (VaR) and CVaR over several horizons by Monte Carlo simulation.
+
+    Paths are simulated in chunks of `chunk_size`, each from its own seeded
+    generator, and only the worst outcomes needed for the lowest confidence
+    level are kept between chunks, so memory stays bounded however many paths
+    are drawn. Results depend on the seed but not on the number of processes.
+
+    Parameters:
+    asset_returns (pd.DataFrame): Daily returns with one column per asset (see get_asset_returns)
+    weights (list): Portfolio weight of each asset, rebalanced daily
+    horizons (list): Horizons in trading days. Default is 1, 5, 10 and 20 days.
+    confidence_levels (list): Confidence levels (default: 0.95 and 0.99)
+    method (str): "normal", "t" or "fhs" (see fit_simulation_model)
+    n_paths (int): Number of simulated paths (default: 1,000,000)
+    chunk_size (int): Number of paths simulated at once (default: 50,000)
+    seed (int): Seed of the random generator, for reproducible results
+    processes (int): Number of worker processes the chunks are spread over (default: 1)
+    degrees_of_freedom (float): Degrees of freedom for the "t" method (fitted if None)
+    decay (float): EWMA decay for the "fhs" method (default: 0.94)
+
+    Returns:
+    pd.DataFrame: VaR and CVaR (as positive losses) for every (horizon, confidence_level)
+    """
+    weights = np.asarray(weights, dtype=float)
+    horizons = sorted(set(horizons))
+    model = fit_simulation_model(asset_returns, weights, method, degrees_of_freedom, decay)
+
+    # Enough of the worst outcomes to read the lowest confidence level
+    keep = int((1 - min(confidence_levels)) * n_paths) + 1
+    sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    chunks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+    if processes == 1 or len(chunks) == 1:
+        worst = _simulate_chunks(model, weights, horizons, chunks, keep)
+    else:
+        tasks = [(model, weights, horizons, chunks[i::processes], keep) for i in range(processes)]
+        with ProcessPoolExecutor(processes) as executor:
+            partial = list(executor.map(_simulate_chunks_args, tasks))
+        worst = {horizon: np.concatenate([result[horizon] for result in partial]) for horizon in horizons}
+        worst = {horizon: _keep_worst(None, outcomes, keep) for horizon, outcomes in worst.items()}
+
+    rows = []
+    for horizon in horizons:
+        outcomes = np.sort(worst[horizon])
+        for confidence_level in confidence_levels:
+            position = int((1 - confidence_level) * n_paths)
+            # CVaR is the mean of the worst (1 - confidence_level) share of the paths
+            rows.append((horizon, confidence_level, -outcomes[position], -outcomes[:position + 1].mean()))
+
+    result = pd.DataFrame(rows, columns=["horizon", "confidence_level", "VaR", "CVaR"])
+    return result.set_index(["horizon", "confidence_level"])
@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+from .calendar_buckets import bucket_codes
+
+REBALANCE_SCHEDULES = ("daily", "weekly", "monthly", "quarterly", "yearly", "never")
+
+# Calendar bucket whose first trading day is a rebalancing day
+_SCHEDULE_BUCKETS = {"weekly": "week", "monthly": "month", "quarterly": "quarter", "yearly": "year"}
+
+
+def _target_weights(weights, asset_returns, dtype):
+    """
+    Align the weights to the assets.
+
+    Returns:
+    tuple: (np.ndarray of target weights, one row per day or a single row for fixed weights,
+            np.ndarray of the days a new row of weights starts, or None for fixed weights)
+    """
+    if isinstance(weights, pd.DataFrame):
+        weights = weights.sort_index().reindex(columns=asset_returns.columns)
+        # A row of weights is held from its date, or from the next trading day after it
+        starts = np.searchsorted(asset_returns.index, weights.index)
+        rows = np.searchsorted(starts, np.arange(len(asset_returns)), side="right") - 1
+        targets = np.nan_to_num(weights.to_numpy(dtype=dtype))
+        # Cash (zero weights) before the first row
+        targets = np.vstack([np.zeros((1, targets.shape[1]), dtype=dtype), targets])[rows + 1]
+        return targets, np.unique(starts[starts < len(asset_returns)])
+
+    if isinstance(weights, pd.Series):
+        weights = weights.reindex(asset_returns.columns).fillna(0.0)
+    targets = np.asarray(weights, dtype=dtype).reshape(1, -1)
+    if targets.shape[1] != asset_returns.shape[1]:
+        raise ValueError(f"Got {targets.shape[1]} weights for {asset_returns.shape[1]} assets")
+    return targets, None
+
+
+def _rebalancing_days(index, rebalance, weight_starts):
+    # Boolean mask of the days the portfolio is brought back to its target weights
+    days = np.zeros(len(index), dtype=bool)
+    if len(index):
+        days[0] = True
+    if rebalance is None:
+        if weight_starts is None:
+            days[:] = True
+        else:
+            days[weight_starts] = True
+    elif rebalance == "daily":
+        days[:] = True
+    elif rebalance in _SCHEDULE_BUCKETS:
+        codes, _ = bucket_codes(index, _SCHEDULE_BUCKETS[rebalance])
+        days[1:] |= codes[1:] != codes[:-1]
+    return days
+
+
+def _rebalance_daily(held, returns, drifted):
+    """
+    Hold the given weights every day, trading back to them each morning.
+
+    Parameters:
+    held (np.ndarray): Weights held during each day, one row per day
+    returns (np.ndarray): Asset returns, one row per day
+    drifted (np.ndarray): Weights the first day starts from (zeros for a new portfolio)
+
+    Returns:
+    tuple: (gross portfolio return per day, turnover per day, weights at the end of the last day)
+    """
+    gross = np.einsum('ij,ij->i', held, returns)
+    # Weights at the end of each day, drifted by its returns
+    after = held * (1 + returns) / (1 + gross[:, np.newaxis])
+    turnover = np.empty(len(held), dtype=gross.dtype)
+    if len(held):
+        turnover[0] = np.abs(held[0] - drifted).sum()
+        turnover[1:] = np.abs(held[1:] - after[:-1]).sum(axis=1)
+        drifted = after[-1]
+    return gross, turnover, drifted
+
+
+def _drift_block(held, returns):
+    """
+    Let weights drift over a block of days without trading.
+
+    Parameters:
+    held (np.ndarray): Weights held at the start of the first day (fractions of the portfolio value)
+    returns (np.ndarray): Asset returns of the block, one row per day
+
+    Returns:
+    tuple: (gross portfolio return per day, weights at the end of every day)
+    """
+    # Value of each position relative to the portfolio value at the start of the block
+    values = held * np.cumprod(1 + returns, axis=0)
+    wealth = (1 - held.sum()) + values.sum(axis=1)
+    previous = np.concatenate([np.ones(1, dtype=wealth.dtype), wealth[:-1]])
+    return wealth / previous - 1, values / wealth[:, np.newaxis]
+
+
+def simulate_portfolio(asset_returns, weights, rebalance=None, threshold=None, transaction_cost=0.0,
+                       dtype="float64", chunk_size=252, return_weights=False):
+    """
+    Simulate a portfolio that drifts with the markets between rebalancing days.
+
+    On a rebalancing day the positions are traded back to their target weights
+    before that day's return. Between rebalances each position grows with its
+    own returns, so weights drift. Turnover is the sum of absolute weight
+    changes traded (buying the initial positions counts), and every trade
+    costs `transaction_cost` times its size, charged against that day's return.
+    Weights that do not sum to 1 leave the rest in cash, earning nothing.
+    Missing asset returns count as 0.
+
+    Daily rebalancing is computed for all days at once. Other schedules drift
+    every holding period as one vectorized block (at most `chunk_size` days),
+    so the Python loop runs once per period rather than once per day.
+
+    Parameters:
+    asset_returns (pd.DataFrame): Daily returns with one column per asset (see get_asset_returns)
+    weights (list, pd.Series or pd.DataFrame): Target weight of each asset, or target weights per date
+                                               (one row per date, one column per asset). A row applies
+                                               from its date until the next row; before the first row
+                                               the portfolio is in cash.
+    rebalance (str): One of REBALANCE_SCHEDULES. If None, fixed weights are rebalanced daily and a
+                     weights DataFrame is rebalanced on the dates of its rows.
+    threshold (float): Also rebalance whenever a weight has drifted more than this from its target
+                       (e.g. 0.05). Use rebalance="never" for threshold rebalancing alone.
+    transaction_cost (float): Cost per unit of turnover, e.g. 0.001 for 10 basis points (default: 0)
+    dtype (str): "float64" (default) or "float32" to halve memory and time on large universes
+    chunk_size (int): Longest block of days drifted at once (default: 252)
+    return_weights (bool): Also return the weights held on every day (default: False)
+
+    Returns:
+    dict: "returns" (net of costs), "gross_returns", "turnover" and "costs" as pd.Series, and
+          "weights" (pd.DataFrame of the weights held during each day) if return_weights is True
+    """
+    if rebalance is not None and rebalance not in REBALANCE_SCHEDULES:
+        raise ValueError(f"Unknown rebalancing schedule {rebalance!r}. Choose from {REBALANCE_SCHEDULES}")
+
+    dtype = np.dtype(dtype)
+    returns = np.nan_to_num(asset_returns.to_numpy(dtype=dtype))
+    targets, weight_starts = _target_weights(weights, asset_returns, dtype)
+    n_days, n_assets = returns.shape
+    scheduled = _rebalancing_days(asset_returns.index, rebalance, weight_starts)
+
+    gross = np.zeros(n_days, dtype=dtype)
+    turnover = np.zeros(n_days, dtype=dtype)
+    held_weights = np.empty((n_days, n_assets), dtype=dtype) if return_weights else None
+
+    if scheduled.all() and threshold is None:
+        # Daily rebalancing: the weights held are the targets
+        held = np.broadcast_to(targets, returns.shape)
+        gross[:], turnover[:], _ = _rebalance_daily(held, returns, np.zeros(n_assets, dtype=dtype))
+        if return_weights:
+            held_weights[:] = held
+    else:
+        scheduled_days = np.flatnonzero(scheduled)
+        drifted = np.zeros(n_assets, dtype=dtype)
+        start = 0
+        while start < n_days:
+            target = targets[start if len(targets) > 1 else 0]
+            if scheduled[start] or (threshold is not None and np.abs(drifted - target).max() > threshold):
+                turnover[start] = np.abs(target - drifted).sum()
+                held = target
+            else:
+                held = drifted
+
+            # Drift until the next scheduled rebalance, or for at most chunk_size days
+            following = scheduled_days[np.searchsorted(scheduled_days, start, side="right"):]
+            stop = min(following[0] if len(following) else n_days, start + chunk_size)
+            block_returns, block_weights = _drift_block(held, returns[start:stop])
+            if threshold is not None:
+                # Weights at the end of each day against the targets of the next day
+                # (a breach on the last day is caught when the next block starts)
+                if len(targets) > 1:
+                    next_targets = targets[start + 1:stop + 1]
+                    deviation = np.abs(block_weights[:len(next_targets)] - next_targets).max(axis=1)
+                else:
+                    deviation = np.abs(block_weights - target).max(axis=1)
+                breaches = np.flatnonzero(deviation > threshold)
+                if len(breaches):
+                    # Rebalance on the day after the first breach
+                    stop = start + breaches[0] + 1
+                    block_returns, block_weights = block_returns[:stop - start], block_weights[:stop - start]
+
+            gross[start:stop] = block_returns
+            if return_weights:
+                held_weights[start] = held
+                held_weights[start + 1:stop] = block_weights[:-1]
+            drifted = block_weights[-1]
+            start = stop
+
+    costs = transaction_cost * turnover
+    # Costs are paid before the day's return, out of the portfolio value
+    net = (1 - costs) * (1 + gross) - 1
+
+    index = asset_returns.index
+    result = {
+        "returns": pd.Series(net, index=index),
+        "gross_returns": pd.Series(gross, index=index),
+        "turnover": pd.Series(turnover, index=index),
+        "costs": pd.Series(costs, index=index),
+    }
+    if return_weights:
+        result["weights"] = pd.DataFrame(held_weights, index=index, columns=asset_returns.columns)
+    return result
@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import pandas as pd
+from .fetch_scheduler import current_scheduler
+from .instrumentation import record
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "seffybacktest")
+
+
+def get_cache_dir(*parts):
+    """
+    Return (and create) a directory inside the local seffybacktest cache.
+
+    The cache root defaults to ~/.cache/seffybacktest and can be moved with the
+    SEFFYBACKTEST_CACHE_DIR environment variable.
+
+    Parameters:
+    *parts (str): Sub-directories below the cache root
+
+    Returns:
+    str: Path of the cache directory
+    """
+    root = os.environ.get("SEFFYBACKTEST_CACHE_DIR", DEFAULT_CACHE_DIR)
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _price_path(ticker):
+    return os.path.join(get_cache_dir("prices"), ticker.replace("/", "_") + ".parquet")
+
+
+def _index_path():
+    return os.path.join(get_cache_dir("prices"), "index.json")
+
+
+def _load_index():
+    try:
+        with open(_index_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index):
+    path = _index_path()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+
+def _load_prices(ticker):
+    try:
+        return pd.read_parquet(_price_path(ticker))["Adj Close"]
+    except (OSError, KeyError):
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([], name="Date"), name=ticker)
+
+
+def _save_prices(ticker, prices):
+    prices.to_frame("Adj Close").to_parquet(_price_path(ticker))
+
+
+def _download(ticker, start_date, end_date):
+    """
+    Download adjusted close prices for one ticker over [start_date, end_date).
+    """
+    import yfinance as yf
+    from yfinance.exceptions import YFPricesMissingError
+
+    # Ticker.history keeps no state shared between calls, unlike yf.download, so the
+    # fetch scheduler can run several at once. Failed requests raise, so the scheduler
+    # retries them; a range without trading days comes back empty.
+    try:
+        data = yf.Ticker(ticker).history(start=start_date, end=end_date, auto_adjust=False, raise_errors=True)
+    except YFPricesMissingError:
+        data = pd.DataFrame()
+    prices = data["Adj Close"] if len(data) else pd.Series(dtype=float)
+    if isinstance(prices, pd.DataFrame):
+        prices = prices.iloc[:, 0]
+    prices.index = pd.DatetimeIndex(prices.index, name="Date")
+    if prices.index.tz is not None:
+        prices.index = prices.index.tz_localize(None)
+    return prices.astype(float).rename(ticker)
+
+
+def _missing_ranges(entry, start_date, end_date):
+    if entry is None:
+        return [(start_date, end_date)]
+    covered_start = pd.Timestamp(entry["start"])
+    covered_end = pd.Timestamp(entry["end"])
+    missing = []
+    if start_date < covered_start:
+        missing.append((start_date, covered_start))
+    if end_date > covered_end:
+        missing.append((covered_end, end_date))
+    return missing
+
+
+def _to_date(value):
+    date = pd.Timestamp(value)
+    if date.tz is not None:
+        date = date.tz_localize(None)
+    return date.normalize()
+
+
+def download_prices(tickers, start_date, end_date, refresh=False):
+    """
+    Get adjusted close prices, downloading only the dates missing from the local cache.
+
+    Prices are stored per ticker in a Parquet file under the cache directory
+    together with the date range already fetched, so repeated calls for a range
+    that has been seen before make no network requests. The missing ranges of
+    all tickers are downloaded concurrently by the active FetchScheduler. Like
+    yf.download, the end date is exclusive.
+
+    Parameters:
+    tickers (str or list): Ticker symbol or list of ticker symbols
+    start_date (str or datetime): Start date for historical data
+    end_date (str or datetime): End date for historical data (exclusive)
+    refresh (bool): If True, ignore the cache and download the full range again
+
+    Returns:
+    pandas.Series: Adjusted close prices if a single ticker was given
+    pandas.DataFrame: Adjusted close prices with one column per ticker otherwise
+    """
+    start_date = _to_date(start_date)
+    end_date = _to_date(end_date)
+    # The current session is still trading, so only dates before today count as covered
+    today = _to_date(pd.Timestamp.now())
+
+    index = _load_index()
+    now = time.time()
+    ticker_list = [tickers] if isinstance(tickers, str) else list(dict.fromkeys(tickers))
+    entries = {ticker: None if refresh else index.get(ticker) for ticker in ticker_list}
+    missing_ranges = {ticker: _missing_ranges(entries[ticker], start_date, end_date) for ticker in ticker_list}
+    downloaded = current_scheduler().fetch([(ticker, start, end) for ticker in ticker_list
+                                            for start, end in missing_ranges[ticker]])
+
+    prices = {}
+    for ticker in ticker_list:
+        entry = entries[ticker]
+        missing = missing_ranges[ticker]
+        cached = _load_prices(ticker) if entry is not None else None
+
+        # Only ranges that came back with prices count as covered; an empty download
+        # (a failure, or no trading days yet) is asked for again next time
+        returned = [(start, end) for start, end in missing if len(downloaded[(ticker, start, end)])]
+        if returned:
+            fetched = [downloaded[(ticker, start, end)] for start, end in returned]
+            frames = [cached] + fetched if cached is not None else fetched
+            combined = pd.concat(frames)
+            combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+            _save_prices(ticker, combined)
+
+            if entry is None:
+                covered_start, covered_end = start_date, min(end_date, today)
+            else:
+                covered_start, covered_end = pd.Timestamp(entry["start"]), pd.Timestamp(entry["end"])
+                for start, end in returned:
+                    if start < covered_start:
+                        covered_start = start
+                    else:
+                        covered_end = max(covered_end, min(end, today))
+            entry = {"start": covered_start.strftime("%Y-%m-%d"),
+                     "end": covered_end.strftime("%Y-%m-%d"),
+                     "fetched": now}
+            cached = combined
+        elif cached is None:
+            cached = pd.Series(dtype=float, index=pd.DatetimeIndex([], name="Date"), name=ticker)
+
+        if entry is not None:
+            entry["accessed"] = now
+            index[ticker] = entry
+        prices[ticker] = cached.loc[(cached.index >= start_date) & (cached.index < end_date)].rename(ticker)
+        record("price_cache", ticker, cache="miss" if missing else "hit", rows=len(prices[ticker]))
+
+    _save_index(index)
+
+    if isinstance(tickers, str):
+        return prices[tickers]
+    return pd.DataFrame(prices)
+
+
+def evict_price_cache(max_bytes=None, max_age_days=None):
+    """
+    Remove cached price series by age and total size.
+
+    Parameters:
+    max_bytes (int): Evict the least recently used tickers until the cache is at most this size
+    max_age_days (float): Evict tickers whose prices were last downloaded more than this many days ago
+
+    Returns:
+    list: Tickers removed from the cache
+    """
+    index = _load_index()
+    evicted = []
+
+    if max_age_days is not None:
+        cutoff = time.time() - max_age_days * 86400
+        evicted += [ticker for ticker, entry in index.items() if entry["fetched"] < cutoff]
+
+    if max_bytes is not None:
+        remaining = sorted((entry["accessed"], ticker) for ticker, entry in index.items() if ticker not in evicted)
+        sizes = {ticker: os.path.getsize(_price_path(ticker)) if os.path.exists(_price_path(ticker)) else 0
+                 for _, ticker in remaining}
+        total = sum(sizes.values())
+        for _, ticker in remaining:
+            if total <= max_bytes:
+                break
+            evicted.append(ticker)
+            total -= sizes[ticker]
+
+    for ticker in evicted:
+        index.pop(ticker, None)
+        if os.path.exists(_price_path(ticker)):
+            os.remove(_price_path(ticker))
+
+    _save_index(index)
+    return evicted
+
+
+def clear_price_cache():
+    """
+    Remove every cached price series.
+
+    Returns:
+    list: Tickers removed from the cache
+    """
+    index = _load_index()
+    for ticker in index:
+        if os.path.exists(_price_path(ticker)):
+            os.remove(_price_path(ticker))
+    _save_index({})
+    return list(index)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from .instrumentation import span
+
+
+def _solve(y, design):
+    """
+    Least-squares fit of every column of y on the same design matrix with one QR factorization.
+
+    Returns:
+    tuple: coefficients (k, portfolios), their standard errors, and R squared (portfolios,)
+    """
+    n, k = design.shape
+    q, r = np.linalg.qr(design)
+    coefficients = np.linalg.solve(r, q.T @ y)
+    residuals = y - design @ coefficients
+
+    residual_squares = np.einsum('ij,ij->j', residuals, residuals)
+    centered = y - y.mean(axis=0)
+    total_squares = np.einsum('ij,ij->j', centered, centered)
+
+    # (X'X)^-1 = R^-1 R^-T, so the coefficient variances are the row norms of R^-1
+    r_inverse = np.linalg.solve(r, np.eye(k))
+    unscaled_variance = np.einsum('ij,ij->i', r_inverse, r_inverse)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        residual_variance = residual_squares / (n - k)
+        standard_errors = np.sqrt(unscaled_variance[:, np.newaxis] * residual_variance)
+        r_squared = 1 - residual_squares / total_squares
+    return coefficients, standard_errors, r_squared
+
+
+def ols(portfolio_returns, factors, intercept=True):
+    """
+    Regress many portfolios on the same factors with one QR solve.
+
+    Days with a missing factor value are dropped. Portfolios with missing
+    returns are fitted on their own valid days; portfolios missing the same
+    days, such as those starting on the same date, are solved together as one
+    matrix.
+
+    Parameters:
+    portfolio_returns (pd.Series, pd.DataFrame or np.ndarray): Daily returns of the portfolio, or one column per portfolio
+    factors (pd.Series, pd.DataFrame or np.ndarray): Factor returns on the same days, one column per factor.
+                                                     Pandas inputs are aligned by date.
+    intercept (bool): Whether to fit an intercept (alpha). Default is True.
+
+    Returns:
+    dict: "alpha", "betas", "alpha_se", "betas_se", "alpha_t", "betas_t" and "r_squared".
+          For one portfolio alpha and r_squared are floats and betas are keyed by factor;
+          for a returns matrix alphas are a pd.Series and betas a pd.DataFrame (portfolio x factor).
+    """
+    single = np.ndim(portfolio_returns) == 1
+    if isinstance(factors, pd.Series):
+        factors = factors.to_frame()
+    if isinstance(portfolio_returns, (pd.Series, pd.DataFrame)) and isinstance(factors, pd.DataFrame):
+        factors = factors.reindex(portfolio_returns.index)
+
+    portfolios = portfolio_returns.columns if isinstance(portfolio_returns, pd.DataFrame) else None
+    factor_names = factors.columns if isinstance(factors, pd.DataFrame) else None
+    y = np.asarray(portfolio_returns, dtype=float).reshape(len(portfolio_returns), -1)
+    x = np.asarray(factors, dtype=float).reshape(len(factors), -1)
+    if portfolios is None:
+        portfolios = pd.RangeIndex(y.shape[1])
+    if factor_names is None:
+        factor_names = pd.RangeIndex(x.shape[1])
+
+    # Days with every factor present
+    rows = ~np.isnan(x).any(axis=1)
+    x, y = x[rows], y[rows]
+    design = np.column_stack([np.ones(len(x)), x]) if intercept else x
+
+    k = design.shape[1]
+    coefficients = np.full((k, y.shape[1]), np.nan)
+    standard_errors = np.full((k, y.shape[1]), np.nan)
+    r_squared = np.full(y.shape[1], np.nan)
+
+    missing = np.isnan(y)
+    # Portfolios missing the same days (e.g. the same start date) share one solve; the
+    # pattern of each column is packed to bits so finding the groups stays cheap
+    patterns, groups = np.unique(np.packbits(missing, axis=0).T, axis=0, return_inverse=True)
+    with span("regression", "ols", rows=len(y), portfolios=y.shape[1], factors=x.shape[1], groups=len(patterns)):
+        for group in range(len(patterns)):
+            columns = np.flatnonzero(groups.ravel() == group)
+            valid = ~missing[:, columns[0]]
+            # Fewer days than coefficients leave the fit undetermined (NaN)
+            if valid.sum() > k:
+                fit = _solve(y[valid][:, columns], design[valid])
+                coefficients[:, columns], standard_errors[:, columns], r_squared[columns] = fit
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_stats = coefficients / standard_errors
+
+    offset = 1 if intercept else 0
+    if single:
+        result = {
+            "betas": pd.Series(coefficients[offset:, 0], index=factor_names),
+            "betas_se": pd.Series(standard_errors[offset:, 0], index=factor_names),
+            "betas_t": pd.Series(t_stats[offset:, 0], index=factor_names),
+            "r_squared": r_squared[0],
+        }
+        if intercept:
+            result.update(alpha=coefficients[0, 0], alpha_se=standard_errors[0, 0], alpha_t=t_stats[0, 0])
+        return result
+
+    result = {
+        "betas": pd.DataFrame(coefficients[offset:].T, index=portfolios, columns=factor_names),
+        "betas_se": pd.DataFrame(standard_errors[offset:].T, index=portfolios, columns=factor_names),
+        "betas_t": pd.DataFrame(t_stats[offset:].T, index=portfolios, columns=factor_names),
+        "r_squared": pd.Series(r_squared, index=portfolios),
+    }
+    if intercept:
+        result.update(alpha=pd.Series(coefficients[0], index=portfolios),
+                      alpha_se=pd.Series(standard_errors[0], index=portfolios),
+                      alpha_t=pd.Series(t_stats[0], index=portfolios))
+    return result
@@ -0,0 +1,269 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Days reserved for appends when a store is created or grown
+DEFAULT_CAPACITY = 2520
+
+
+class ReturnStore:
+    """
+    Daily (or intraday) returns of a large universe in a memory-mapped file.
+
+    The store is a directory holding one float32 or float64 matrix with a row
+    per symbol and room for `capacity` days, the dates as int64 nanoseconds and
+    the symbol names:
+
+        store = ReturnStore.create("~/data/equities", returns, dtype="float32")
+        store = ReturnStore("~/data/equities")
+        store.frame("2020-01-01", "2021-01-01", ["AAPL", "MSFT"])
+
+    Nothing is read until it is used, and only the pages touched are. A date
+    range of all symbols, or of a run of consecutive symbols, is a view of the
+    mapped file, and frame/series wrap those views without copying (pandas
+    keeps a DataFrame's values with one row per column, the layout of the
+    file). Other symbol subsets copy only the selected symbols. New days are
+    written into the reserved capacity in place and new symbols are added to
+    the end of the file; only running out of capacity rewrites the matrix.
+    """
+
+    def __init__(self, path, mode="r"):
+        """
+        Open an existing store.
+
+        Parameters:
+        path (str): Directory of the store
+        mode (str): "r" to read (default) or "r+" to also append
+        """
+        if mode not in ("r", "r+"):
+            raise ValueError(f"Unknown mode {mode!r}. Choose 'r' or 'r+'")
+        self.path = os.path.expanduser(path)
+        self.mode = mode
+        self._open()
+
+    @classmethod
+    def create(cls, path, returns, dtype="float32", capacity=None):
+        """
+        Create a store from a DataFrame of returns, replacing any store at the path.
+
+        Parameters:
+        path (str): Directory of the store
+        returns (pd.DataFrame): Returns with a DatetimeIndex and one column per symbol
+        dtype (str): "float32" (default) or "float64"
+        capacity (int): Days to make room for, at least the days given (default: those plus 2520)
+
+        Returns:
+        ReturnStore: The new store, open for appending
+        """
+        path = os.path.expanduser(path)
+        os.makedirs(path, exist_ok=True)
+        returns = returns.sort_index()
+        n_days = len(returns)
+        capacity = max(capacity or n_days + DEFAULT_CAPACITY, n_days)
+
+        if returns.shape[1]:
+            values = np.memmap(os.path.join(path, "returns.bin"), dtype=dtype, mode="w+",
+                               shape=(returns.shape[1], capacity))
+            values[:, :n_days] = returns.to_numpy(dtype=dtype).T
+            values.flush()
+            del values
+        else:
+            open(os.path.join(path, "returns.bin"), "wb").close()
+
+        _dates_to_ns(returns.index).tofile(os.path.join(path, "dates.i8"))
+        _write_json(os.path.join(path, "symbols.json"), [str(symbol) for symbol in returns.columns])
+        _write_json(os.path.join(path, "meta.json"),
+                    {"dtype": np.dtype(dtype).name, "capacity": capacity, "days": n_days})
+        return cls(path, mode="r+")
+
+    def _open(self):
+        with open(os.path.join(self.path, "meta.json")) as f:
+            meta = json.load(f)
+        with open(os.path.join(self.path, "symbols.json")) as f:
+            symbols = json.load(f)
+        self.dtype = np.dtype(meta["dtype"])
+        self.capacity = meta["capacity"]
+        n_days = meta["days"]
+
+        self.symbols = pd.Index(symbols)
+        self._positions = {symbol: i for i, symbol in enumerate(symbols)}
+        dates = np.fromfile(os.path.join(self.path, "dates.i8"), dtype=np.int64, count=n_days)
+        self.dates = pd.DatetimeIndex(dates.view("datetime64[ns]"), name="Date")
+        if symbols:
+            self._values = np.memmap(os.path.join(self.path, "returns.bin"), dtype=self.dtype, mode=self.mode,
+                                     shape=(len(symbols), self.capacity))
+        else:
+            self._values = np.empty((0, self.capacity), dtype=self.dtype)
+
+    def __getstate__(self):
+        # Worker processes map the same file instead of receiving its contents
+        return {"path": self.path, "mode": "r"}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self.mode = state["mode"]
+        self._open()
+
+    def __contains__(self, symbol):
+        return symbol in self._positions
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def shape(self):
+        """
+        (days, symbols) held in the store.
+        """
+        return len(self.dates), len(self.symbols)
+
+    def _rows(self, start_date, end_date):
+        # Dates in [start_date, end_date) as a slice
+        start = 0 if start_date is None else self.dates.searchsorted(pd.Timestamp(start_date))
+        stop = len(self.dates) if end_date is None else self.dates.searchsorted(pd.Timestamp(end_date))
+        return slice(start, stop)
+
+    def _columns(self, symbols):
+        # Positions of the symbols, as a slice when they are consecutive
+        if symbols is None:
+            return slice(0, len(self.symbols))
+        missing = [symbol for symbol in symbols if symbol not in self._positions]
+        if missing:
+            raise KeyError(f"Symbols not in the store: {missing}")
+        positions = np.array([self._positions[symbol] for symbol in symbols], dtype=np.int64)
+        if len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+            return slice(positions[0], positions[0] + len(positions))
+        return positions
+
+    def array(self, start_date=None, end_date=None, symbols=None):
+        """
+        Returns over [start_date, end_date) as a NumPy array with one row per day and one column per symbol.
+
+        Parameters:
+        start_date (str or datetime): First date (default: the first date in the store)
+        end_date (str or datetime): End date, exclusive (default: after the last date in the store)
+        symbols (list): Symbols to read (default: all)
+
+        Returns:
+        np.ndarray: Returns of shape (days, symbols); a view of the file unless the symbols are not consecutive
+        """
+        return self._values[self._columns(symbols), self._rows(start_date, end_date)].T
+
+    def frame(self, start_date=None, end_date=None, symbols=None):
+        """
+        Returns over [start_date, end_date) as a DataFrame with one column per symbol.
+
+        Parameters:
+        start_date (str or datetime): First date (default: the first date in the store)
+        end_date (str or datetime): End date, exclusive (default: after the last date in the store)
+        symbols (list): Symbols to read (default: all)
+
+        Returns:
+        pd.DataFrame: Returns wrapping the array of the same slice without a copy
+        """
+        rows = self._rows(start_date, end_date)
+        columns = self._columns(symbols)
+        values = self._values[columns, rows].T
+        return pd.DataFrame(values, index=self.dates[rows], columns=self.symbols[columns], copy=False)
+
+    def series(self, symbol, start_date=None, end_date=None):
+        """
+        Returns of one symbol over [start_date, end_date) as a Series.
+
+        Parameters:
+        symbol (str): Symbol to read
+        start_date (str or datetime): First date (default: the first date in the store)
+        end_date (str or datetime): End date, exclusive (default: after the last date in the store)
+
+        Returns:
+        pd.Series: Returns wrapping a view of the file
+        """
+        if symbol not in self._positions:
+            raise KeyError(f"Symbol not in the store: {symbol!r}")
+        rows = self._rows(start_date, end_date)
+        values = self._values[self._positions[symbol], rows]
+        return pd.Series(values, index=self.dates[rows], name=symbol, copy=False)
+
+    def append(self, returns):
+        """
+        Add new days (and any new symbols) to the store in place.
+
+        Rows dated on or before the last date already stored are skipped.
+        Symbols of the store missing from `returns` get NaN on the new days,
+        and new symbols get NaN on the days stored before.
+
+        Parameters:
+        returns (pd.DataFrame): Returns with a DatetimeIndex and one column per symbol
+
+        Returns:
+        int: Number of days added
+        """
+        if self.mode != "r+":
+            raise ValueError("The store is open read-only; open it with mode='r+' to append")
+
+        returns = returns.sort_index()
+        if len(self.dates):
+            returns = returns.loc[returns.index > self.dates[-1]]
+        new_symbols = [str(symbol) for symbol in returns.columns if str(symbol) not in self._positions]
+        if not len(returns) and not new_symbols:
+            return 0
+
+        n_days = len(self.dates) + len(returns)
+        if n_days > self.capacity:
+            self._grow(max(2 * self.capacity, n_days + DEFAULT_CAPACITY))
+        if new_symbols:
+            self._add_symbols(new_symbols)
+
+        if len(returns):
+            values = returns.rename(columns=str).reindex(columns=self.symbols).to_numpy(dtype=self.dtype)
+            self._values[:, len(self.dates):n_days] = values.T
+            self._values.flush()
+            with open(os.path.join(self.path, "dates.i8"), "r+b") as f:
+                f.seek(len(self.dates) * 8)
+                f.write(_dates_to_ns(returns.index).tobytes())
+                f.truncate()
+
+        # The day count in meta.json commits the new days
+        _write_json(os.path.join(self.path, "meta.json"),
+                    {"dtype": self.dtype.name, "capacity": self.capacity, "days": n_days})
+        self._open()
+        return len(returns)
+
+    def _add_symbols(self, symbols):
+        # New symbols are new rows at the end of the file, NaN until they have returns
+        with open(os.path.join(self.path, "returns.bin"), "ab") as f:
+            block = np.full(self.capacity, np.nan, dtype=self.dtype).tobytes()
+            for _ in symbols:
+                f.write(block)
+        _write_json(os.path.join(self.path, "symbols.json"), list(self.symbols) + symbols)
+        self._open()
+
+    def _grow(self, capacity):
+        # Copy the matrix into a file with room for more days, one block of symbols at a time
+        path = os.path.join(self.path, "returns.bin")
+        grown = np.memmap(path + ".tmp", dtype=self.dtype, mode="w+", shape=(len(self.symbols), capacity))
+        n_days = len(self.dates)
+        for start in range(0, len(self.symbols), 256):
+            grown[start:start + 256, :n_days] = self._values[start:start + 256, :n_days]
+        grown.flush()
+        del grown
+        self._values = None
+        os.replace(path + ".tmp", path)
+        _write_json(os.path.join(self.path, "meta.json"),
+                    {"dtype": self.dtype.name, "capacity": capacity, "days": n_days})
+        self._open()
+
+
+def _dates_to_ns(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ns").asi8
+
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+
+def as_returns_matrix(portfolio_returns):
+    """
+    Split a 2-D returns input into a float array and its portfolio labels.
+
+    Every metric accepts either the daily returns of one portfolio or a matrix
+    with one column per portfolio. Missing values (NaN) in a column are skipped,
+    as they are for a single pandas Series.
+
+    Parameters:
+    portfolio_returns (pd.Series, pd.DataFrame or np.ndarray): Daily returns
+
+    Returns:
+    tuple: (np.ndarray of shape (days, portfolios), pd.Index of portfolio labels),
+           or None if portfolio_returns holds a single portfolio
+    """
+    if np.ndim(portfolio_returns) != 2:
+        return None
+    if isinstance(portfolio_returns, pd.DataFrame):
+        return portfolio_returns.to_numpy(dtype=float), portfolio_returns.columns
+    returns = np.asarray(portfolio_returns, dtype=float)
+    return returns, pd.RangeIndex(returns.shape[1])
@@ -0,0 +1,302 @@
+import numpy as np
+import pandas as pd
+from .sharpe_ratio import get_risk_free_rate
+
+
+def _as_frame(portfolio_returns):
+    if isinstance(portfolio_returns, pd.Series):
+        return portfolio_returns.to_frame(), True
+    return pd.DataFrame(portfolio_returns), False
+
+
+def _like(values, frame, is_series):
+    result = pd.DataFrame(values, index=frame.index, columns=frame.columns)
+    return result.iloc[:, 0] if is_series else result
+
+
+def _window_sums(values, window):
+    """
+    Sum every trailing window of length `window` along axis 0 with one cumulative sum.
+
+    The first window - 1 rows, which have no full window, are NaN.
+    """
+    cumulative = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=cumulative[1:])
+    sums = np.full(values.shape, np.nan)
+    sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+    return sums
+
+
+def _window_moments(frame, window):
+    """
+    Trailing mean and variance (ddof=0) of every column, and the mask of valid returns.
+
+    Returns are centred on their column mean before the cumulative sums so the
+    variance does not suffer from cancellation. Windows with a missing return
+    are NaN, as with pandas rolling windows.
+    """
+    values = frame.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    center = np.nanmean(values, axis=0)
+    centered = np.where(valid, values - center, 0.0)
+
+    count = _window_sums(valid.astype(float), window)
+    total = _window_sums(centered, window)
+    total_squares = _window_sums(centered * centered, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        full = count == window
+        mean = np.where(full, total / window + center, np.nan)
+        variance = np.where(full, np.maximum(total_squares / window - (total / window) ** 2, 0.0), np.nan)
+    return mean, variance, valid
+
+
+def rolling_volatility(portfolio_returns, window=252, annualize=False):
+    """
+    Calculate the volatility of portfolio returns over a trailing window.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    window (int): Number of trading days in each window. Default is 252.
+    annualize (bool): Whether to annualize the daily volatility
+
+    Returns:
+    pd.Series or pd.DataFrame: Volatility at the end of each window, aligned with the returns
+    """
+    frame, is_series = _as_frame(portfolio_returns)
+    _, variance, _ = _window_moments(frame, window)
+    volatility = np.sqrt(variance)
+    if annualize:
+        volatility = volatility * np.sqrt(252)
+    return _like(volatility, frame, is_series)
+
+
+def rolling_sharpe_ratio(portfolio_returns, window=252, risk_free_rate=None):
+    """
+    Calculate the annualized Sharpe Ratio over a trailing window.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    window (int): Number of trading days in each window. Default is 252.
+    risk_free_rate (float): Annual risk-free rate. If None, it will be fetched using get_risk_free_rate()
+
+    Returns:
+    pd.Series or pd.DataFrame: Sharpe Ratio at the end of each window, aligned with the returns
+    """
+    if risk_free_rate is None:
+        risk_free_rate = get_risk_free_rate()
+    daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
+
+    frame, is_series = _as_frame(portfolio_returns)
+    mean, variance, _ = _window_moments(frame, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(variance * window / (window - 1))
+        sharpe = np.sqrt(252) * (mean - daily_risk_free_rate) / std
+    return _like(sharpe, frame, is_series)
+
+
+def rolling_sortino_ratio(portfolio_returns, window=252, risk_free_rate=None):
+    """
+    Calculate the annualized Sortino Ratio over a trailing window.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    window (int): Number of trading days in each window. Default is 252.
+    risk_free_rate (float): Annual risk-free rate. If None, it will be fetched using get_risk_free_rate()
+
+    Returns:
+    pd.Series or pd.DataFrame: Sortino Ratio at the end of each window, aligned with the returns
+    """
+    if risk_free_rate is None:
+        risk_free_rate = get_risk_free_rate()
+    daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
+
+    frame, is_series = _as_frame(portfolio_returns)
+    mean, _, valid = _window_moments(frame, window)
+
+    # Downside returns measured from the daily risk-free rate
+    excess_returns = np.where(valid, frame.to_numpy(dtype=float) - daily_risk_free_rate, 0.0)
+    below = excess_returns < 0
+    downside_count = _window_sums(below.astype(float), window)
+    downside_squares = _window_sums(np.where(below, excess_returns * excess_returns, 0.0), window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        downside_deviation = np.sqrt(252) * np.sqrt(downside_squares / downside_count)
+        sortino = np.sqrt(252) * (mean - daily_risk_free_rate) / downside_deviation
+    return _like(sortino, frame, is_series)
+
+
+def _window_regression(portfolio_returns, benchmark_returns, window):
+    frame, is_series = _as_frame(portfolio_returns)
+    benchmark = benchmark_returns.reindex(frame.index).to_numpy(dtype=float)[:, np.newaxis]
+    portfolio = frame.to_numpy(dtype=float)
+
+    # A day only counts if both the portfolio and the benchmark have a return
+    valid = ~np.isnan(portfolio) & ~np.isnan(benchmark)
+    center_x = np.nanmean(benchmark)
+    center_y = np.nanmean(portfolio, axis=0)
+    x = np.where(valid, benchmark - center_x, 0.0)
+    y = np.where(valid, portfolio - center_y, 0.0)
+
+    count = _window_sums(valid.astype(float), window)
+    sum_x = _window_sums(x, window)
+    sum_y = _window_sums(y, window)
+    sum_xx = _window_sums(x * x, window)
+    sum_xy = _window_sums(x * y, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        full = count == window
+        beta = np.where(full, (sum_xy - sum_x * sum_y / window) / (sum_xx - sum_x * sum_x / window), np.nan)
+        mean_x = sum_x / window + center_x
+        mean_y = sum_y / window + center_y
+    return frame, is_series, beta, mean_x, mean_y
+
+
+def rolling_beta(portfolio_returns, benchmark_returns, window=252):
+    """
+    Calculate the beta of a portfolio against a benchmark over a trailing window.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    benchmark_returns (pd.Series): Daily returns of the benchmark, aligned to the portfolio by date
+    window (int): Number of trading days in each window. Default is 252.
+
+    Returns:
+    pd.Series or pd.DataFrame: Beta at the end of each window, aligned with the returns
+    """
+    frame, is_series, beta, _, _ = _window_regression(portfolio_returns, benchmark_returns, window)
+    return _like(beta, frame, is_series)
+
+
+def rolling_alpha(portfolio_returns, benchmark_returns, window=252, risk_free_rate=None):
+    """
+    Calculate the annualized alpha of a portfolio against a benchmark over a trailing window.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    benchmark_returns (pd.Series): Daily returns of the benchmark, aligned to the portfolio by date
+    window (int): Number of trading days in each window. Default is 252.
+    risk_free_rate (float): Annual risk-free rate. If None, it will be fetched using get_risk_free_rate()
+
+    Returns:
+    pd.Series or pd.DataFrame: Annualized alpha at the end of each window, aligned with the returns
+    """
+    if risk_free_rate is None:
+        risk_free_rate = get_risk_free_rate()
+    daily_rf = (1 + risk_free_rate) ** (1/252) - 1
+
+    frame, is_series, beta, mean_x, mean_y = _window_regression(portfolio_returns, benchmark_returns, window)
+    # Intercept of the excess portfolio returns regressed on the excess benchmark returns
+    alpha = (mean_y - daily_rf) - beta * (mean_x - daily_rf)
+    return _like((1 + alpha) ** 252 - 1, frame, is_series)
+
+
+def rolling_var(portfolio_returns, window=252, confidence_level=0.95):
+    """
+    Calculate historical Value at Risk (VaR) over a trailing window.
+
+    Uses the same order statistic as calculate_var, read from pandas' rolling
+    quantile (a skip list, so O(log window) per step).
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    window (int): Number of trading days in each window. Default is 252.
+    confidence_level (float): Confidence level for VaR calculation (default: 0.95)
+
+    Returns:
+    pd.Series or pd.DataFrame: Value at Risk at the end of each window, aligned with the returns
+    """
+    index = int((1 - confidence_level) * window)
+    # Aim between two order statistics so rounding cannot pick the wrong one
+    quantile = min((index + 0.5) / (window - 1), 1.0)
+    frame, is_series = _as_frame(portfolio_returns)
+    var = -frame.rolling(window).quantile(quantile, interpolation='lower')
+    return var.iloc[:, 0] if is_series else var
+
+
+def _drop_scans(log_wealth, window):
+    """
+    Forward and backward block scans of the largest fall in log wealth (van Herk/Gil-Werman).
+
+    The series is cut into blocks of `window` rows. Within each block the
+    running max, min and largest fall are accumulated forward from the block
+    start and backward from the block end, so any window is covered by the tail
+    of one block and the head of the next.
+    """
+    n, columns = log_wealth.shape
+    blocks = -(-n // window)
+    padded = np.concatenate([log_wealth, np.repeat(log_wealth[-1:], blocks * window - n, axis=0)])
+    padded = padded.reshape(blocks, window, columns)
+
+    head_max = np.maximum.accumulate(padded, axis=1)
+    head_min = np.minimum.accumulate(padded, axis=1)
+    head_drop = np.maximum.accumulate(head_max - padded, axis=1)
+
+    reversed_blocks = padded[:, ::-1]
+    tail_max = np.maximum.accumulate(reversed_blocks, axis=1)[:, ::-1]
+    tail_min = np.minimum.accumulate(reversed_blocks, axis=1)[:, ::-1]
+    tail_drop = np.maximum.accumulate((padded - tail_min)[:, ::-1], axis=1)[:, ::-1]
+
+    def flat(scan):
+        return scan.reshape(blocks * window, columns)[:n]
+    return flat(head_min), flat(head_drop), flat(tail_max), flat(tail_drop)
+
+
+def rolling_max_drawdown(portfolio_returns, window=252):
+    """
+    Calculate the maximum drawdown within each trailing window.
+
+    Each window is measured like calculate_calmar_ratio measures a whole
+    history, but every step costs O(1): the largest fall in log wealth over a
+    window combines precomputed block scans instead of rescanning the window.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    window (int): Number of trading days in each window. Default is 252.
+
+    Returns:
+    pd.Series or pd.DataFrame: Maximum drawdown (a negative fraction) at the end of each window
+    """
+    frame, is_series = _as_frame(portfolio_returns)
+    values = frame.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    log_wealth = np.cumsum(np.log1p(np.where(valid, values, 0.0)), axis=0)
+
+    max_drawdown = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        head_min, head_drop, tail_max, tail_drop = _drop_scans(log_wealth, window)
+        start = np.arange(len(values) - window + 1)
+        end = start + window - 1
+        # A window that starts on a block boundary is exactly one block
+        aligned = (start % window == 0)[:, np.newaxis]
+        drop = np.where(aligned, tail_drop[start],
+                        np.maximum(np.maximum(tail_drop[start], head_drop[end]), tail_max[start] - head_min[end]))
+        max_drawdown[window - 1:] = np.expm1(-drop)
+
+    count = _window_sums(valid.astype(float), window)
+    max_drawdown[count != window] = np.nan
+    return _like(max_drawdown, frame, is_series)
+
+
+def rolling_calmar_ratio(portfolio_returns, window=756):
+    """
+    Calculate the Calmar Ratio over a trailing window.
+
+    The annualized return of each window over its maximum drawdown, from
+    rolling_max_drawdown, so every step costs O(1). The last value equals
+    calculate_calmar_ratio(portfolio_returns, window // 21) without missing returns.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    window (int): Number of trading days in each window. Default is 756 (36 months).
+
+    Returns:
+    pd.Series or pd.DataFrame: Calmar Ratio at the end of each window, aligned with the returns
+    """
+    frame, is_series = _as_frame(portfolio_returns)
+    values = frame.to_numpy(dtype=float)
+    log_growth = _window_sums(np.log1p(np.nan_to_num(values)), window)
+    max_drawdown = rolling_max_drawdown(frame, window).to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        calmar = np.expm1(log_growth * 252 / window) / np.abs(max_drawdown)
+    return _like(calmar, frame, is_series)
@@ -1,32 +1,65 @@
-import matplotlib.pyplot as plt
+import numpy as np
 
-def calculate_rsi(returns, window=14, plot=False):
+RSI_METHODS = ("sma", "wilder", "ema")
+
+
+def _recursive_average(values, alpha):
+    """
+    Exponential average y[t] = alpha * x[t] + (1 - alpha) * y[t-1] down every column, started at the first value.
+
+    Runs as a first-order linear filter (scipy.signal.lfilter), the same as
+    pandas' ewm(alpha=alpha, adjust=False).mean() but over a whole matrix at once.
+    """
+    from scipy.signal import lfilter
+
+    if len(values) == 0:
+        return values.copy()
+    averages, _ = lfilter([alpha], [1, alpha - 1], values, axis=0, zi=(1 - alpha) * values[:1])
+    return averages
+
+
+def calculate_rsi(returns, window=14, plot=False, method="sma"):
     """
     Calculate the Relative Strength Index (RSI) for a given returns series.
-    
+
     Parameters:
-    returns (pd.Series): A pandas Series of portfolio returns.
+    returns (pd.Series or pd.DataFrame): A pandas Series of portfolio returns, or one column per asset.
     window (int): The number of periods to use for RSI calculation. Default is 14.
-    
+    method (str): How gains and losses are averaged: "sma" for a simple moving average over the window
+                  (the default), "wilder" for Wilder's smoothing (alpha = 1 / window) or "ema" for an
+                  exponential average (alpha = 2 / (window + 1))
+
     Returns:
-    pd.Series: A pandas Series with the calculated RSI values.
+    pd.Series: A pandas Series with the calculated RSI values (pd.DataFrame for a returns matrix).
     """
+    if method not in RSI_METHODS:
+        raise ValueError(f"Unknown RSI method {method!r}. Choose from {RSI_METHODS}")
+
     # Calculate gains and losses
     gain = returns.where(returns > 0, 0)
     loss = -returns.where(returns < 0, 0)
 
     # Calculate average gain and loss
-    avg_gain = gain.rolling(window=window, min_periods=1).mean()
-    avg_loss = loss.rolling(window=window, min_periods=1).mean()
+    if method == "sma":
+        avg_gain = gain.rolling(window=window, min_periods=1).mean()
+        avg_loss = loss.rolling(window=window, min_periods=1).mean()
+    else:
+        alpha = 1 / window if method == "wilder" else 2 / (window + 1)
+        avg_gain = gain.copy()
+        avg_loss = loss.copy()
+        avg_gain[:] = _recursive_average(gain.to_numpy(dtype=float), alpha)
+        avg_loss[:] = _recursive_average(loss.to_numpy(dtype=float), alpha)
 
     # Calculate relative strength
-    rs = avg_gain / avg_loss
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = avg_gain / avg_loss
 
     # Calculate RSI
     rsi = 100 - (100 / (1 + rs))
 
     # # Prompt user option to print the RSI plot
     # if plot:
+    #     import matplotlib.pyplot as plt
     #     plt.figure(figsize=(12, 6))
     #     plt.plot(rsi.index, rsi, label='RSI')
     #     plt.axhline(y=70, color='r', linestyle='--')
@@ -36,7 +69,7 @@ def calculate_rsi(returns, window=14, plot=False):
     #     plt.ylabel('RSI')
     #     plt.legend()
     #     plt.show()
-    
+
 
 
     return rsi
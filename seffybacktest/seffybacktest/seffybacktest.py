@@ -1,32 +1,14 @@
-import yfinance as yf
-from .get_portfolio_returns import get_portfolio_returns
-from .adjusted_sharpe import adjusted_sharpe
-from .annual_return import annual_return
-from .average_returns import average_return
-from .calmar_ratio import calculate_calmar_ratio
-from .capm_calculation import calculate_capm, calculate_market_return
-from .correlation import correlation_with_index
-from .cvar_calculator import calculate_cvar
-from .double_sharpe import double_sharpe
-from .famafrench import get_fama_french_factors, calculate_fama_french
-from .intraweek_variances import calculate_intraweek_variances, analyze_portfolio_volatility
-from .market_alpha import alpha
-from .market_beta import beta
-from .modified_sharpe import modified_sharpe
-from .momentum import calculate_momentum
-from .rsi import calculate_rsi
-from .sharpe_ratio import sharpe_ratio, get_risk_free_rate
-from .sortino_ratio import sortino_ratio
-from .treynor_ratio import treynor_ratio
-from .var_calculator import calculate_var
-from .volatility import calculate_portfolio_volatility
-
-import tkinter as tk
-from tkinter import ttk, simpledialog, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-def create_ui(results, momentum=None, rsi=None):
+from .indicators import INDICATORS, RISK_FREE_RATE_INDICATORS, BENCHMARK_INDICATORS, calculate_indicators
+from .instrumentation import span, current_trace
+
+# tkinter and matplotlib are imported inside the UI functions so the metrics load without them
+
+def create_ui(results, momentum=None, rsi=None, trace=None):
+    import tkinter as tk
+    from tkinter import ttk
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
     def on_closing():
         root.destroy()
         plt.close('all')
@@ -64,41 +46,62 @@ def create_ui(results, momentum=None, rsi=None):
         momentum_frame = ttk.Frame(notebook)
         notebook.add(momentum_frame, text="Momentum")
 
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.plot(momentum.index, momentum, label='Momentum', linewidth=1)
-        ax.axhline(y=0, color='r', linestyle='--', linewidth=0.8)
-        ax.set_title('Momentum', fontsize=12, fontweight='bold')
-        ax.set_xlabel('Date', fontsize=10)
-        ax.set_ylabel('Momentum', fontsize=10)
-        ax.tick_params(axis='both', which='major', labelsize=8)
-        ax.grid(True, linestyle=':', alpha=0.6)
+        with span("plot", "Momentum", rows=len(momentum)):
+            fig, ax = plt.subplots(figsize=(12, 6))
+            ax.plot(momentum.index, momentum, label='Momentum', linewidth=1)
+            ax.axhline(y=0, color='r', linestyle='--', linewidth=0.8)
+            ax.set_title('Momentum', fontsize=12, fontweight='bold')
+            ax.set_xlabel('Date', fontsize=10)
+            ax.set_ylabel('Momentum', fontsize=10)
+            ax.tick_params(axis='both', which='major', labelsize=8)
+            ax.grid(True, linestyle=':', alpha=0.6)
 
-        canvas = FigureCanvasTkAgg(fig, master=momentum_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            canvas = FigureCanvasTkAgg(fig, master=momentum_frame)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
     if rsi is not None:
         rsi_frame = ttk.Frame(notebook)
         notebook.add(rsi_frame, text="RSI")
 
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.plot(rsi.index, rsi, label='RSI', linewidth=1)
-        ax.axhline(y=70, color='r', linestyle='--', linewidth=0.8)
-        ax.axhline(y=30, color='g', linestyle='--', linewidth=0.8)
-        ax.set_title('Relative Strength Index (RSI)', fontsize=12, fontweight='bold')
-        ax.set_xlabel('Date', fontsize=10)
-        ax.set_ylabel('RSI', fontsize=10)
-        ax.tick_params(axis='both', which='major', labelsize=8)
-        ax.set_ylim(0, 100)
-        ax.grid(True, linestyle=':', alpha=0.6)
-
-        canvas = FigureCanvasTkAgg(fig, master=rsi_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        with span("plot", "RSI", rows=len(rsi)):
+            fig, ax = plt.subplots(figsize=(12, 6))
+            ax.plot(rsi.index, rsi, label='RSI', linewidth=1)
+            ax.axhline(y=70, color='r', linestyle='--', linewidth=0.8)
+            ax.axhline(y=30, color='g', linestyle='--', linewidth=0.8)
+            ax.set_title('Relative Strength Index (RSI)', fontsize=12, fontweight='bold')
+            ax.set_xlabel('Date', fontsize=10)
+            ax.set_ylabel('RSI', fontsize=10)
+            ax.tick_params(axis='both', which='major', labelsize=8)
+            ax.set_ylim(0, 100)
+            ax.grid(True, linestyle=':', alpha=0.6)
+
+            canvas = FigureCanvasTkAgg(fig, master=rsi_frame)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    # Where the analysis spent its time, when it ran under a Trace
+    if trace is not None:
+        timing_frame = ttk.Frame(notebook)
+        notebook.add(timing_frame, text="Timing")
+
+        summary = trace.summary().reset_index()
+        timing_tree = ttk.Treeview(timing_frame, columns=list(summary.columns), show='headings')
+        for column in summary.columns:
+            timing_tree.heading(column, text=column.capitalize())
+            timing_tree.column(column, width=120)
+        timing_tree.pack(fill=tk.BOTH, expand=True)
+
+        for row in summary.itertuples(index=False):
+            timing_tree.insert('', 'end', values=[f"{value:.4f}" if isinstance(value, float) else value
+                                                  for value in row])
 
     root.mainloop()
 
 def seffybacktest(portfolio_returns):
+    import tkinter as tk
+    from tkinter import ttk, simpledialog, messagebox
+
     def get_user_input(prompt, default=None):
         return simpledialog.askstring("Input", prompt, initialvalue=default)
 
@@ -126,13 +129,7 @@ def seffybacktest(portfolio_returns):
     print("Welcome to EQUATE's Portfolio Analysis Tool: the Seffy Backtest!")
     
     # List of available indicators
-    indicators = [
-        "Adjusted Sharpe Ratio", "Annual Return", "Average Return", "Calmar Ratio",
-        "CAPM", "Correlation with Index", "CVaR", "Double Sharpe Ratio",
-        "Fama-French Factors", "Intraweek Variances", "Market Alpha", "Market Beta",
-        "Modified Sharpe Ratio", "Momentum", "RSI", "Sharpe Ratio", "Sortino Ratio",
-        "Treynor Ratio", "VaR", "Portfolio Volatility"
-    ]
+    indicators = INDICATORS
     
     # User selects indicators
     selected_indicators = []
@@ -143,7 +140,7 @@ def seffybacktest(portfolio_returns):
 
     # Check if risk-free rate is needed
     risk_free_rate = None
-    if any(indicator in ["Adjusted Sharpe Ratio", "CAPM", "Double Sharpe Ratio", "Fama-French Factors", "Market Alpha", "Modified Sharpe Ratio", "Sharpe Ratio", "Sortino Ratio", "Treynor Ratio"] for indicator in selected_indicators):
+    if any(indicator in RISK_FREE_RATE_INDICATORS for indicator in selected_indicators):
         risk_free_rate_str = get_user_input("Enter the annual risk-free rate (Enter for default: 4.25%):", "4.25%")
         try:
             risk_free_rate = float(risk_free_rate_str.replace('%', '')) / 100 if '%' in risk_free_rate_str else float(risk_free_rate_str)
@@ -152,7 +149,7 @@ def seffybacktest(portfolio_returns):
 
     # Check if baseline market index is needed
     ticker = None
-    if any(indicator in ["CAPM", "Correlation with Index", "Market Alpha", "Market Beta", "Treynor Ratio"] for indicator in selected_indicators):
+    if any(indicator in BENCHMARK_INDICATORS for indicator in selected_indicators):
         ticker = get_user_input("Enter a market baseline indice ticker (Enter for S&P 500):", "^GSPC")
     
     # Check if momentum or RSI plots are needed
@@ -177,65 +174,19 @@ def seffybacktest(portfolio_returns):
     progress_bar.pack(pady=10)
 
     # Perform analysis for selected indicators
-    results = {}
     total_indicators = len(selected_indicators)
 
-    for i, indicator in enumerate(selected_indicators):
+    def show_progress(i, indicator):
         progress_label.config(text=f"Calculating {indicator}...")
         progress_bar['value'] = (i / total_indicators) * 100
         progress_window.update()
 
-        if indicator == "Adjusted Sharpe Ratio":
-            results[indicator] = adjusted_sharpe(portfolio_returns, risk_free_rate)
-        elif indicator == "Annual Return":
-            results[indicator] = annual_return(portfolio_returns)
-        elif indicator == "Average Return":
-            results[indicator] = average_return(portfolio_returns)
-        elif indicator == "Calmar Ratio":
-            results[indicator] = calculate_calmar_ratio(portfolio_returns)
-        elif indicator == "CAPM":
-            results[indicator] = calculate_capm(portfolio_returns, risk_free_rate, ticker)
-        elif indicator == "Correlation with Index":
-            results[indicator] = correlation_with_index(portfolio_returns, ticker)
-        elif indicator == "CVaR":
-            results[indicator] = calculate_cvar(portfolio_returns)
-        elif indicator == "Double Sharpe Ratio":
-            results[indicator] = double_sharpe(portfolio_returns, risk_free_rate)
-        elif indicator == "Fama-French Factors":
-            start_date = portfolio_returns.index[0]
-            end_date = portfolio_returns.index[-1]
-            ff_factors = get_fama_french_factors(start_date, end_date)
-            results[indicator] = calculate_fama_french(portfolio_returns, risk_free_rate, ticker)
-        elif indicator == "Intraweek Variances":
-            intraweek_results = analyze_portfolio_volatility(portfolio_returns)
-            results["Average Intraweek Variance"] = intraweek_results.get("average_intraweek_variance")
-            results["Highest Variance Week"] = intraweek_results.get("highest_variance_week")
-            results["Highest Variance"] = intraweek_results.get("highest_variance")
-        elif indicator == "Market Alpha":
-            results[indicator] = alpha(portfolio_returns, ticker, risk_free_rate)
-        elif indicator == "Market Beta":
-            results[indicator] = beta(portfolio_returns, ticker)
-        elif indicator == "Modified Sharpe Ratio":
-            results[indicator] = modified_sharpe(portfolio_returns, risk_free_rate)
-        elif indicator == "Momentum":
-            results[indicator] = calculate_momentum(portfolio_returns, plot=plot_momentum_rsi)
-        elif indicator == "RSI":
-            results[indicator] = calculate_rsi(portfolio_returns, plot=plot_momentum_rsi)
-        elif indicator == "Sharpe Ratio":
-            results[indicator] = sharpe_ratio(portfolio_returns, risk_free_rate)
-        elif indicator == "Sortino Ratio":
-            results[indicator] = sortino_ratio(portfolio_returns, risk_free_rate)
-        elif indicator == "Treynor Ratio":
-            portfolio_beta = beta(portfolio_returns, ticker)
-            results[indicator] = treynor_ratio(portfolio_returns, portfolio_beta, risk_free_rate)
-        elif indicator == "VaR":
-            results[indicator] = calculate_var(portfolio_returns)
-        elif indicator == "Portfolio Volatility":
-            results[indicator] = calculate_portfolio_volatility(portfolio_returns, annualize)
+    results = calculate_indicators(portfolio_returns, selected_indicators, risk_free_rate, ticker,
+                                   annualize=annualize, plot=plot_momentum_rsi, progress=show_progress)
 
     progress_window.destroy()
 
     # Display results in a separate UI
-    create_ui(results, momentum=results.get("Momentum"), rsi=results.get("RSI"))
+    create_ui(results, momentum=results.get("Momentum"), rsi=results.get("RSI"), trace=current_trace())
 
 
@@ -0,0 +1,179 @@
+import contextvars
+import pandas as pd
+from .instrumentation import record
+from .price_cache import download_prices
+
+_active_session = contextvars.ContextVar("seffybacktest_session", default=None)
+
+
+def _fetch_index_returns(ticker, start_date, end_date, store=None):
+    if store is not None and ticker in store:
+        # Like downloaded returns, start the day after the first day of the range
+        returns = store.series(ticker, start_date, end_date).iloc[1:].dropna()
+        record("return_store", ticker, rows=len(returns))
+        return returns
+    return download_prices(ticker, start_date, end_date).pct_change().dropna()
+
+
+def _fetch_returns(tickers, start_date, end_date, store=None):
+    # Tickers in the store are read from it, the others come from the price cache
+    tickers = list(tickers)
+    stored = [ticker for ticker in tickers if store is not None and ticker in store]
+    downloaded = [ticker for ticker in tickers if ticker not in stored]
+    frames = []
+    # Both sources start the day after the first day of the range, where downloaded prices
+    # have their first return, so the tickers line up whichever source they come from
+    if stored:
+        frames.append(store.frame(start_date, end_date, stored).iloc[1:])
+        record("return_store", ",".join(stored), rows=len(frames[0]) * len(stored))
+    if downloaded:
+        # A day one exchange is closed carries its last price forward, so that ticker's return
+        # is zero and the next one spans the gap; days before a ticker's first price stay NaN
+        prices = download_prices(downloaded, start_date, end_date)
+        frames.append(prices.ffill().pct_change(fill_method=None).iloc[1:])
+    returns = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+    return returns[tickers]
+
+
+class MarketDataSession:
+    """
+    Share index returns between every indicator computed during one analysis run.
+
+    Each (ticker, start_date, end_date) request is resolved once and the same
+    returns Series is handed to every function that asks for it. Functions pick
+    up the active session implicitly when used as a context manager:
+
+        with MarketDataSession():
+            calculate_capm(portfolio_returns, 0.0425, "^GSPC")
+            treynor_ratio(portfolio_returns, beta(portfolio_returns, "^GSPC"), 0.0425)
+
+    or explicitly through their session argument.
+
+    Given a ReturnStore, the session reads the returns of every ticker in the
+    store from it instead of downloading prices.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._returns = {}
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(_active_session.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_session.reset(self._tokens.pop())
+
+    def __getstate__(self):
+        # Sessions can be sent to worker processes; the downloaded returns go with them
+        return {"_returns": self._returns, "store": self.store}
+
+    def __setstate__(self, state):
+        self.store = state.get("store")
+        self._returns = state["_returns"]
+        self._tokens = []
+
+    def get_index_returns(self, ticker, start_date, end_date):
+        """
+        Get daily returns of an index, downloading them only on the first request.
+
+        Parameters:
+        ticker (str): Ticker symbol of the index
+        start_date (str or datetime): Start date for historical data
+        end_date (str or datetime): End date for historical data (exclusive)
+
+        Returns:
+        pandas.Series: Daily returns of the index
+        """
+        key = (ticker, pd.Timestamp(start_date), pd.Timestamp(end_date))
+        record("session", ticker, cache="hit" if key in self._returns else "miss")
+        if key not in self._returns:
+            self._returns[key] = _fetch_index_returns(ticker, start_date, end_date, self.store)
+        return self._returns[key]
+
+    def prefetch(self, tickers, start_date, end_date):
+        """
+        Resolve the index returns of several tickers at once, so that their downloads run concurrently.
+
+        Later get_index_returns calls for the same range are answered from the session.
+
+        Parameters:
+        tickers (list): Ticker symbols
+        start_date (str or datetime): Start date for historical data
+        end_date (str or datetime): End date for historical data (exclusive)
+        """
+        keys = {ticker: (ticker, pd.Timestamp(start_date), pd.Timestamp(end_date)) for ticker in tickers}
+        pending = [ticker for ticker, key in keys.items() if key not in self._returns]
+        downloaded = [ticker for ticker in pending if self.store is None or ticker not in self.store]
+        if len(downloaded) > 1:
+            prices = download_prices(downloaded, start_date, end_date)
+            for ticker in downloaded:
+                # Same as _fetch_index_returns: each ticker on its own trading days
+                self._returns[keys[ticker]] = prices[ticker].dropna().pct_change().dropna()
+        for ticker in pending:
+            if keys[ticker] not in self._returns:
+                self._returns[keys[ticker]] = _fetch_index_returns(ticker, start_date, end_date, self.store)
+
+    def get_returns(self, tickers, start_date, end_date):
+        """
+        Get daily returns of several tickers, from the session's store where it has them.
+
+        Parameters:
+        tickers (list): Ticker symbols
+        start_date (str or datetime): Start date for historical data
+        end_date (str or datetime): End date for historical data (exclusive)
+
+        Returns:
+        pandas.DataFrame: Daily returns with one column per ticker
+        """
+        return _fetch_returns(tickers, start_date, end_date, self.store)
+
+
+def current_session():
+    """
+    Return the MarketDataSession active in this context, or None.
+    """
+    return _active_session.get()
+
+
+def get_index_returns(ticker, start_date, end_date, session=None):
+    """
+    Get daily returns of an index through the given or active MarketDataSession.
+
+    Parameters:
+    ticker (str): Ticker symbol of the index
+    start_date (str or datetime): Start date for historical data
+    end_date (str or datetime): End date for historical data (exclusive)
+    session (MarketDataSession): Session to resolve the request in. Defaults to the active session, if any
+
+    Returns:
+    pandas.Series: Daily returns of the index
+    """
+    if session is None:
+        session = current_session()
+    if session is None:
+        return _fetch_index_returns(ticker, start_date, end_date)
+    return session.get_index_returns(ticker, start_date, end_date)
+
+
+def get_returns(tickers, start_date, end_date, session=None):
+    """
+    Get daily returns of several tickers through the given or active MarketDataSession.
+
+    Parameters:
+    tickers (list): Ticker symbols
+    start_date (str or datetime): Start date for historical data
+    end_date (str or datetime): End date for historical data (exclusive)
+    session (MarketDataSession): Session to resolve the request in. Defaults to the active session, if any
+
+    Returns:
+    pandas.DataFrame: Daily returns with one column per ticker, starting the trading day after the
+                      first one in the range whether they are read from a ReturnStore or computed
+                      from downloaded prices
+    """
+    if session is None:
+        session = current_session()
+    if session is None:
+        return _fetch_returns(tickers, start_date, end_date)
+    return session.get_returns(tickers, start_date, end_date)
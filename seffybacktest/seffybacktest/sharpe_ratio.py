@@ -1,20 +1,29 @@
 import numpy as np
+from .moments import ReturnMoments
 
 def sharpe_ratio(portfolio_returns, risk_free_rate=None):
-    
+    """
+    Calculate the annualized Sharpe Ratio of a portfolio.
+
+    Parameters:
+    portfolio_returns (pd.Series, pd.DataFrame or ReturnMoments): Daily returns of the portfolio, one column per portfolio, or their moments
+    risk_free_rate (float): Annual risk-free rate. If None, it will be fetched using get_risk_free_rate()
+
+    Returns:
+    float: Sharpe Ratio (pd.Series keyed by portfolio for a returns matrix)
+    """
     if risk_free_rate is None:
         risk_free_rate = get_risk_free_rate()
     
     # Convert annual risk-free rate to daily rate
     daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
+
+    moments = ReturnMoments.of(portfolio_returns, daily_risk_free_rate)
     
-    # Calculate excess returns
-    excess_returns = portfolio_returns - daily_risk_free_rate
-    
-    # Calculate Sharpe ratio
-    sharpe = np.sqrt(252) * excess_returns.mean() / excess_returns.std()
+    # Calculate Sharpe ratio from the mean excess return
+    sharpe = np.sqrt(252) * (moments.mean - daily_risk_free_rate) / moments.std()
     
-    return sharpe
+    return moments.wrap(sharpe)
 
 def get_risk_free_rate():
     default_rate = 0.0425  # 4.25%
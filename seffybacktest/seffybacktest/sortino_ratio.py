@@ -1,25 +1,32 @@
 import numpy as np
+from .moments import ReturnMoments
 from .sharpe_ratio import get_risk_free_rate
 
 def sortino_ratio(portfolio_returns, risk_free_rate=None):
+    """
+    Calculate the annualized Sortino Ratio of a portfolio.
+
+    Parameters:
+    portfolio_returns (pd.Series, pd.DataFrame or ReturnMoments): Daily returns of the portfolio, one column per portfolio, or their moments with the daily risk-free rate as threshold
+    risk_free_rate (float): Annual risk-free rate. If None, it will be fetched using get_risk_free_rate()
+
+    Returns:
+    float: Sortino Ratio (pd.Series keyed by portfolio for a returns matrix)
+    """
     if risk_free_rate is None:
         risk_free_rate = get_risk_free_rate()
 
     # Convert annual risk-free rate to daily rate
     daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
-    
-    # Calculate excess returns
-    excess_returns = portfolio_returns - daily_risk_free_rate
-    
-    # Calculate downside returns
-    downside_returns = excess_returns[excess_returns < 0]
+
+    moments = ReturnMoments.of(portfolio_returns, daily_risk_free_rate)
+    if not np.isclose(moments.threshold, daily_risk_free_rate, rtol=0, atol=1e-12):
+        raise ValueError("Moments were computed with a downside threshold other than the daily risk-free rate")
     
     # Calculate downside deviation (annualized)
-    downside_deviation = np.sqrt(252) * np.sqrt(np.mean(downside_returns**2))
+    downside_deviation = np.sqrt(252) * moments.downside_deviation
     
     # Calculate Sortino ratio
-    sortino = np.sqrt(252) * excess_returns.mean() / downside_deviation
+    sortino = np.sqrt(252) * (moments.mean - daily_risk_free_rate) / downside_deviation
     
-    return sortino
-
-
+    return moments.wrap(sortino)
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from .moments import ReturnMoments
+from .sharpe_ratio import sharpe_ratio, get_risk_free_rate
+from .sortino_ratio import sortino_ratio
+from .volatility import calculate_portfolio_volatility
+
+
+class ReturnAccumulator:
+    """
+    Running performance metrics of a live portfolio, updated as each return arrives.
+
+    Keeps only a compact state: the return moments (Welford-style, see
+    ReturnMoments), log wealth with its running peak and largest fall, and the
+    co-moments of the portfolio with a benchmark. Every metric is read from
+    that state without revisiting past returns and matches the corresponding
+    batch function over the same history. The state can be saved with
+    to_dict() and restored with from_dict() to resume after a restart.
+
+        accumulator = ReturnAccumulator(risk_free_rate=0.0425)
+        accumulator.update(todays_return, todays_benchmark_return)
+        accumulator.sharpe_ratio(), accumulator.max_drawdown(), accumulator.beta()
+    """
+
+    def __init__(self, risk_free_rate=None):
+        if risk_free_rate is None:
+            risk_free_rate = get_risk_free_rate()
+        self.risk_free_rate = risk_free_rate
+        self.daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
+
+        self.moments = None
+        self.log_wealth = 0.0
+        self.peak_log_wealth = -np.inf
+        self.max_log_drop = 0.0
+
+        # Co-moments over the days that have both a portfolio and a benchmark return
+        self.pair_count = 0.0
+        self.pair_mean_portfolio = 0.0
+        self.pair_mean_benchmark = 0.0
+        self.benchmark_m2 = 0.0
+        self.co_moment = 0.0
+
+    def update(self, portfolio_return, benchmark_return=None):
+        """
+        Add one daily return (and optionally the benchmark's return on the same day).
+        """
+        self.update_many([portfolio_return], None if benchmark_return is None else [benchmark_return])
+
+    def update_many(self, portfolio_returns, benchmark_returns=None):
+        """
+        Add a block of consecutive daily returns in one vectorized step.
+
+        Parameters:
+        portfolio_returns (array-like): Daily returns of the portfolio, oldest first
+        benchmark_returns (array-like): Benchmark returns on the same days, aligned by date if both are Series
+        """
+        if isinstance(portfolio_returns, pd.Series) and isinstance(benchmark_returns, pd.Series):
+            benchmark_returns = benchmark_returns.reindex(portfolio_returns.index)
+        returns = np.asarray(portfolio_returns, dtype=float).reshape(-1)
+        if len(returns) == 0:
+            return
+
+        block = ReturnMoments.from_returns(returns, self.daily_risk_free_rate)
+        self.moments = block if self.moments is None else self.moments.merge(block)
+
+        # Missing returns leave wealth unchanged
+        log_wealth = self.log_wealth + np.cumsum(np.log1p(np.nan_to_num(returns)))
+        peak = np.maximum(self.peak_log_wealth, np.maximum.accumulate(log_wealth))
+        self.max_log_drop = max(self.max_log_drop, float((peak - log_wealth).max()))
+        self.log_wealth = float(log_wealth[-1])
+        self.peak_log_wealth = float(peak[-1])
+
+        if benchmark_returns is not None:
+            self._update_co_moments(returns, np.asarray(benchmark_returns, dtype=float).reshape(-1))
+
+    def _update_co_moments(self, returns, benchmark):
+        paired = ~np.isnan(returns) & ~np.isnan(benchmark)
+        x, y = benchmark[paired], returns[paired]
+        if len(x) == 0:
+            return
+
+        n_a, n_b = self.pair_count, float(len(x))
+        n = n_a + n_b
+        mean_x, mean_y = x.mean(), y.mean()
+        delta_x = mean_x - self.pair_mean_benchmark
+        delta_y = mean_y - self.pair_mean_portfolio
+
+        self.benchmark_m2 += float(((x - mean_x) ** 2).sum() + delta_x * delta_x * n_a * n_b / n)
+        self.co_moment += float(((x - mean_x) * (y - mean_y)).sum() + delta_x * delta_y * n_a * n_b / n)
+        self.pair_mean_benchmark += float(delta_x * n_b / n)
+        self.pair_mean_portfolio += float(delta_y * n_b / n)
+        self.pair_count = n
+
+    @property
+    def count(self):
+        """
+        Number of returns seen so far.
+        """
+        return 0 if self.moments is None else int(self.moments.count[0])
+
+    def sharpe_ratio(self):
+        return sharpe_ratio(self.moments, self.risk_free_rate)
+
+    def sortino_ratio(self):
+        return sortino_ratio(self.moments, self.risk_free_rate)
+
+    def volatility(self, annualize=False):
+        return calculate_portfolio_volatility(self.moments, annualize)
+
+    def annual_return(self):
+        # Same annualization as annual_return()
+        return np.exp(self.log_wealth) ** (12 / (self.count / 252)) - 1
+
+    def max_drawdown(self):
+        """
+        Largest peak-to-trough fall so far, as a negative fraction.
+        """
+        return np.expm1(-self.max_log_drop)
+
+    def calmar_ratio(self):
+        # Over the whole history, as calculate_calmar_ratio(returns, window=None)
+        annualized_return = np.exp(self.log_wealth) ** (252 / self.count) - 1
+        return annualized_return / abs(self.max_drawdown())
+
+    def beta(self):
+        return self.co_moment / self.benchmark_m2
+
+    def to_dict(self):
+        """
+        Return the accumulator state as plain Python values that can be stored as JSON.
+        """
+        return {
+            "risk_free_rate": self.risk_free_rate,
+            "moments": None if self.moments is None else self.moments.to_dict(),
+            "log_wealth": self.log_wealth,
+            # No peak before the first return; JSON has no -Infinity
+            "peak_log_wealth": None if np.isneginf(self.peak_log_wealth) else self.peak_log_wealth,
+            "max_log_drop": self.max_log_drop,
+            "pair_count": self.pair_count,
+            "pair_mean_portfolio": self.pair_mean_portfolio,
+            "pair_mean_benchmark": self.pair_mean_benchmark,
+            "benchmark_m2": self.benchmark_m2,
+            "co_moment": self.co_moment,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restore an accumulator saved with to_dict().
+        """
+        accumulator = cls(state["risk_free_rate"])
+        for name, value in state.items():
+            if name not in ("risk_free_rate", "moments"):
+                setattr(accumulator, name, value)
+        if accumulator.peak_log_wealth is None:
+            accumulator.peak_log_wealth = -np.inf
+        if state["moments"] is not None:
+            accumulator.moments = ReturnMoments.from_dict(state["moments"])
+        return accumulator
@@ -0,0 +1,333 @@
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .adjusted_sharpe import adjusted_sharpe
+from .annual_return import annual_return
+from .average_returns import average_return
+from .calmar_ratio import calculate_calmar_ratio
+from .capm_calculation import calculate_capm
+from .correlation import correlation_with_index
+from .double_sharpe import double_sharpe
+from .factor_store import load_factors
+from .famafrench import calculate_fama_french
+from .indicators import INDICATORS, BENCHMARK_INDICATORS
+from .intraweek_variances import analyze_portfolio_volatility
+from .market_alpha import alpha
+from .market_beta import beta
+from .modified_sharpe import modified_sharpe
+from .moments import ReturnMoments
+from .session import MarketDataSession
+from .sharpe_ratio import sharpe_ratio
+from .sortino_ratio import sortino_ratio
+from .treynor_ratio import treynor_ratio
+from .volatility import calculate_portfolio_volatility
+
+# Parameters that can be swept, with the value used when the grid leaves them out
+SWEEP_PARAMETERS = {
+    "window": 14,
+    "confidence_level": 0.95,
+    "risk_free_rate": 0.0425,
+    "benchmark": "^GSPC",
+}
+
+# Parameters each indicator depends on. Combinations that agree on them share one result.
+INDICATOR_PARAMETERS = {
+    "Adjusted Sharpe Ratio": ("risk_free_rate",),
+    "Annual Return": (),
+    "Average Return": (),
+    "Calmar Ratio": (),
+    "CAPM": ("risk_free_rate", "benchmark"),
+    "Correlation with Index": ("benchmark",),
+    "CVaR": ("confidence_level",),
+    "Double Sharpe Ratio": ("risk_free_rate",),
+    "Fama-French Factors": ("risk_free_rate", "benchmark"),
+    "Intraweek Variances": (),
+    "Market Alpha": ("risk_free_rate", "benchmark"),
+    "Market Beta": ("benchmark",),
+    "Modified Sharpe Ratio": ("risk_free_rate",),
+    "Momentum": ("window",),
+    "RSI": ("window",),
+    "Sharpe Ratio": ("risk_free_rate",),
+    "Sortino Ratio": ("risk_free_rate",),
+    "Treynor Ratio": ("risk_free_rate", "benchmark"),
+    "VaR": ("confidence_level",),
+    "Portfolio Volatility": (),
+}
+
+
+def parameter_grid(grid):
+    """
+    Expand a parameter grid into every combination of its values.
+
+    Parameters:
+    grid (dict): Lists of values keyed by parameter name, e.g. {"window": [14, 28], "confidence_level": [0.95, 0.99]}
+
+    Returns:
+    list: One dict of parameter values per combination
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def walk_forward_splits(index, train_size, test_size, step=None, expanding=False):
+    """
+    Split a date index into consecutive train/test windows for walk-forward analysis.
+
+    Each test window directly follows its training window. Windows advance by
+    `step` rows (the test size by default), so the test windows tile the history
+    without overlapping.
+
+    Parameters:
+    index (pd.DatetimeIndex): Dates of the returns
+    train_size (int): Number of trading days in each training window
+    test_size (int): Number of trading days in each test window
+    step (int): Number of trading days between consecutive splits. Default is test_size.
+    expanding (bool): If True, every training window starts at the first date instead of rolling forward
+
+    Returns:
+    list: (train_dates, test_dates) pairs
+    """
+    step = test_size if step is None else step
+    splits = []
+    start = 0
+    while start + train_size + test_size <= len(index):
+        train_start = 0 if expanding else start
+        test_start = start + train_size
+        splits.append((index[train_start:test_start], index[test_start:test_start + test_size]))
+        start += step
+    return splits
+
+
+class _SliceResults:
+    """
+    Indicator values for one slice of returns, with the intermediate results shared by
+    every parameter combination: the return moments per risk-free rate, the sorted
+    returns for VaR and CVaR, the cumulative returns for momentum, the running gain
+    and loss sums for RSI, and the benchmark returns held by the session.
+    """
+
+    def __init__(self, returns, session):
+        self.returns = returns
+        self.session = session
+        self._values = {}
+        self._moments = {}
+        self._sorted = None
+        self._cumulative = None
+        self._gains_losses = None
+
+    def moments(self, risk_free_rate):
+        if risk_free_rate not in self._moments:
+            daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
+            self._moments[risk_free_rate] = ReturnMoments.from_returns(self.returns, daily_risk_free_rate)
+        return self._moments[risk_free_rate]
+
+    def tail(self, confidence_level):
+        # Same order statistic as calculate_var, and the mean of the returns at or below it as calculate_cvar
+        if self._sorted is None:
+            sorted_returns = np.sort(self.returns.to_numpy(dtype=float))
+            self._sorted = sorted_returns, np.concatenate([[0.0], np.cumsum(sorted_returns)])
+        sorted_returns, prefix_sums = self._sorted
+        threshold = sorted_returns[int((1 - confidence_level) * len(sorted_returns))]
+        count = np.searchsorted(sorted_returns, threshold, side="right")
+        return -threshold, -prefix_sums[count] / count
+
+    def momentum(self, window):
+        # Latest value of calculate_momentum
+        if self._cumulative is None:
+            self._cumulative = np.cumprod(1 + self.returns.to_numpy(dtype=float))
+        if len(self._cumulative) <= window:
+            return np.nan
+        return self._cumulative[-1] / self._cumulative[-1 - window] - 1
+
+    def rsi(self, window):
+        # Latest value of calculate_rsi
+        if self._gains_losses is None:
+            returns = self.returns.to_numpy(dtype=float)
+            self._gains_losses = (np.cumsum(np.where(returns > 0, returns, 0.0)),
+                                  np.cumsum(np.where(returns < 0, -returns, 0.0)))
+        gains, losses = self._gains_losses
+        start = len(gains) - min(window, len(gains)) - 1
+
+        def window_sum(sums):
+            return sums[-1] - (sums[start] if start >= 0 else 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            relative_strength = window_sum(gains) / window_sum(losses)
+            return 100 - 100 / (1 + relative_strength)
+
+    def values(self, indicator, parameters):
+        """
+        Outputs of one indicator for one parameter combination, as a dict keyed by output name.
+        """
+        key = (indicator,) + tuple(parameters[name] for name in INDICATOR_PARAMETERS[indicator])
+        if key not in self._values:
+            self._values[key] = self._calculate(indicator, parameters)
+        return self._values[key]
+
+    def _calculate(self, indicator, parameters):
+        returns = self.returns
+        rf = parameters["risk_free_rate"]
+        ticker = parameters["benchmark"]
+        session = self.session
+
+        if indicator == "Adjusted Sharpe Ratio":
+            value = adjusted_sharpe(self.moments(rf), rf)
+        elif indicator == "Annual Return":
+            value = annual_return(returns)
+        elif indicator == "Average Return":
+            value = average_return(returns)
+        elif indicator == "Calmar Ratio":
+            value = calculate_calmar_ratio(returns)
+        elif indicator == "CAPM":
+            value = calculate_capm(returns, rf, ticker, session)
+        elif indicator == "Correlation with Index":
+            value = correlation_with_index(returns, ticker, session)
+        elif indicator == "CVaR":
+            value = self.tail(parameters["confidence_level"])[1]
+        elif indicator == "Double Sharpe Ratio":
+            value = double_sharpe(self.moments(rf), rf)
+        elif indicator == "Fama-French Factors":
+            value = calculate_fama_french(returns, rf, ticker, session)
+        elif indicator == "Intraweek Variances":
+            intraweek_results = analyze_portfolio_volatility(returns, return_highest_week=False)
+            return {"Average Intraweek Variance": intraweek_results["average_intraweek_variance"],
+                    "Highest Variance": intraweek_results["highest_variance"]}
+        elif indicator == "Market Alpha":
+            value = alpha(returns, ticker, rf, session)
+        elif indicator == "Market Beta":
+            value = beta(returns, ticker, session)
+        elif indicator == "Modified Sharpe Ratio":
+            value = modified_sharpe(self.moments(rf), rf)
+        elif indicator == "Momentum":
+            value = self.momentum(parameters["window"])
+        elif indicator == "RSI":
+            value = self.rsi(parameters["window"])
+        elif indicator == "Sharpe Ratio":
+            value = sharpe_ratio(self.moments(rf), rf)
+        elif indicator == "Sortino Ratio":
+            value = sortino_ratio(self.moments(rf), rf)
+        elif indicator == "Treynor Ratio":
+            portfolio_beta = self.values("Market Beta", parameters)["Market Beta"]
+            value = treynor_ratio(self.moments(rf), portfolio_beta, rf)
+        elif indicator == "VaR":
+            value = self.tail(parameters["confidence_level"])[0]
+        elif indicator == "Portfolio Volatility":
+            value = calculate_portfolio_volatility(returns)
+        return {indicator: value}
+
+
+_worker_session = None
+
+
+def _init_worker(session):
+    global _worker_session
+    _worker_session = session
+
+
+def _evaluate_slice(returns, combinations, indicators, session=None):
+    """
+    Evaluate every indicator for every parameter combination on one slice of returns.
+
+    Returns:
+    list: (combination number, output name, value) tuples
+    """
+    results = _SliceResults(returns, session or _worker_session)
+    rows = []
+    for i, parameters in enumerate(combinations):
+        for indicator in indicators:
+            for output, value in results.values(indicator, parameters).items():
+                rows.append((i, output, float(value)))
+    return rows
+
+
+def _evaluate_slice_args(args):
+    return _evaluate_slice(*args)
+
+
+def run_sweep(portfolio_returns, grid=None, indicators=None, walk_forward=None, processes=None):
+    """
+    Evaluate indicators over a grid of parameters, spread across a pool of processes.
+
+    The returns are cut into slices (one per portfolio, period and walk-forward
+    window) and each slice is evaluated for every combination in one task, so
+    the intermediate results an indicator needs (moments, sorted returns,
+    cumulative returns, benchmark returns) are computed once per slice and
+    shared by all combinations. Benchmark returns are downloaded up front in
+    this process and handed to the workers.
+
+    Momentum and RSI are reported as their latest value in each slice.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    grid (dict): Lists of values keyed by parameter. Sweepable parameters are those in SWEEP_PARAMETERS
+                 and "period", a list of (start_date, end_date) ranges (both inclusive)
+    indicators (list): Names of the indicators to evaluate, from INDICATORS. Default is all of them.
+    walk_forward (dict): Keyword arguments for walk_forward_splits (train_size, test_size, step, expanding).
+                         If given, every period is split and both samples of each split are evaluated.
+    processes (int): Number of worker processes. Default is the number of CPUs; 1 runs in this process.
+
+    Returns:
+    pd.DataFrame: One row per slice, combination and indicator output, with columns portfolio,
+                  start_date, end_date, fold and sample (walk-forward only), the swept parameters,
+                  indicator and value
+    """
+    grid = dict(grid or {})
+    indicators = list(INDICATORS if indicators is None else indicators)
+    unknown = [name for name in grid if name not in SWEEP_PARAMETERS and name != "period"]
+    if unknown:
+        raise ValueError(f"Cannot sweep {unknown}. Choose from {list(SWEEP_PARAMETERS) + ['period']}")
+    unknown = [indicator for indicator in indicators if indicator not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicators {unknown}. Choose from {INDICATORS}")
+
+    if isinstance(portfolio_returns, pd.Series):
+        portfolio_returns = portfolio_returns.to_frame(portfolio_returns.name or "Portfolio")
+    periods = grid.pop("period", [(None, None)])
+    swept = list(grid)
+    combinations = [{**SWEEP_PARAMETERS, **parameters} for parameters in parameter_grid(grid)]
+
+    # Slices of returns with the labels identifying them
+    slices = []
+    for portfolio in portfolio_returns:
+        returns = portfolio_returns[portfolio].dropna()
+        for start_date, end_date in periods:
+            period_returns = returns.loc[start_date:end_date]
+            if walk_forward is None:
+                slices.append(({"portfolio": portfolio}, period_returns))
+                continue
+            splits = walk_forward_splits(period_returns.index, **walk_forward)
+            for fold, (train_dates, test_dates) in enumerate(splits):
+                slices.append(({"portfolio": portfolio, "fold": fold, "sample": "train"}, period_returns.loc[train_dates]))
+                slices.append(({"portfolio": portfolio, "fold": fold, "sample": "test"}, period_returns.loc[test_dates]))
+    slices = [(labels, returns) for labels, returns in slices if len(returns) > 0]
+
+    # Download everything the workers will need once, here
+    session = MarketDataSession()
+    if any(indicator in BENCHMARK_INDICATORS for indicator in indicators):
+        tickers = {parameters["benchmark"] for parameters in combinations} | {"^GSPC"}
+        for _, returns in slices:
+            for ticker in tickers:
+                session.get_index_returns(ticker, returns.index[0], returns.index[-1])
+        if "Fama-French Factors" in indicators:
+            # Up to the latest end date, so the store is brought up to date here and not by every worker
+            load_factors("3-factor", end_date=max(returns.index[-1] for _, returns in slices))
+
+    processes = os.cpu_count() if processes is None else processes
+    if processes == 1 or len(slices) == 1:
+        results = [_evaluate_slice(returns, combinations, indicators, session) for _, returns in slices]
+    else:
+        tasks = [(returns, combinations, indicators) for _, returns in slices]
+        chunksize = max(1, len(tasks) // (4 * processes))
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(session,)) as executor:
+            results = list(executor.map(_evaluate_slice_args, tasks, chunksize=chunksize))
+
+    rows = []
+    for (labels, returns), slice_rows in zip(slices, results):
+        labels = {**labels, "start_date": returns.index[0], "end_date": returns.index[-1]}
+        for i, output, value in slice_rows:
+            parameters = {name: combinations[i][name] for name in swept}
+            rows.append({**labels, **parameters, "indicator": output, "value": value})
+
+    columns = ["portfolio", "start_date", "end_date"] + (["fold", "sample"] if walk_forward is not None else [])
+    return pd.DataFrame(rows, columns=columns + swept + ["indicator", "value"])
@@ -0,0 +1,128 @@
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from .moments import ReturnMoments
+from .returns_matrix import as_returns_matrix
+
+DEFAULT_CONFIDENCE_LEVELS = (0.90, 0.95, 0.975, 0.99, 0.999)
+
+
+def _as_columns(portfolio_returns):
+    matrix = as_returns_matrix(portfolio_returns)
+    if matrix is None:
+        return np.asarray(portfolio_returns, dtype=float).reshape(-1, 1), None
+    return matrix
+
+
+def historical_tail(returns, confidence_levels):
+    """
+    Historical VaR and CVaR of every column at several confidence levels with one partial selection.
+
+    The order statistics of all levels are placed with a single np.partition
+    per column instead of a full sort: VaR at level c is the return at
+    position int((1 - c) * n) of the valid returns, as in calculate_var, and
+    CVaR is the mean of the returns at or below it, as in calculate_cvar.
+
+    Parameters:
+    returns (np.ndarray): Daily returns of shape (days, portfolios). Missing returns (NaN) are skipped.
+    confidence_levels (list): Confidence levels, e.g. [0.95, 0.99]
+
+    Returns:
+    tuple: (VaR, CVaR), each an np.ndarray of shape (levels, portfolios)
+    """
+    levels = np.asarray(confidence_levels, dtype=float)
+    var = np.full((len(levels), returns.shape[1]), np.nan)
+    cvar = np.full((len(levels), returns.shape[1]), np.nan)
+
+    # Columns with the same number of valid returns share the positions to select
+    valid_counts = np.sum(~np.isnan(returns), axis=0)
+    for count in np.unique(valid_counts):
+        if count == 0:
+            continue
+        columns = np.flatnonzero(valid_counts == count)
+        block = returns if len(columns) == returns.shape[1] else returns[:, columns]
+
+        positions = np.minimum(((1 - levels) * count).astype(int), count - 1)
+        selected = np.partition(block, np.unique(positions), axis=0)
+        last = positions.max()
+
+        for i, position in enumerate(positions):
+            threshold = selected[position]
+            # Returns tied with the threshold can sit anywhere after it, among the NaNs too
+            # (NaN never equals it). Past the last selected position every return is at
+            # least selected[last], so stop there if that is larger.
+            end = last + 1 if np.all(threshold < selected[last]) else len(selected)
+            ties = np.sum(selected[position + 1:end] == threshold, axis=0)
+            tail_sum = selected[:position + 1].sum(axis=0) + ties * threshold
+            var[i, columns] = -threshold
+            cvar[i, columns] = -tail_sum / (position + 1 + ties)
+
+    return var, cvar
+
+
+def gaussian_var(portfolio_returns, confidence_level=0.95):
+    """
+    Calculate parametric Value at Risk (VaR) assuming normally distributed returns.
+
+    Parameters:
+    portfolio_returns (pd.Series, pd.DataFrame or ReturnMoments): Daily returns of the portfolio, one column per portfolio, or their moments
+    confidence_level (float): Confidence level for VaR calculation (default: 0.95)
+
+    Returns:
+    float: Value at Risk (pd.Series keyed by portfolio for a returns matrix)
+    """
+    moments = ReturnMoments.of(portfolio_returns)
+    z = NormalDist().inv_cdf(1 - confidence_level)
+    return moments.wrap(-(moments.mean + z * moments.std()))
+
+
+def cornish_fisher_var(portfolio_returns, confidence_level=0.95):
+    """
+    Calculate modified Value at Risk (VaR) with the Cornish-Fisher expansion.
+
+    The normal quantile is adjusted for the skewness and excess kurtosis of the
+    returns, so fat tails and asymmetry raise the VaR.
+
+    Parameters:
+    portfolio_returns (pd.Series, pd.DataFrame or ReturnMoments): Daily returns of the portfolio, one column per portfolio, or their moments
+    confidence_level (float): Confidence level for VaR calculation (default: 0.95)
+
+    Returns:
+    float: Value at Risk (pd.Series keyed by portfolio for a returns matrix)
+    """
+    moments = ReturnMoments.of(portfolio_returns)
+    z = NormalDist().inv_cdf(1 - confidence_level)
+    skewness, kurtosis = moments.skewness, moments.kurtosis
+    z_cf = (z + (z**2 - 1) * skewness / 6 + (z**3 - 3 * z) * kurtosis / 24
+            - (2 * z**3 - 5 * z) * skewness**2 / 36)
+    return moments.wrap(-(moments.mean + z_cf * moments.std()))
+
+
+def tail_risk(portfolio_returns, confidence_levels=DEFAULT_CONFIDENCE_LEVELS):
+    """
+    Calculate historical VaR and CVaR, Gaussian VaR and Cornish-Fisher VaR at several confidence levels.
+
+    The historical measures come from one partial selection of the returns (see
+    historical_tail) and the parametric ones from one pass over their moments,
+    so asking for more levels costs almost nothing extra.
+
+    Parameters:
+    portfolio_returns (pd.Series or pd.DataFrame): Daily returns of the portfolio, or one column per portfolio
+    confidence_levels (list): Confidence levels. Default is 90%, 95%, 97.5%, 99% and 99.9%.
+
+    Returns:
+    pd.DataFrame: One row per confidence level and the columns VaR, CVaR, Gaussian VaR and
+                  Cornish-Fisher VaR. For a returns matrix the columns are (measure, portfolio).
+    """
+    returns, portfolios = _as_columns(portfolio_returns)
+    var, cvar = historical_tail(returns, confidence_levels)
+    moments = ReturnMoments.from_returns(returns)
+    gaussian = np.array([np.atleast_1d(gaussian_var(moments, level)) for level in confidence_levels])
+    cornish_fisher = np.array([np.atleast_1d(cornish_fisher_var(moments, level)) for level in confidence_levels])
+
+    index = pd.Index(confidence_levels, name="confidence_level")
+    measures = {"VaR": var, "CVaR": cvar, "Gaussian VaR": gaussian, "Cornish-Fisher VaR": cornish_fisher}
+    if portfolios is None:
+        return pd.DataFrame({name: values[:, 0] for name, values in measures.items()}, index=index)
+    return pd.concat({name: pd.DataFrame(values, index=index, columns=portfolios)
+                      for name, values in measures.items()}, axis=1)
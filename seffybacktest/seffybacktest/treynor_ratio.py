@@ -1,19 +1,28 @@
 import numpy as np
+from .moments import ReturnMoments
 from .sharpe_ratio import get_risk_free_rate
 
 def treynor_ratio(portfolio_returns, beta, risk_free_rate=None):
-    
+    """
+    Calculate the Treynor Ratio of a portfolio.
+
+    Parameters:
+    portfolio_returns (pd.Series, pd.DataFrame or ReturnMoments): Daily returns of the portfolio, one column per portfolio, or their moments
+    beta (float or array-like): Beta of the portfolio, or one beta per portfolio column
+    risk_free_rate (float): Annual risk-free rate. If None, it will be fetched using get_risk_free_rate()
+
+    Returns:
+    float: Treynor Ratio (pd.Series keyed by portfolio for a returns matrix)
+    """
     if risk_free_rate is None:
         risk_free_rate = get_risk_free_rate()
 
     # Convert annual risk-free rate to daily rate
     daily_risk_free_rate = (1 + risk_free_rate) ** (1/252) - 1
-    
-    # Calculate excess returns
-    excess_returns = portfolio_returns - daily_risk_free_rate
+
+    moments = ReturnMoments.of(portfolio_returns, daily_risk_free_rate)
     
     # Calculate treynor ratio
-    treynor = np.sqrt(252) * excess_returns.mean() / beta
+    treynor = np.sqrt(252) * (moments.mean - daily_risk_free_rate) / np.asarray(beta, dtype=float)
     
-    return treynor
-
+    return moments.wrap(treynor)
@@ -1,19 +1,28 @@
+import numpy as np
+import pandas as pd
+from .returns_matrix import as_returns_matrix
+from .tail_risk import historical_tail
+
 def calculate_var(portfolio_returns, confidence_level=0.95):
     """
     Calculate Value at Risk (VaR) using the historical method.
-    
+
     Parameters:
-    portfolio_returns (pandas.Series): Daily returns of the portfolio
+    portfolio_returns (pandas.Series or pandas.DataFrame): Daily returns of the portfolio, or one column per portfolio
     confidence_level (float): Confidence level for VaR calculation (default: 0.95)
-    
+
     Returns:
-    float: Value at Risk
+    float: Value at Risk (pandas.Series keyed by portfolio for a returns matrix)
     """
-    # Sort returns from worst to best
-    sorted_returns = portfolio_returns.sort_values()
-    
-    # Find the index at the given confidence level
-    index = int((1 - confidence_level) * len(sorted_returns))
-    
+    matrix = as_returns_matrix(portfolio_returns)
+    if matrix is not None:
+        returns, portfolios = matrix
+        var, _ = historical_tail(returns, [confidence_level])
+        return pd.Series(var[0], index=portfolios)
+
+    # Select the return at the given confidence level (worst first) without sorting the rest
+    returns = np.asarray(portfolio_returns, dtype=float).reshape(-1, 1)
+    var, _ = historical_tail(returns, [confidence_level])
+
     # Return the VaR
-    return -sorted_returns.iloc[index]
+    return var[0, 0]
@@ -1,17 +1,20 @@
 import numpy as np
+from .moments import ReturnMoments
 
 def calculate_portfolio_volatility(portfolio_returns, annualize=False):
     """
     Calculate the volatility of portfolio returns.
     
     Parameters:
-    portfolio_returns (pandas.Series): Daily returns of the portfolio
+    portfolio_returns (pandas.Series, pandas.DataFrame or ReturnMoments): Daily returns of the portfolio, one column per portfolio, or their moments
+    annualize (bool): Whether to annualize the daily volatility
     
     Returns:
-    float: Portfolio volatility
+    float: Portfolio volatility (pandas.Series keyed by portfolio for a returns matrix)
     """
     # Calculate daily volatility
-    daily_volatility = np.std(portfolio_returns)
+    moments = ReturnMoments.of(portfolio_returns)
+    daily_volatility = moments.wrap(moments.std(ddof=0))
 
     if annualize:
         return daily_volatility * np.sqrt(252)
@@ -26,4 +29,3 @@ def calculate_portfolio_volatility(portfolio_returns, annualize=False):
     #     return daily_volatility
     # else:
     #     return daily_volatility
-
@@ -0,0 +1,153 @@
+"""
+FetchScheduler and TokenBucket against a local stand-in provider; nothing here reaches the network.
+"""
+import time
+import threading
+import pandas as pd
+import pytest
+from concurrent.futures import Future
+from seffybacktest import price_cache
+from seffybacktest.fetch_scheduler import FetchScheduler, TokenBucket
+
+START = pd.Timestamp("2024-01-01")
+END = pd.Timestamp("2024-02-01")
+
+
+class StandInProvider:
+    """
+    Business-day prices over [start_date, end_date), failing the first `failures` calls of each ticker.
+    """
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = []
+        self.started = []
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker, start_date, end_date):
+        with self._lock:
+            self.calls.append((ticker, start_date, end_date))
+            self.started.append(time.monotonic())
+            attempt = sum(1 for call in self.calls if call[0] == ticker)
+        time.sleep(self.delay)
+        if attempt <= self.failures:
+            raise ConnectionError(f"{ticker}: attempt {attempt} failed")
+        days = pd.bdate_range(start_date, end_date - pd.Timedelta(days=1), name="Date")
+        return pd.Series(100.0, index=days, name=ticker)
+
+
+def test_fetch_returns_prices_per_request():
+    provider = StandInProvider()
+    with FetchScheduler(max_workers=4, provider=provider) as scheduler:
+        prices = scheduler.fetch([("AAA", START, END), ("BBB", START, END)])
+    assert list(prices) == [("AAA", START, END), ("BBB", START, END)]
+    assert len(prices[("AAA", START, END)]) == len(pd.bdate_range(START, END - pd.Timedelta(days=1)))
+
+
+def test_retries_with_exponential_backoff():
+    provider = StandInProvider(failures=2)
+    with FetchScheduler(provider=provider, retries=3, backoff=0.05) as scheduler:
+        prices = scheduler.fetch([("AAA", START, END)])
+    assert len(prices[("AAA", START, END)]) > 0
+    assert len(provider.calls) == 3
+    gaps = [later - earlier for earlier, later in zip(provider.started, provider.started[1:])]
+    # Waits of 0.05 and then 0.1 seconds
+    assert gaps[0] >= 0.05
+    assert gaps[1] >= 0.1
+
+
+def test_backoff_is_capped():
+    provider = StandInProvider(failures=2)
+    with FetchScheduler(provider=provider, retries=2, backoff=10.0, max_backoff=0.01) as scheduler:
+        began = time.monotonic()
+        scheduler.fetch([("AAA", START, END)])
+    assert time.monotonic() - began < 1.0
+
+
+def test_raises_once_retries_are_used_up():
+    provider = StandInProvider(failures=10)
+    with FetchScheduler(provider=provider, retries=2, backoff=0.0) as scheduler:
+        with pytest.raises(ConnectionError):
+            scheduler.fetch([("AAA", START, END)])
+    assert len(provider.calls) == 3
+
+
+def test_concurrent_identical_requests_download_once():
+    provider = StandInProvider(delay=0.2)
+    results = []
+    with FetchScheduler(max_workers=4, provider=provider) as scheduler:
+        def request():
+            results.append(scheduler.fetch([("AAA", START, END), ("AAA", START, END)]))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(provider.calls) == 1
+    assert len(results) == 8
+
+
+def test_finished_request_is_downloaded_again():
+    provider = StandInProvider()
+    with FetchScheduler(provider=provider) as scheduler:
+        scheduler.fetch([("AAA", START, END)])
+        scheduler.fetch([("AAA", START, END)])
+    assert len(provider.calls) == 2
+
+
+def test_rate_limit_spaces_requests():
+    provider = StandInProvider()
+    with FetchScheduler(max_workers=8, rate=20, burst=1, provider=provider) as scheduler:
+        scheduler.fetch([(f"T{i}", START, END) for i in range(6)])
+    started = sorted(provider.started)
+    # One request at once, then one every 1/20 s
+    assert started[-1] - started[0] >= 5 / 20 * 0.9
+
+
+def test_token_bucket_allows_burst_then_rate():
+    bucket = TokenBucket(rate=50, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    began = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - began >= 5 / 50 * 0.9
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+class FinishedExecutor:
+    """
+    Executor that runs each task before submit returns, as a fast download may.
+    """
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_download_prices_with_finished_download(tmp_path, monkeypatch):
+    # A download that is done before submit returns must not deadlock the scheduler
+    monkeypatch.setenv("SEFFYBACKTEST_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(price_cache, "_download", StandInProvider())
+    finished = []
+
+    def download():
+        with FetchScheduler() as scheduler:
+            scheduler._executor = FinishedExecutor()
+            finished.append(price_cache.download_prices(["AAA", "BBB"], "2024-01-01", "2024-02-01"))
+
+    thread = threading.Thread(target=download, daemon=True)
+    thread.start()
+    thread.join(timeout=20)
+    assert finished, "download_prices did not return"
+    assert list(finished[0].columns) == ["AAA", "BBB"]
+    assert len(finished[0]) == len(pd.bdate_range("2024-01-01", "2024-01-31"))
@@ -0,0 +1,38 @@
+"""
+Historical VaR and CVaR of historical_tail against a direct computation.
+"""
+import numpy as np
+import pytest
+from seffybacktest.tail_risk import historical_tail
+
+
+def reference_tail(column, confidence_level):
+    returns = np.sort(column[~np.isnan(column)])
+    var = -returns[min(int((1 - confidence_level) * len(returns)), len(returns) - 1)]
+    return var, -returns[returns <= -var].mean()
+
+
+@pytest.mark.parametrize("confidence_level", [0.5, 0.9, 0.95])
+def test_nans_and_ties_at_the_threshold(confidence_level):
+    rng = np.random.default_rng(0)
+    # Returns rounded to 1% with many repeated zeros tie at the threshold, with NaNs among them
+    returns = np.round(rng.normal(0.0, 0.02, (250, 6)), 2)
+    returns[rng.random(returns.shape) < 0.4] = 0.0
+    for column in range(returns.shape[1]):
+        returns[rng.choice(250, size=20 * column + 10, replace=False), column] = np.nan
+
+    var, cvar = historical_tail(returns, [0.5, 0.9, 0.95, 0.99])
+    level = [0.5, 0.9, 0.95, 0.99].index(confidence_level)
+    for column in range(returns.shape[1]):
+        expected_var, expected_cvar = reference_tail(returns[:, column], confidence_level)
+        assert var[level, column] == pytest.approx(expected_var)
+        assert cvar[level, column] == pytest.approx(expected_cvar)
+
+
+def test_matches_reference_without_nans():
+    returns = np.random.default_rng(3).normal(0.0, 0.01, (500, 4))
+    levels = [0.9, 0.95, 0.99]
+    var, cvar = historical_tail(returns, levels)
+    for i, level in enumerate(levels):
+        for column in range(returns.shape[1]):
+            assert (var[i, column], cvar[i, column]) == pytest.approx(reference_tail(returns[:, column], level))